@@ -1,8 +1,11 @@
 from django.contrib import admin
-from .models import Producto, Categoria, Proveedor, Inventario
+from .models import Producto, Categoria, Proveedor, Inventario, MovimientoInventario, SnapshotInventario, RegistroEliminado
 
 # Registramos los modelos
 admin.site.register(Producto)
 admin.site.register(Categoria)
 admin.site.register(Proveedor)
 admin.site.register(Inventario)
+admin.site.register(MovimientoInventario)
+admin.site.register(SnapshotInventario)
+admin.site.register(RegistroEliminado)
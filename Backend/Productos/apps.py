@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ProductosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Productos'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from Productos.signals import asegurar_indice_busqueda
+        post_migrate.connect(asegurar_indice_busqueda, sender=self)
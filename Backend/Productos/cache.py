@@ -0,0 +1,99 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _clave_version(usuario_id):
+    return f'catalogo:version:{usuario_id}'
+
+
+def version_catalogo(usuario_id):
+    """
+    Versión actual del catálogo del usuario. Se inicia con una marca de tiempo
+    para que, si la clave se pierde (reinicio o desalojo), la nueva versión nunca
+    coincida con una copia antigua que siga en caché.
+    """
+    clave = _clave_version(usuario_id)
+    version = cache.get(clave)
+    if version is None:
+        inicial = time.time_ns()
+        cache.add(clave, inicial, timeout=None)
+        version = cache.get(clave, inicial)
+    return version
+
+
+def _incrementar_version(usuario_id):
+    clave = _clave_version(usuario_id)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, time.time_ns(), timeout=None)
+
+
+def invalidar_catalogo(usuario_id):
+    """
+    Invalida el catálogo cacheado del usuario. Se ejecuta al confirmar la
+    transacción para que ningún lector guarde datos viejos bajo la versión nueva.
+    """
+    if usuario_id is None:
+        return
+    transaction.on_commit(lambda: _incrementar_version(usuario_id))
+
+
+def obtener_catalogo(usuario_id, construir):
+    """
+    Devuelve el catálogo serializado del usuario desde caché, o lo construye con
+    `construir()` y lo guarda bajo la versión vigente.
+    """
+    clave = f'catalogo:{usuario_id}:{version_catalogo(usuario_id)}'
+    catalogo = cache.get(clave)
+    if catalogo is None:
+        catalogo = list(construir())
+        cache.set(clave, catalogo, settings.CATALOGO_CACHE_TIMEOUT)
+    return catalogo
+
+
+def obtener_alertas(usuario_id, construir):
+    """
+    Resumen de alertas de stock del usuario. Comparte la versión del catálogo,
+    que ya cambia con cada movimiento de stock, así que se recalcula solo tras
+    un cambio.
+    """
+    clave = f'alertas:{usuario_id}:{version_catalogo(usuario_id)}'
+    alertas = cache.get(clave)
+    if alertas is None:
+        alertas = construir()
+        cache.set(clave, alertas, settings.CATALOGO_CACHE_TIMEOUT)
+    return alertas
+
+
+# Registro compacto por código de barras. Un código inexistente también se cachea
+# (como {}) y se invalida cuando un producto toma ese código.
+NO_ENCONTRADO = {}
+
+
+def _clave_escaneo(usuario_id, codigo):
+    return f'escaneo:{usuario_id}:{hashlib.md5(codigo.encode()).hexdigest()}'
+
+
+def obtener_escaneo(usuario_id, codigo, construir):
+    """
+    Devuelve el registro vendible del código escaneado desde caché, o lo
+    construye con `construir()` (None si no existe) y lo guarda.
+    """
+    clave = _clave_escaneo(usuario_id, codigo)
+    registro = cache.get(clave)
+    if registro is None:
+        registro = construir() or NO_ENCONTRADO
+        cache.set(clave, registro, settings.CATALOGO_CACHE_TIMEOUT)
+    return registro or None
+
+
+def invalidar_escaneo(usuario_id, codigos):
+    claves = [_clave_escaneo(usuario_id, codigo) for codigo in set(codigos) if codigo]
+    if usuario_id is None or not claves:
+        return
+    transaction.on_commit(lambda: cache.delete_many(claves))
@@ -2,7 +2,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from Productos.models import Inventario
-from Productos.serializers import InventarioSerializer
+from Productos.serializers import InventarioSerializer, AjusteStockSerializer
+from Productos.services.inventario_service import AjusteStockError, ajustar_stock, alertas_stock
+from Productos.cache import obtener_alertas
+from Productos.services.exportacion_service import exportar_inventario
+from backend.exportacion import ExportacionError, exportar_desde_peticion
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import AllowAny
 
@@ -53,3 +57,61 @@ class InventarioDetalleVista(APIView):
         inventario = get_object_or_404(Inventario, pk=pk)
         inventario.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class InventarioAjusteVista(APIView):
+    """
+    Ajusta el stock de uno o varios productos del usuario con deltas con signo,
+    sin reemplazar la fila (a diferencia de PUT en InventarioDetalleVista).
+    Acepta {"producto_id", "cantidad"} o {"ajustes": [{"producto_id", "cantidad"}, ...]}.
+    """
+
+    def post(self, request, usuario_id):
+        datos = request.data.get('ajustes', [request.data]) if isinstance(request.data, dict) else request.data
+        serializer = AjusteStockSerializer(data=datos, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            niveles = ajustar_stock(usuario_id, serializer.validated_data)
+        except AjusteStockError as error:
+            return Response({"error": error.mensaje, "detalle": error.detalle}, status=error.status_code)
+
+        return Response({
+            "inventarios": [
+                {"producto_id": producto_id, "stock": stock} for producto_id, stock in sorted(niveles.items())
+            ]
+        })
+
+
+class InventarioAlertasVista(APIView):
+    """
+    Productos del usuario con stock bajo el mínimo o sobre el máximo, desde un
+    resumen cacheado que se recalcula cuando cambia el stock.
+    ?tipo=bajo o ?tipo=sobre devuelve solo esa lista.
+    """
+
+    def get(self, request, usuario_id):
+        alertas = obtener_alertas(usuario_id, lambda: alertas_stock(usuario_id))
+        tipo = request.query_params.get('tipo')
+        if tipo == 'bajo':
+            return Response(alertas['bajo_stock'])
+        if tipo == 'sobre':
+            return Response(alertas['sobre_stock'])
+        if tipo:
+            return Response({"tipo": "Usa 'bajo' o 'sobre'."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(alertas)
+
+
+class InventarioExportacionVista(APIView):
+    """
+    Descarga el inventario del usuario en CSV o XLSX, en streaming. Parámetros
+    opcionales: formato (csv|xlsx), columnas (separadas por comas), desde y
+    hasta (AAAA-MM-DD, sobre la última actualización).
+    """
+
+    def get(self, request, usuario_id):
+        try:
+            return exportar_desde_peticion(request, f'inventario_{usuario_id}', exportar_inventario, usuario_id)
+        except ExportacionError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,81 @@
+import datetime
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from backend.pagination import KeysetPaginacion
+from Productos.models import Producto, MovimientoInventario
+from Productos.serializers import MovimientoInventarioSerializer
+from Productos.services.kardex_service import stock_en_fecha
+
+
+def _leer_fecha(valor):
+    try:
+        return parse_date(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fin_del_dia(fecha):
+    siguiente = datetime.datetime.combine(fecha + datetime.timedelta(days=1), datetime.time.min)
+    return timezone.make_aware(siguiente) - datetime.timedelta(microseconds=1)
+
+
+class MovimientoPaginacion(KeysetPaginacion):
+    ordering = ('-fecha', '-id')
+
+
+class KardexVista(APIView):
+    """
+    Movimientos de stock de un producto, del más reciente al más antiguo.
+    Filtros opcionales: desde y hasta (AAAA-MM-DD) y tipo.
+    """
+    pagination_class = MovimientoPaginacion
+
+    def get(self, request, usuario_id, producto_id):
+        producto = get_object_or_404(Producto.objects.only('id'), pk=producto_id, usuario_id=usuario_id)
+        movimientos = MovimientoInventario.objects.filter(producto=producto)
+
+        errores = {}
+        for parametro in ('desde', 'hasta'):
+            valor = request.query_params.get(parametro)
+            if not valor:
+                continue
+            fecha = _leer_fecha(valor)
+            if fecha is None:
+                errores[parametro] = 'Fecha inválida, usa el formato AAAA-MM-DD.'
+            elif parametro == 'desde':
+                movimientos = movimientos.filter(fecha__gte=timezone.make_aware(
+                    datetime.datetime.combine(fecha, datetime.time.min)))
+            else:
+                movimientos = movimientos.filter(fecha__lte=_fin_del_dia(fecha))
+        if errores:
+            return Response(errores, status=status.HTTP_400_BAD_REQUEST)
+
+        tipo = request.query_params.get('tipo')
+        if tipo:
+            movimientos = movimientos.filter(tipo=tipo)
+
+        paginador = self.pagination_class()
+        pagina = paginador.paginate_queryset(movimientos, request, view=self)
+        return paginador.get_paginated_response(MovimientoInventarioSerializer(pagina, many=True).data)
+
+
+class StockEnFechaVista(APIView):
+    """Stock de un producto al cierre de la fecha indicada (?fecha=AAAA-MM-DD)."""
+
+    def get(self, request, usuario_id, producto_id):
+        fecha = _leer_fecha(request.query_params.get('fecha'))
+        if fecha is None:
+            return Response({'fecha': 'Fecha requerida en formato AAAA-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        producto = get_object_or_404(Producto.objects.only('id'), pk=producto_id, usuario_id=usuario_id)
+        return Response({
+            'producto_id': producto.pk,
+            'fecha': fecha,
+            'stock': stock_en_fecha(producto.pk, _fin_del_dia(fecha)),
+        })
@@ -1,39 +1,66 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from Productos.models import Producto, Categoria
-from Productos.serializers import ProductoSerializer
+from Productos.models import Producto, Categoria, MovimientoInventario
+from Productos.serializers import ProductoSerializer, ProductoEscaneoSerializer
 from accounts.models import Usuario
 from accounts.serializers import UsuarioSerializer
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import AllowAny
-class ProductoListaCrearVista(APIView):
+from Productos.cache import obtener_catalogo, obtener_escaneo
+from Productos.services.busqueda_service import buscar_productos, TAMANO_PAGINA, TAMANO_PAGINA_MAXIMO
+from Productos.services.importacion_service import ImportacionError, detectar_formato, importar_productos
+from Productos.services.inventario_service import AjusteStockError, ajustar_stock
+from backend.pagination import PaginacionMixin
+from rest_framework.parsers import MultiPartParser
+from rest_framework.utils.urls import replace_query_param
+
+
+class ProductoListaCrearVista(PaginacionMixin, APIView):
     """
     Vista para listar todos los productos de una empresa o crear uno nuevo.
     """
 
     def get(self, request, usuario_id):
         """
-        Obtener la lista de productos de una empresa específica (GET)
+        Obtener la lista de productos de una empresa específica (GET).
+        Paginada por cursor si se envía 'cursor' o 'page_size'.
         """
-        productos = Producto.objects.filter(usuario_id=usuario_id)
-        serializer = ProductoSerializer(productos, many=True)
-        return Response(serializer.data)
+        productos = Producto.objects.con_relaciones().filter(usuario_id=usuario_id)
+        if self.es_paginada(request):
+            return self.responder_lista(request, productos, ProductoSerializer)
+
+        # El catálogo completo se sirve desde caché hasta que cambie algo del usuario
+        catalogo = obtener_catalogo(
+            usuario_id,
+            lambda: ProductoSerializer(productos.order_by('id'), many=True).data
+        )
+        return Response(catalogo)
 
     def post(self, request, usuario_id):
         data = request.data.copy()
         nombre_producto = data.get('nombre')
 
         # Verificar si el producto ya existe para ese usuario
-        producto_existente = Producto.objects.filter(nombre__iexact=nombre_producto, usuario_id=usuario_id).first()
+        producto_existente = Producto.objects.por_nombre(nombre_producto).filter(usuario_id=usuario_id).first()
 
         if producto_existente:
-            # Si existe, sumamos el stock
-            inventario = producto_existente.inventario
-            stock_adicional = int(data.get('stock_inicial', 0))  # Si no viene, usa 0
-
-            inventario.stock += stock_adicional
-            inventario.save()
+            # Si existe, sumamos el stock con un UPDATE atómico (sin leer y reescribir la fila)
+            try:
+                stock_adicional = int(data.get('stock_inicial', 0))  # Si no viene, usa 0
+            except (TypeError, ValueError):
+                return Response({"stock_inicial": ["Debe ser un número entero."]}, status=status.HTTP_400_BAD_REQUEST)
+
+            if stock_adicional:
+                try:
+                    niveles = ajustar_stock(
+                        usuario_id,
+                        [{'producto_id': producto_existente.pk, 'cantidad': stock_adicional}],
+                        tipo=MovimientoInventario.REPOSICION,
+                    )
+                except AjusteStockError as error:
+                    return Response({"error": error.mensaje, "detalle": error.detalle}, status=error.status_code)
+                producto_existente.inventario.stock = niveles[producto_existente.pk]
 
             serializer = ProductoSerializer(producto_existente)
             return Response({
@@ -62,7 +89,7 @@ class ProductoDetalleVista(APIView):
         """
         Obtener los datos de un producto por su ID y empresa (GET)
         """
-        producto = get_object_or_404(Producto, pk=pk, usuario_id=usuario_id)
+        producto = get_object_or_404(Producto.objects.con_relaciones(), pk=pk, usuario_id=usuario_id)
         serializer = ProductoSerializer(producto)
         return Response(serializer.data)
 
@@ -88,7 +115,7 @@ class ProductoDetalleVista(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ProductosPorCategoriaView(APIView):
+class ProductosPorCategoriaView(PaginacionMixin, APIView):
     """
     Vista para listar productos de una empresa por categoría.
     """
@@ -100,13 +127,95 @@ class ProductosPorCategoriaView(APIView):
         try:
             # Buscar la categoría dentro de la empresa
             try:
+                if not valor.isdigit():
+                    raise Categoria.DoesNotExist
                 categoria = Categoria.objects.get(id=valor, usuario_id=usuario_id)
             except Categoria.DoesNotExist:
-                categoria = Categoria.objects.get(nombre__iexact=valor, usuario_id=usuario_id)
+                categoria = Categoria.objects.por_nombre(valor).get(usuario_id=usuario_id)
 
-            productos = Producto.objects.filter(categoria=categoria, usuario_id=usuario_id)
-            serializer = ProductoSerializer(productos, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            productos = Producto.objects.con_relaciones().filter(categoria=categoria, usuario_id=usuario_id)
+            return self.responder_lista(request, productos, ProductoSerializer)
 
         except Categoria.DoesNotExist:
-            return Response({'error': 'Categoría no encontrada'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({'error': 'Categoría no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class ProductoBusquedaVista(APIView):
+    """
+    Vista para buscar productos de una empresa por nombre o descripción.
+    """
+
+    def get(self, request, usuario_id):
+        """
+        Buscar productos por prefijo o similitud, ordenados por relevancia (GET).
+        Parámetros: q, page y page_size.
+        """
+        termino = request.query_params.get('q', '')
+        try:
+            pagina = max(int(request.query_params.get('page', 1)), 1)
+            tamano = min(max(int(request.query_params.get('page_size', TAMANO_PAGINA)), 1), TAMANO_PAGINA_MAXIMO)
+        except ValueError:
+            return Response({'error': 'page y page_size deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Se pide un resultado de más para saber si existe una página siguiente
+        productos = buscar_productos(usuario_id, termino, limite=tamano + 1, desplazamiento=(pagina - 1) * tamano)
+        url = request.build_absolute_uri()
+        siguiente = replace_query_param(url, 'page', pagina + 1) if len(productos) > tamano else None
+        anterior = replace_query_param(url, 'page', pagina - 1) if pagina > 1 else None
+
+        serializer = ProductoSerializer(productos[:tamano], many=True)
+        return Response({'next': siguiente, 'previous': anterior, 'results': serializer.data})
+
+
+
+class ProductoImportacionVista(APIView):
+    """
+    Vista para importar productos de forma masiva desde un archivo CSV o JSON Lines.
+    """
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, usuario_id):
+        """
+        Importar productos con su inventario inicial (POST, campo 'archivo').
+        Las filas inválidas se devuelven en el reporte sin detener la importación.
+        """
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response({'error': "Debes enviar el archivo en el campo 'archivo'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            formato = detectar_formato(archivo.name, request.data.get('formato'))
+            reporte = importar_productos(usuario_id, archivo, formato)
+        except ImportacionError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if reporte['error']:
+            # Archivo ilegible a mitad de camino: el reporte dice qué se alcanzó a crear
+            return Response(reporte, status=status.HTTP_400_BAD_REQUEST)
+        return Response(reporte, status=status.HTTP_200_OK)
+
+
+
+class ProductoEscaneoVista(APIView):
+    """
+    Vista para resolver un código de barras / SKU escaneado en caja.
+    """
+
+    def get(self, request, usuario_id, codigo):
+        """
+        Obtener el registro vendible (id, nombre, precio, stock) de un código (GET).
+        Se sirve desde caché; si no está, cuesta una consulta por el índice (usuario, codigo).
+        """
+        def construir():
+            fila = (
+                Producto.objects
+                .filter(usuario_id=usuario_id, codigo=codigo)
+                .values('id', 'nombre', 'codigo', 'precio_venta', 'inventario__stock')
+                .first()
+            )
+            return ProductoEscaneoSerializer(fila).data if fila else None
+
+        registro = obtener_escaneo(usuario_id, codigo, construir)
+        if registro is None:
+            return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(registro)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from Productos.services.sincronizacion_service import CursorInvalido, cambios_desde
+
+
+class SincronizacionVista(APIView):
+    """
+    Cambios del catálogo (categorías, proveedores, productos, inventarios y
+    eliminados) desde el `cursor` que guarda el terminal. Sin cursor devuelve
+    el catálogo completo por páginas. `page_size` limita las filas por entidad.
+    """
+
+    def get(self, request, usuario_id):
+        tamano = request.query_params.get('page_size')
+        if tamano is not None:
+            try:
+                tamano = min(max(int(tamano), 1), settings.SINCRONIZACION_MAXIMO_PAGINA)
+            except ValueError:
+                return Response({'page_size': 'Debe ser un número entero.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            cambios = cambios_desde(usuario_id, request.query_params.get('cursor'), tamano)
+        except CursorInvalido as error:
+            return Response({'cursor': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(cambios)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Usuario
+from backend.exportacion import ExportacionError, detectar_formato, escribir_archivo, leer_rango
+from Productos.services.exportacion_service import exportar_inventario
+
+
+class Command(BaseCommand):
+    help = 'Exporta a CSV o XLSX el inventario de un usuario, leyendo la base por bloques.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario_id', type=int)
+        parser.add_argument('ruta', help='Archivo de salida .csv o .xlsx')
+        parser.add_argument('--formato', choices=['csv', 'xlsx'], help='Se deduce de la extensión si no se indica')
+        parser.add_argument('--columnas', help='Columnas separadas por comas (por defecto todas)')
+        parser.add_argument('--desde', help='Actualizados desde AAAA-MM-DD')
+        parser.add_argument('--hasta', help='Actualizados hasta AAAA-MM-DD')
+
+    def handle(self, *args, **options):
+        if not Usuario.objects.filter(pk=options['usuario_id']).exists():
+            raise CommandError(f"No existe el usuario {options['usuario_id']}.")
+
+        try:
+            formato = detectar_formato(options['ruta'], options['formato'])
+            desde, hasta = leer_rango(options['desde'], options['hasta'])
+            encabezados, filas = exportar_inventario(options['usuario_id'], options['columnas'], desde, hasta)
+            total = escribir_archivo(options['ruta'], formato, encabezados, filas)
+        except (ExportacionError, OSError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(f"Filas exportadas: {total} en {options['ruta']}."))
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Usuario
+from Productos.services.importacion_service import (
+    ImportacionError, TAMANO_LOTE, detectar_formato, importar_productos
+)
+
+
+class Command(BaseCommand):
+    help = 'Importa productos con su inventario inicial desde un archivo CSV o JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario_id', type=int)
+        parser.add_argument('ruta', help='Archivo .csv o .jsonl')
+        parser.add_argument('--formato', choices=['csv', 'jsonl'], help='Se deduce de la extensión si no se indica')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por inserción masiva')
+
+    def handle(self, *args, **options):
+        if not Usuario.objects.filter(pk=options['usuario_id']).exists():
+            raise CommandError(f"No existe el usuario {options['usuario_id']}.")
+
+        try:
+            formato = detectar_formato(options['ruta'], options['formato'])
+            with open(options['ruta'], 'rb') as archivo:
+                reporte = importar_productos(options['usuario_id'], archivo, formato, tamano_lote=options['lote'])
+        except (ImportacionError, OSError) as error:
+            raise CommandError(str(error))
+
+        for error in reporte['errores']:
+            self.stderr.write(f"Fila {error['fila']}: {json.dumps(error['errores'], ensure_ascii=False)}")
+        resumen = f"Productos creados: {reporte['creados']}. Filas con errores: {reporte['total_errores']}."
+        if reporte['error']:
+            raise CommandError(f"{reporte['error']} {resumen}")
+        self.stdout.write(self.style.SUCCESS(resumen))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Productos.services.kardex_service import tomar_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Guarda un snapshot del stock de cada producto con movimientos desde su último '
+        'snapshot. Pensado para ejecutarse periódicamente (p. ej. cada noche).'
+    )
+
+    def handle(self, *args, **options):
+        creados = tomar_snapshots()
+        self.stdout.write(self.style.SUCCESS(f'Snapshots creados: {creados}.'))
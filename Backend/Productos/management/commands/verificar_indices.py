@@ -0,0 +1,132 @@
+import datetime
+import re
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from accounts.models import Usuario, Bitacora
+from Productos.models import Producto, Categoria, Inventario
+from Ventas.models import Pedido, Estado, TipoVenta
+
+
+class _Revertir(Exception):
+    """Se lanza al final para deshacer los datos sembrados."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Siembra un conjunto de datos temporal, ejecuta EXPLAIN sobre la consulta principal '
+        'de cada controlador y falla si alguna recorre secuencialmente su tabla.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=40, help='Usuarios (empresas) a sembrar')
+        parser.add_argument('--productos', type=int, default=250, help='Productos por usuario')
+        parser.add_argument('--pedidos', type=int, default=100, help='Pedidos y registros de bitácora por usuario')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f'Motor no soportado para la verificación: {connection.vendor}')
+
+        fallas = []
+        try:
+            with transaction.atomic():
+                usuario = self._sembrar(options['usuarios'], options['productos'], options['pedidos'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+                for nombre, tabla, queryset in self._consultas(usuario):
+                    plan = queryset.explain()
+                    correcto = not self._recorre_secuencialmente(plan, tabla)
+                    estado = self.style.SUCCESS('OK') if correcto else self.style.ERROR('SEQ SCAN')
+                    self.stdout.write(f'[{estado}] {nombre}')
+                    if options['verbosity'] > 1 or not correcto:
+                        self.stdout.write(plan)
+                    if not correcto:
+                        fallas.append(nombre)
+                raise _Revertir
+        except _Revertir:
+            pass
+
+        if fallas:
+            raise CommandError(f"Consultas sin índice: {', '.join(fallas)}")
+        self.stdout.write(self.style.SUCCESS('Todas las consultas usan índices.'))
+
+    def _recorre_secuencialmente(self, plan, tabla):
+        if connection.vendor == 'postgresql':
+            return re.search(rf'Seq Scan on "?{re.escape(tabla)}"?\b', plan) is not None
+        # SQLite: "SCAN tabla" sin "USING ... INDEX" es un recorrido completo
+        return any(
+            re.search(rf'\bSCAN "?{re.escape(tabla)}"?\b', linea) and 'INDEX' not in linea
+            for linea in plan.splitlines()
+        )
+
+    def _sembrar(self, total_usuarios, productos_por_usuario, pedidos_por_usuario):
+        usuarios = Usuario.objects.bulk_create([
+            Usuario(correo=f'verificar-indices-{i}@ejemplo.local', nombre=f'Empresa {i}', password='!')
+            for i in range(total_usuarios)
+        ])
+        estado = Estado.objects.create(descripcion='Verificación')
+        tipo_venta = TipoVenta.objects.create(descripcion='Verificación')
+
+        for usuario in usuarios:
+            categorias = Categoria.objects.bulk_create([
+                Categoria(nombre=f'Categoría {i}', usuario=usuario) for i in range(10)
+            ])
+            productos = Producto.objects.bulk_create([
+                Producto(
+                    nombre=f'Producto {i}', codigo=f'{usuario.pk}-{i}',
+                    precio_compra=Decimal('1.00'), precio_venta=Decimal('2.00'),
+                    categoria=categorias[i % len(categorias)], usuario=usuario,
+                )
+                for i in range(productos_por_usuario)
+            ])
+            Inventario.objects.bulk_create([
+                Inventario(producto=producto, usuario=usuario, stock=10, cantidad_minima=1, cantidad_maxima=100)
+                for producto in productos
+            ])
+            Pedido.objects.bulk_create([
+                Pedido(usuario=usuario, estado=estado, tipo_venta=tipo_venta, total=Decimal('2.00'))
+                for _ in range(pedidos_por_usuario)
+            ])
+            Bitacora.objects.bulk_create([
+                Bitacora(usuario=usuario, ip='127.0.0.1', accion='Verificación')
+                for _ in range(pedidos_por_usuario)
+            ])
+        return usuarios[len(usuarios) // 2]
+
+    def _consultas(self, usuario):
+        hoy = datetime.date.today()
+        ahora = timezone.now()
+        producto_ids = list(
+            Producto.objects.filter(usuario=usuario).order_by('id').values_list('id', flat=True)[:5]
+        )
+        return [
+            ('Listado de productos', Producto._meta.db_table,
+             Producto.objects.con_relaciones().filter(usuario=usuario)),
+            ('Producto por nombre', Producto._meta.db_table,
+             Producto.objects.por_nombre('producto 7').filter(usuario=usuario)),
+            ('Escaneo por código', Producto._meta.db_table,
+             Producto.objects.filter(usuario=usuario, codigo=f'{usuario.pk}-7')),
+            ('Categorías del usuario', Categoria._meta.db_table,
+             Categoria.objects.filter(usuario=usuario)),
+            ('Categoría por nombre', Categoria._meta.db_table,
+             Categoria.objects.por_nombre('categoría 3').filter(usuario=usuario)),
+            ('Inventarios del checkout', Inventario._meta.db_table,
+             Inventario.objects.select_related('producto').filter(
+                 producto_id__in=producto_ids, producto__usuario=usuario)),
+            ('Alertas de stock', Inventario._meta.db_table,
+             Inventario.objects.filter(
+                 Q(stock__lt=F('cantidad_minima')) | Q(cantidad_maxima__gt=0, stock__gt=F('cantidad_maxima')),
+                 producto__usuario=usuario)),
+            ('Sincronización de productos', Producto._meta.db_table,
+             Producto.objects.filter(usuario=usuario, fecha_actualizacion__gt=ahora - datetime.timedelta(hours=1))
+             .order_by('fecha_actualizacion', 'id')),
+            ('Pedidos por fecha', Pedido._meta.db_table,
+             Pedido.objects.filter(usuario=usuario, fecha__range=(hoy - datetime.timedelta(days=30), hoy))),
+            ('Bitácora por fecha', Bitacora._meta.db_table,
+             Bitacora.objects.filter(usuario=usuario, fecha__gte=hoy - datetime.timedelta(days=7))
+             .order_by('-fecha', '-hora', '-id')),
+        ]
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Productos.services.kardex_service import conciliar_kardex, diferencias_kardex
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el saldo del kardex de cada producto con Inventario.stock. Con --reparar '
+        'agrega movimientos de conciliación para que coincidan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', type=int, help='Verificar solo los productos de este usuario')
+        parser.add_argument('--reparar', action='store_true', help='Registrar movimientos de conciliación')
+
+    def handle(self, *args, **options):
+        if options['reparar']:
+            diferencias = conciliar_kardex(options['usuario'])
+        else:
+            diferencias = diferencias_kardex(options['usuario'])
+
+        for producto_id, stock, saldo in diferencias:
+            self.stdout.write(f'Producto {producto_id}: stock {stock}, kardex {saldo} (diferencia {stock - saldo:+d})')
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('El kardex coincide con el inventario.'))
+        elif options['reparar']:
+            self.stdout.write(self.style.SUCCESS(f'Conciliados {len(diferencias)} productos.'))
+        else:
+            raise CommandError(f'{len(diferencias)} productos no coinciden; usa --reparar para conciliarlos.')
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from Productos.services.busqueda_service import preparar_indice_busqueda, eliminar_indice_busqueda
+
+
+def crear_indice_busqueda(apps, schema_editor):
+    Producto = apps.get_model('Productos', 'Producto')
+    preparar_indice_busqueda(schema_editor.connection, Producto._meta.db_table)
+
+
+def borrar_indice_busqueda(apps, schema_editor):
+    eliminar_indice_busqueda(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0005_categoria_usuario_producto_usuario_proveedor_usuario'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice_busqueda, borrar_indice_busqueda),
+    ]
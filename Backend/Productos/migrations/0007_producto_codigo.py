@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 14:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0006_producto_busqueda'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='codigo',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='producto',
+            constraint=models.UniqueConstraint(fields=('usuario', 'codigo'), name='producto_usuario_codigo_unico'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 14:52
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0007_producto_codigo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='categoria',
+            index=models.Index(models.F('usuario'), django.db.models.functions.text.Lower('nombre'), name='categoria_usuario_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(models.F('usuario'), django.db.models.functions.text.Lower('nombre'), name='producto_usuario_nombre_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+def corregir_stock_negativo(apps, schema_editor):
+    # Las lecturas-modificaciones-escrituras anteriores pudieron dejar stock negativo
+    Inventario = apps.get_model('Productos', 'Inventario')
+    Inventario.objects.filter(stock__lt=0).update(stock=0)
+
+
+class Migration(migrations.Migration):
+    # Cada operación en su propia transacción: PostgreSQL no permite ALTER TABLE
+    # con eventos de trigger pendientes del UPDATE anterior
+    atomic = False
+
+    dependencies = [
+        ('Productos', '0008_indices_usuario_nombre'),
+    ]
+
+    operations = [
+        migrations.RunPython(corregir_stock_negativo, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='inventario',
+            constraint=models.CheckConstraint(condition=models.Q(('stock__gte', 0)), name='inventario_stock_no_negativo'),
+        ),
+    ]
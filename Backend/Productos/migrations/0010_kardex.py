@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-18 15:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def abrir_kardex(apps, schema_editor):
+    # El stock existente entra como movimiento inicial para que el kardex cuadre desde el principio
+    Inventario = apps.get_model('Productos', 'Inventario')
+    MovimientoInventario = apps.get_model('Productos', 'MovimientoInventario')
+    ahora = timezone.now()
+    lote = []
+    for producto_id, stock in Inventario.objects.exclude(stock=0).values_list('producto_id', 'stock').iterator():
+        lote.append(MovimientoInventario(
+            producto_id=producto_id, tipo='inicial', cantidad=stock,
+            stock_resultante=stock, fecha=ahora, referencia='apertura',
+        ))
+        if len(lote) >= 1000:
+            MovimientoInventario.objects.bulk_create(lote)
+            lote = []
+    MovimientoInventario.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0009_inventario_stock_no_negativo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('inicial', 'Stock inicial'), ('venta', 'Venta'), ('reposicion', 'Reposición'), ('ajuste', 'Ajuste manual'), ('conciliacion', 'Conciliación')], max_length=20)),
+                ('cantidad', models.IntegerField()),
+                ('stock_resultante', models.IntegerField()),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('referencia', models.CharField(blank=True, max_length=100, null=True)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='Productos.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['producto', 'fecha', 'id'], name='movimiento_producto_fecha_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SnapshotInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField()),
+                ('stock', models.IntegerField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='Productos.producto')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('producto', 'fecha'), name='snapshot_producto_fecha_unico')],
+            },
+        ),
+        migrations.RunPython(abrir_kardex, migrations.RunPython.noop),
+    ]
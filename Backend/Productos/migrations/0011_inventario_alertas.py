@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0010_kardex'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(condition=models.Q(('stock__lt', models.F('cantidad_minima'))), fields=['producto'], name='inventario_bajo_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(condition=models.Q(('stock__gt', models.F('cantidad_maxima'))), fields=['producto'], name='inventario_sobre_stock_idx'),
+        ),
+    ]
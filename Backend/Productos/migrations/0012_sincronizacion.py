@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-18 15:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0011_inventario_alertas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('categoria', 'Categoría'), ('proveedor', 'Proveedor'), ('producto', 'Producto'), ('inventario', 'Inventario')], max_length=20)),
+                ('objeto_id', models.IntegerField()),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='categoria',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='inventario',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='proveedor',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='categoria',
+            index=models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='categoria_usuario_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='inventario_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='producto_usuario_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proveedor',
+            index=models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='proveedor_usuario_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='registroeliminado',
+            name='usuario',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='registroeliminado',
+            index=models.Index(fields=['usuario', 'fecha', 'id'], name='eliminado_usuario_fecha_idx'),
+        ),
+    ]
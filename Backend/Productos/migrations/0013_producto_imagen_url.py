@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0012_sincronizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+    ]
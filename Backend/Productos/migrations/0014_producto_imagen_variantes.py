@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 15:24
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Tamaños vigentes al crear la migración (no se lee settings: la migración debe dar siempre lo mismo)
+VARIANTES = {'miniatura': (150, 150), 'mediana': (600, 600)}
+
+
+def completar_variantes(apps, schema_editor):
+    # Las imágenes que ya estaban en Cloudinary reciben sus URLs derivadas; Cloudinary las genera en la primera descarga
+    Producto = apps.get_model('Productos', 'Producto')
+    ahora = timezone.now()
+    lote = []
+    for producto in Producto.objects.exclude(imagen__isnull=True).exclude(imagen='').only('id', 'imagen', 'imagen_url').iterator():
+        imagen = producto.imagen
+        producto.imagen_url = producto.imagen_url or imagen.build_url(secure=True)
+        producto.imagen_variantes = {}
+        for nombre, (ancho, alto) in VARIANTES.items():
+            for formato, clave in (('jpg', nombre), ('webp', f'{nombre}_webp')):
+                producto.imagen_variantes[clave] = imagen.build_url(
+                    width=ancho, height=alto, crop='fill', format=formato, secure=True,
+                )
+        producto.fecha_actualizacion = ahora
+        lote.append(producto)
+        if len(lote) >= 1000:
+            Producto.objects.bulk_update(lote, ['imagen_url', 'imagen_variantes', 'fecha_actualizacion'])
+            lote = []
+    Producto.objects.bulk_update(lote, ['imagen_url', 'imagen_variantes', 'fecha_actualizacion'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0013_producto_imagen_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_variantes',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(completar_variantes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0014_producto_imagen_variantes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inventario',
+            name='inventario_sobre_stock_idx',
+        ),
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(condition=models.Q(('cantidad_maxima__gt', 0), ('stock__gt', models.F('cantidad_maxima'))), fields=['producto'], name='inventario_sobre_stock_idx'),
+        ),
+    ]
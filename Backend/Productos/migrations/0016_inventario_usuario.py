@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copiar_usuario(apps, schema_editor):
+    # Un solo UPDATE; no toca fecha_actualizacion, así que no reenvía todo el inventario a los terminales
+    Inventario = apps.get_model('Productos', 'Inventario')
+    Producto = apps.get_model('Productos', 'Producto')
+    Inventario.objects.update(
+        usuario_id=Subquery(Producto.objects.filter(pk=OuterRef('producto_id')).values('usuario_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0015_inventario_sobre_stock_sin_maximo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventario',
+            name='usuario',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventarios', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(copiar_usuario, migrations.RunPython.noop),
+    ]
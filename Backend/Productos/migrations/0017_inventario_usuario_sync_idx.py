@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0016_inventario_usuario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventario',
+            name='usuario',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='inventarios', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RemoveIndex(
+            model_name='inventario',
+            name='inventario_sync_idx',
+        ),
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='inventario_usuario_sync_idx'),
+        ),
+    ]
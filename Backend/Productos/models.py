@@ -1,42 +1,210 @@
 
 # Create your models here.
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
 from accounts.models import Usuario
 # Create your models here.
 
+class NombreQuerySet(models.QuerySet):
+    def por_nombre(self, nombre):
+        """
+        Filtra por nombre sin distinguir mayúsculas. Compara Lower(nombre) con
+        Lower(valor) para que lo resuelva el índice funcional (usuario, Lower(nombre)).
+        """
+        return self.alias(nombre_normalizado=Lower('nombre')).filter(nombre_normalizado=Lower(Value(nombre)))
+
+
 class Categoria(models.Model):
     nombre = models.CharField(max_length=100)
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='categorias')
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = NombreQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index('usuario', Lower('nombre'), name='categoria_usuario_nombre_idx'),
+            models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='categoria_usuario_sync_idx'),
+        ]
+
     def __str__(self):
         return self.nombre
 
 class Proveedor(models.Model):
     nombre = models.CharField(max_length=100)
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='proveedores')
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='proveedor_usuario_sync_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
     
+class ProductoQuerySet(NombreQuerySet):
+    def con_relaciones(self):
+        """Une en la misma consulta las relaciones que serializa ProductoSerializer."""
+        return self.select_related('categoria', 'proveedor', 'usuario', 'inventario')
+
+
 class Producto(models.Model):
     nombre = models.CharField(max_length=100)
     precio_compra = models.DecimalField(max_digits=10, decimal_places=2)
     precio_venta = models.DecimalField(max_digits=10, decimal_places=2)
     descripcion =models.TextField(blank=True)
     imagen = CloudinaryField('image', null=True, blank=True) 
+    # URL pública guardada al subir la imagen (Cloudinary o almacén local)
+    imagen_url = models.URLField(max_length=500, null=True, blank=True)
+    # URLs de los derivados generados al subir: {'miniatura': ..., 'miniatura_webp': ..., ...}
+    imagen_variantes = models.JSONField(default=dict, blank=True)
     categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE,null=True , blank=True)
     proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE,null=True , blank=True)
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='productos') 
+    codigo = models.CharField(max_length=64, null=True, blank=True)  # Código de barras / SKU
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    objects = ProductoQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'codigo'], name='producto_usuario_codigo_unico'),
+        ]
+        indexes = [
+            models.Index('usuario', Lower('nombre'), name='producto_usuario_nombre_idx'),
+            models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='producto_usuario_sync_idx'),
+        ]
+
     def __str__(self):
         
         return self.nombre
     
 class Inventario(models.Model):
     producto = models.OneToOneField(Producto, on_delete=models.CASCADE, related_name='inventario')
+    # Copia de producto.usuario (se fija en save()): la sincronización filtra por su propio índice sin unir productos
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='inventarios', editable=False)
     stock = models.IntegerField(default=0)
     cantidad_minima = models.IntegerField()
     cantidad_maxima = models.IntegerField()
+    # Los UPDATE masivos de stock (venta, ajustes) la fijan a mano: auto_now solo actúa en save()
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=models.Q(stock__gte=0), name='inventario_stock_no_negativo'),
+        ]
+        # Índices parciales: solo contienen los productos en alerta, así que buscarlos
+        # no recorre todo el inventario y el índice se mantiene pequeño
+        indexes = [
+            models.Index(
+                fields=['producto'], name='inventario_bajo_stock_idx',
+                condition=models.Q(stock__lt=models.F('cantidad_minima')),
+            ),
+            models.Index(
+                fields=['producto'], name='inventario_sobre_stock_idx',
+                # cantidad_maxima = 0 significa "sin máximo": esos productos nunca están sobre stock
+                condition=models.Q(cantidad_maxima__gt=0, stock__gt=models.F('cantidad_maxima')),
+            ),
+            models.Index(fields=['usuario', 'fecha_actualizacion', 'id'], name='inventario_usuario_sync_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.usuario_id is None or Inventario.producto.is_cached(self):
+            self.usuario_id = self.producto.usuario_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'Inventario de {self.producto.nombre}'
-    
\ No newline at end of file
+
+
+class MovimientoInventario(models.Model):
+    """
+    Kardex: registro de solo inserción de cada cambio de stock. La suma de
+    `cantidad` de un producto es su stock; `stock_resultante` es el stock que
+    quedó después del movimiento.
+    """
+    INICIAL = 'inicial'
+    VENTA = 'venta'
+    REPOSICION = 'reposicion'
+    AJUSTE = 'ajuste'
+    CONCILIACION = 'conciliacion'
+    TIPOS = [
+        (INICIAL, 'Stock inicial'),
+        (VENTA, 'Venta'),
+        (REPOSICION, 'Reposición'),
+        (AJUSTE, 'Ajuste manual'),
+        (CONCILIACION, 'Conciliación'),
+    ]
+
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='movimientos')
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    cantidad = models.IntegerField()
+    stock_resultante = models.IntegerField()
+    fecha = models.DateTimeField(default=timezone.now)
+    referencia = models.CharField(max_length=100, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['producto', 'fecha', 'id'], name='movimiento_producto_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()} {self.cantidad:+d} de producto {self.producto_id}'
+
+
+class SnapshotInventario(models.Model):
+    """
+    Stock de un producto en un instante, calculado desde el kardex. El stock en
+    una fecha se obtiene con el último snapshot anterior más los movimientos
+    posteriores, sin recorrer toda la historia.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='snapshots')
+    fecha = models.DateTimeField()
+    stock = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'fecha'], name='snapshot_producto_fecha_unico'),
+        ]
+
+    def __str__(self):
+        return f'Stock {self.stock} de producto {self.producto_id} al {self.fecha:%Y-%m-%d %H:%M}'
+    
+
+class RegistroEliminado(models.Model):
+    """
+    Marca de borrado para la sincronización: los terminales fuera de línea no
+    pueden enterarse de una fila eliminada por su ausencia, así que cada baja
+    de catálogo deja aquí el modelo y el id borrados.
+    """
+    CATEGORIA = 'categoria'
+    PROVEEDOR = 'proveedor'
+    PRODUCTO = 'producto'
+    INVENTARIO = 'inventario'
+    MODELOS = [
+        (CATEGORIA, 'Categoría'),
+        (PROVEEDOR, 'Proveedor'),
+        (PRODUCTO, 'Producto'),
+        (INVENTARIO, 'Inventario'),
+    ]
+
+    # Sin restricción de clave foránea: al eliminar un usuario se borran sus filas
+    # en cascada y sus marcas se insertan durante ese mismo borrado
+    usuario = models.ForeignKey(
+        Usuario, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    modelo = models.CharField(max_length=20, choices=MODELOS)
+    objeto_id = models.IntegerField()
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['usuario', 'fecha', 'id'], name='eliminado_usuario_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_modelo_display()} #{self.objeto_id} eliminado'
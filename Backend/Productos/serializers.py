@@ -1,9 +1,12 @@
 from rest_framework import serializers
-from .models import Producto, Categoria, Proveedor, Inventario
+from .models import Producto, Categoria, Proveedor, Inventario, MovimientoInventario
 from accounts.serializers import UsuarioSerializer
 from accounts.models import Usuario
 from Productos.models import Producto
 from cloudinary.utils import cloudinary_url
+from django.conf import settings
+import os
+from Productos.services.imagenes_service import EXTENSIONES, programar_subida_imagen
 
 class CategoriaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -23,33 +26,51 @@ class ProductoSerializer(serializers.ModelSerializer):
     categoria_id = serializers.PrimaryKeyRelatedField(queryset=Categoria.objects.all(), source='categoria', write_only=True,required=False,allow_null=True)
     proveedor_id = serializers.PrimaryKeyRelatedField(queryset=Proveedor.objects.all(), source='proveedor', write_only=True,required=False,allow_null=True)
     imagen_url = serializers.SerializerMethodField()
+    imagen_variantes = serializers.JSONField(read_only=True)
+    # La subida a Cloudinary la hace el trabajador de tareas, no la petición
+    imagen = serializers.FileField(write_only=True, required=False)
     usuario_id = serializers.PrimaryKeyRelatedField( queryset=Usuario.objects.all(), source='usuario', write_only=True)
 
     # Campos nuevos para el inventario inicial
-    stock_inicial = serializers.IntegerField(write_only=True, required=False)
-    cantidad_minima = serializers.IntegerField(write_only=True, required=False)
-    cantidad_maxima = serializers.IntegerField(write_only=True, required=False)
+    stock_inicial = serializers.IntegerField(min_value=0, write_only=True, required=False)
+    cantidad_minima = serializers.IntegerField(min_value=0, write_only=True, required=False)
+    cantidad_maxima = serializers.IntegerField(min_value=0, write_only=True, required=False)
 
     class Meta:
         model = Producto
 
         fields = [
-           'id', 'nombre', 'precio_compra', 'precio_venta', 'descripcion', 'imagen_url',
+           'id', 'nombre', 'codigo', 'precio_compra', 'precio_venta', 'descripcion', 'imagen_url', 'imagen_variantes', 'imagen',
             'categoria', 'proveedor', 'categoria_id', 'proveedor_id','usuario_id','usuario', 'stock',
             'stock_inicial', 'cantidad_minima', 'cantidad_maxima'
      ]
 
     def get_imagen_url(self, obj):
-        if obj.imagen:
-            return obj.imagen.url
-        return None
+        # La URL se guarda al subir la imagen; armarla solo queda para filas que no la tengan
+        if obj.imagen_url or not obj.imagen:
+            return obj.imagen_url
+        return obj.imagen.url
+
+    def validate_imagen(self, archivo):
+        if os.path.splitext(archivo.name)[1].lower() not in EXTENSIONES:
+            raise serializers.ValidationError(f"Formato no soportado: usa {', '.join(EXTENSIONES)}.")
+        if archivo.size > settings.IMAGENES_TAMANO_MAXIMO:
+            raise serializers.ValidationError("La imagen supera el tamaño máximo permitido.")
+        return archivo
 
     def validate_precio_venta(self, valor):
         if valor <= 0:
             raise serializers.ValidationError("El precio debe ser mayor a cero.")
         return valor
 
+    def validate_codigo(self, valor):
+        # Un código vacío equivale a no tener código (la restricción única ignora NULL)
+        if not valor or not valor.strip():
+            return None
+        return valor.strip()
+
     def create(self, validated_data):
+        imagen = validated_data.pop('imagen', None)
         stock_inicial = validated_data.pop('stock_inicial', 0)
         cantidad_minima = validated_data.pop('cantidad_minima', 0)
         cantidad_maxima = validated_data.pop('cantidad_maxima', 0)
@@ -63,10 +84,64 @@ class ProductoSerializer(serializers.ModelSerializer):
             cantidad_maxima=cantidad_maxima
         )
 
+        if imagen is not None:
+            programar_subida_imagen(producto, imagen)
+        return producto
+
+    def update(self, instance, validated_data):
+        imagen = validated_data.pop('imagen', None)
+        for campo in ('stock_inicial', 'cantidad_minima', 'cantidad_maxima'):
+            validated_data.pop(campo, None)
+        producto = super().update(instance, validated_data)
+        if imagen is not None:
+            programar_subida_imagen(producto, imagen)
         return producto
 
     
 
+class ProductoImportacionSerializer(serializers.Serializer):
+    """
+    Valida una fila de la importación masiva. Categoría y proveedor llegan por nombre.
+    """
+    nombre = serializers.CharField(max_length=100)
+    codigo = serializers.CharField(max_length=64, required=False, allow_null=True, default=None)
+    precio_compra = serializers.DecimalField(max_digits=10, decimal_places=2)
+    precio_venta = serializers.DecimalField(max_digits=10, decimal_places=2)
+    descripcion = serializers.CharField(required=False, allow_blank=True, default='')
+    categoria = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    proveedor = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    stock_inicial = serializers.IntegerField(min_value=0, required=False, default=0)
+    cantidad_minima = serializers.IntegerField(min_value=0, required=False, default=0)
+    cantidad_maxima = serializers.IntegerField(min_value=0, required=False, default=0)
+
+    def validate_precio_venta(self, valor):
+        if valor <= 0:
+            raise serializers.ValidationError("El precio debe ser mayor a cero.")
+        return valor
+
+
+class ProductoEscaneoSerializer(serializers.Serializer):
+    """
+    Registro compacto que necesita la caja al escanear un código.
+    """
+    id = serializers.IntegerField()
+    nombre = serializers.CharField()
+    codigo = serializers.CharField()
+    precio_venta = serializers.DecimalField(max_digits=10, decimal_places=2)
+    stock = serializers.IntegerField(source='inventario__stock', allow_null=True)
+
+
+class AjusteStockSerializer(serializers.Serializer):
+    producto_id = serializers.IntegerField()
+    cantidad = serializers.IntegerField()  # Con signo: positivo repone, negativo descuenta
+
+
+class MovimientoInventarioSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MovimientoInventario
+        fields = ['id', 'tipo', 'cantidad', 'stock_resultante', 'fecha', 'referencia']
+
+
 class InventarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = Inventario
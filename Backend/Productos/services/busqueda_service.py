@@ -0,0 +1,198 @@
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from Productos.models import Producto
+
+TAMANO_PAGINA = 20
+TAMANO_PAGINA_MAXIMO = 100
+
+TABLA_FTS = 'productos_producto_fts'
+
+# PostgreSQL: trigramas (pg_trgm) sobre nombre y descripción normalizados con unaccent.
+# unaccent() no es IMMUTABLE, por eso se envuelve en una función propia para indexarla.
+# btree_gin permite incluir usuario_id en el mismo índice GIN.
+SQL_POSTGRES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    'CREATE EXTENSION IF NOT EXISTS btree_gin',
+    """
+    CREATE OR REPLACE FUNCTION productos_normalizar(text) RETURNS text AS
+    $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS productos_producto_nombre_trgm
+    ON {tabla} USING gin (usuario_id, productos_normalizar(nombre) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS productos_producto_descripcion_trgm
+    ON {tabla} USING gin (usuario_id, productos_normalizar(descripcion) gin_trgm_ops)
+    """,
+]
+
+SQL_POSTGRES_REVERTIR = [
+    'DROP INDEX IF EXISTS productos_producto_descripcion_trgm',
+    'DROP INDEX IF EXISTS productos_producto_nombre_trgm',
+    'DROP FUNCTION IF EXISTS productos_normalizar(text)',
+]
+
+# SQLite: tabla FTS5 de contenido externo sincronizada con triggers.
+SQL_SQLITE_TABLA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5(
+        nombre, descripcion,
+        content='{{tabla_simple}}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+"""
+
+SQL_SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ai AFTER INSERT ON {{tabla}} BEGIN
+        INSERT INTO {TABLA_FTS}(rowid, nombre, descripcion) VALUES (new.id, new.nombre, new.descripcion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_ad AFTER DELETE ON {{tabla}} BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, nombre, descripcion)
+        VALUES ('delete', old.id, old.nombre, old.descripcion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABLA_FTS}_au AFTER UPDATE ON {{tabla}} BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, nombre, descripcion)
+        VALUES ('delete', old.id, old.nombre, old.descripcion);
+        INSERT INTO {TABLA_FTS}(rowid, nombre, descripcion) VALUES (new.id, new.nombre, new.descripcion);
+    END
+    """,
+]
+
+SQL_SQLITE_REVERTIR = [
+    f'DROP TRIGGER IF EXISTS {TABLA_FTS}_ai',
+    f'DROP TRIGGER IF EXISTS {TABLA_FTS}_ad',
+    f'DROP TRIGGER IF EXISTS {TABLA_FTS}_au',
+    f'DROP TABLE IF EXISTS {TABLA_FTS}',
+]
+
+
+def preparar_indice_busqueda(conexion, tabla=None):
+    """
+    Crea (de forma idempotente) el índice de búsqueda del motor en uso.
+    En SQLite también repone los triggers, que Django elimina cuando reconstruye
+    la tabla de productos en una migración, y reindexa si faltaban.
+    """
+    tabla_simple = tabla or Producto._meta.db_table
+    tabla = conexion.ops.quote_name(tabla_simple)
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            for sql in SQL_POSTGRES:
+                cursor.execute(sql.format(tabla=tabla))
+        elif conexion.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{TABLA_FTS}_a%']
+            )
+            triggers_completos = cursor.fetchone()[0] == len(SQL_SQLITE_TRIGGERS)
+            cursor.execute(SQL_SQLITE_TABLA.format(tabla_simple=tabla_simple))
+            for sql in SQL_SQLITE_TRIGGERS:
+                cursor.execute(sql.format(tabla=tabla))
+            if not triggers_completos:
+                cursor.execute(f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')")
+
+
+def eliminar_indice_busqueda(conexion):
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            sentencias = SQL_POSTGRES_REVERTIR
+        elif conexion.vendor == 'sqlite':
+            sentencias = SQL_SQLITE_REVERTIR
+        else:
+            sentencias = []
+        for sql in sentencias:
+            cursor.execute(sql)
+
+
+def _escapar_like(termino):
+    return termino.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _buscar_postgres(usuario_id, termino, limite, desplazamiento):
+    tabla = connection.ops.quote_name(Producto._meta.db_table)
+    sql = f"""
+        SELECT id FROM (
+            SELECT id,
+                   (CASE WHEN productos_normalizar(nombre) LIKE productos_normalizar(%s) THEN 1 ELSE 0 END
+                    + similarity(productos_normalizar(nombre), productos_normalizar(%s))
+                    + 0.5 * word_similarity(productos_normalizar(%s), productos_normalizar(descripcion))
+                   ) AS rango
+            FROM {tabla}
+            WHERE usuario_id = %s
+              AND (productos_normalizar(nombre) LIKE productos_normalizar(%s)
+                   OR productos_normalizar(nombre) %% productos_normalizar(%s)
+                   OR productos_normalizar(%s) <%% productos_normalizar(descripcion))
+        ) AS coincidencias
+        ORDER BY rango DESC, id
+        LIMIT %s OFFSET %s
+    """
+    prefijo = _escapar_like(termino) + '%'
+    parametros = [prefijo, termino, termino, usuario_id, prefijo, termino, termino, limite, desplazamiento]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        return [fila[0] for fila in cursor.fetchall()]
+
+
+def _buscar_sqlite(usuario_id, termino, limite, desplazamiento):
+    # Cada palabra se busca como prefijo: "coca col" -> "coca"* "col"*
+    palabras = re.findall(r'\w+', termino)
+    if not palabras:
+        return []
+    consulta = ' '.join(f'"{palabra}"*' for palabra in palabras)
+    tabla = connection.ops.quote_name(Producto._meta.db_table)
+    sql = f"""
+        SELECT p.id
+        FROM {TABLA_FTS}
+        JOIN {tabla} p ON p.id = {TABLA_FTS}.rowid
+        WHERE {TABLA_FTS} MATCH %s AND p.usuario_id = %s
+        ORDER BY bm25({TABLA_FTS}, 10.0, 1.0), p.id
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [consulta, usuario_id, limite, desplazamiento])
+        return [fila[0] for fila in cursor.fetchall()]
+
+
+def _buscar_generico(usuario_id, termino, limite, desplazamiento):
+    productos = (
+        Producto.objects
+        .filter(usuario_id=usuario_id)
+        .filter(Q(nombre__icontains=termino) | Q(descripcion__icontains=termino))
+        .annotate(rango=Case(
+            When(nombre__istartswith=termino, then=Value(2)),
+            When(nombre__icontains=termino, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        .order_by('-rango', 'id')
+    )
+    return list(productos.values_list('id', flat=True)[desplazamiento:desplazamiento + limite])
+
+
+def buscar_productos(usuario_id, termino, limite=TAMANO_PAGINA, desplazamiento=0):
+    """
+    Busca productos del usuario por nombre y descripción, sin distinguir
+    mayúsculas ni acentos. Devuelve los productos ordenados por relevancia.
+    """
+    termino = termino.strip()
+    if not termino:
+        return []
+
+    if connection.vendor == 'postgresql':
+        ids = _buscar_postgres(usuario_id, termino, limite, desplazamiento)
+    elif connection.vendor == 'sqlite':
+        ids = _buscar_sqlite(usuario_id, termino, limite, desplazamiento)
+    else:
+        ids = _buscar_generico(usuario_id, termino, limite, desplazamiento)
+
+    productos = Producto.objects.con_relaciones().in_bulk(ids)
+    return [productos[pk] for pk in ids if pk in productos]
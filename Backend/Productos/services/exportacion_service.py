@@ -0,0 +1,31 @@
+from backend.exportacion import elegir_columnas, filas_exportacion
+from Productos.models import Inventario
+
+# Nombre de columna en el archivo -> campo del ORM
+COLUMNAS_INVENTARIO = {
+    'producto_id': 'producto_id',
+    'producto': 'producto__nombre',
+    'codigo': 'producto__codigo',
+    'categoria': 'producto__categoria__nombre',
+    'proveedor': 'producto__proveedor__nombre',
+    'precio_compra': 'producto__precio_compra',
+    'precio_venta': 'producto__precio_venta',
+    'stock': 'stock',
+    'cantidad_minima': 'cantidad_minima',
+    'cantidad_maxima': 'cantidad_maxima',
+    'fecha_actualizacion': 'fecha_actualizacion',
+}
+
+
+def exportar_inventario(usuario_id, columnas=None, desde=None, hasta=None):
+    """
+    Devuelve (encabezados, filas) del inventario del usuario. El rango de fechas,
+    si se indica, filtra por la última actualización de cada inventario.
+    """
+    columnas = elegir_columnas(COLUMNAS_INVENTARIO, columnas)
+    inventarios = Inventario.objects.filter(producto__usuario_id=usuario_id)
+    if desde:
+        inventarios = inventarios.filter(fecha_actualizacion__date__gte=desde)
+    if hasta:
+        inventarios = inventarios.filter(fecha_actualizacion__date__lte=hasta)
+    return columnas, filas_exportacion(inventarios.order_by('producto_id'), COLUMNAS_INVENTARIO, columnas)
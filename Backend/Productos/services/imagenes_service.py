@@ -0,0 +1,147 @@
+import logging
+import os
+import shutil
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from Productos.cache import invalidar_catalogo
+from Productos.models import Producto
+from Tareas.services.cola_service import encolar
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+# Formato de cada derivado -> nombre del formato en Pillow
+FORMATOS_VARIANTE = {'jpg': 'JPEG', 'webp': 'WEBP'}
+TAREA_SUBIR_IMAGEN = 'productos.subir_imagen'
+
+
+def variantes():
+    """(clave, ancho, alto, formato) de cada derivado: 'miniatura' en JPEG, 'miniatura_webp' en WebP, etc."""
+    for nombre, (ancho, alto) in settings.IMAGENES_VARIANTES.items():
+        for formato in FORMATOS_VARIANTE:
+            yield (nombre if formato == 'jpg' else f'{nombre}_{formato}'), ancho, alto, formato
+
+
+class AlmacenCloudinary:
+    def subir(self, ruta, nombre):
+        import cloudinary.uploader
+        pedidas = list(variantes())
+        # Transformaciones "eager": Cloudinary genera los derivados al subir y no en la primera descarga
+        resultado = cloudinary.uploader.upload(
+            ruta, public_id=nombre, folder='productos', resource_type='image',
+            eager=[
+                {'width': ancho, 'height': alto, 'crop': 'fill', 'format': formato, 'quality': settings.IMAGENES_CALIDAD}
+                for _, ancho, alto, formato in pedidas
+            ],
+        )
+        return {
+            'public_id': resultado['public_id'],
+            'url': resultado['secure_url'],
+            'variantes': {
+                clave: derivado['secure_url']
+                for (clave, *_), derivado in zip(pedidas, resultado.get('eager', []))
+            },
+        }
+
+
+class AlmacenLocal:
+    """
+    Sustituto de Cloudinary para desarrollo y pruebas sin conexión: copia el
+    archivo a MEDIA_ROOT y genera los derivados con Pillow.
+    """
+
+    def subir(self, ruta, nombre):
+        relativa = f'productos/{nombre}{os.path.splitext(ruta)[1].lower()}'
+        self._copiar(ruta, relativa)
+        return {'public_id': None, 'url': settings.MEDIA_URL + relativa, 'variantes': self._derivados(ruta, nombre)}
+
+    @staticmethod
+    def _destino(relativa):
+        destino = os.path.join(settings.MEDIA_ROOT, relativa)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        return destino
+
+    def _copiar(self, ruta, relativa):
+        shutil.copyfile(ruta, self._destino(relativa))
+
+    def _derivados(self, ruta, nombre):
+        try:
+            with Image.open(ruta) as abierta:
+                # Devuelve una copia ya orientada según EXIF, así el archivo se cierra aquí
+                original = ImageOps.exif_transpose(abierta)
+        except (OSError, Image.DecompressionBombError):
+            logger.warning('No se pudieron generar miniaturas de %s: no es una imagen válida.', ruta)
+            return {}
+
+        urls = {}
+        with original:
+            for clave, ancho, alto, formato in variantes():
+                relativa = f'productos/{nombre}_{ancho}x{alto}.{formato}'
+                # JPEG no admite transparencia; WebP la conserva
+                modo = 'RGBA' if formato == 'webp' and original.mode in ('RGBA', 'LA', 'P') else 'RGB'
+                derivado = ImageOps.fit(original.convert(modo), (ancho, alto), Image.Resampling.LANCZOS)
+                derivado.save(self._destino(relativa), FORMATOS_VARIANTE[formato], quality=settings.IMAGENES_CALIDAD)
+                urls[clave] = settings.MEDIA_URL + relativa
+        return urls
+
+
+ALMACENES = {
+    'cloudinary': AlmacenCloudinary,
+    'local': AlmacenLocal,
+}
+
+
+def almacen():
+    return ALMACENES[settings.IMAGENES_ALMACEN]()
+
+
+def programar_subida_imagen(producto, archivo):
+    """
+    Guarda el archivo recibido en IMAGENES_PENDIENTES_DIR y encola su subida,
+    para que la petición no espere a Cloudinary. El trabajador debe ver el
+    mismo directorio (mismo servidor o volumen compartido). Ambas cosas ocurren
+    al confirmar la transacción: si se revierte no queda un archivo huérfano.
+    """
+    producto_id = producto.pk
+    transaction.on_commit(lambda: _guardar_pendiente(producto_id, archivo))
+
+
+def _guardar_pendiente(producto_id, archivo):
+    os.makedirs(settings.IMAGENES_PENDIENTES_DIR, exist_ok=True)
+    ruta = os.path.join(settings.IMAGENES_PENDIENTES_DIR, f'{uuid.uuid4().hex}{os.path.splitext(archivo.name)[1].lower()}')
+    with open(ruta, 'wb') as destino:
+        for bloque in archivo.chunks():
+            destino.write(bloque)
+    encolar(TAREA_SUBIR_IMAGEN, {'producto_id': producto_id, 'ruta': ruta})
+
+
+def subir_imagen(producto_id, ruta):
+    """
+    Sube la imagen pendiente, genera sus miniaturas y variantes WebP y guarda
+    todas las URLs en el producto, para que los listados no tengan que armarlas.
+    Se ejecuta en el trabajador.
+    """
+    producto = Producto.objects.filter(pk=producto_id).only('id', 'usuario_id').first()
+    if producto is None or not os.path.exists(ruta):
+        # El producto se eliminó, o un intento anterior ya terminó y borró el archivo
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        return
+
+    resultado = almacen().subir(ruta, f'{producto.usuario_id}-{producto.pk}-{uuid.uuid4().hex[:8]}')
+    cambios = {
+        'imagen_url': resultado['url'],
+        'imagen_variantes': resultado['variantes'],
+        'fecha_actualizacion': timezone.now(),
+    }
+    if resultado['public_id']:
+        cambios['imagen'] = resultado['public_id']
+    Producto.objects.filter(pk=producto_id).update(**cambios)
+    # El UPDATE directo no emite señales
+    invalidar_catalogo(producto.usuario_id)
+    transaction.on_commit(lambda: os.remove(ruta))
@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+import os
+
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Lower
+
+from Productos.cache import invalidar_catalogo, invalidar_escaneo
+from Productos.models import Producto, Categoria, Proveedor, Inventario, MovimientoInventario
+from Productos.services.kardex_service import registrar_movimientos
+from Productos.serializers import ProductoImportacionSerializer
+
+TAMANO_LOTE = 500
+MAXIMO_ERRORES_REPORTADOS = 1000
+
+FORMATOS = ('csv', 'jsonl')
+
+
+class ImportacionError(Exception):
+    """El archivo no se puede importar (formato desconocido o ilegible)."""
+
+
+def detectar_formato(nombre_archivo, formato=None):
+    if formato:
+        formato = formato.lower()
+    else:
+        extension = os.path.splitext(nombre_archivo or '')[1].lower()
+        formato = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(extension)
+    if formato not in FORMATOS:
+        raise ImportacionError("Formato no soportado: usa un archivo .csv o .jsonl.")
+    return formato
+
+
+def _normalizar_fila(fila):
+    # Las celdas vacías del CSV se tratan como campos no enviados
+    return {
+        clave.strip(): valor.strip() if isinstance(valor, str) else valor
+        for clave, valor in fila.items()
+        if clave and valor not in ('', None)
+    }
+
+
+def leer_filas(archivo, formato):
+    """
+    Recorre el archivo (binario) sin cargarlo entero en memoria.
+    Produce tuplas (número de línea, fila) o (número de línea, mensaje de error).
+    """
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    try:
+        if formato == 'csv':
+            lector = csv.DictReader(texto)
+            for fila in lector:
+                yield lector.line_num, _normalizar_fila(fila)
+        else:
+            for numero, linea in enumerate(texto, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError:
+                    yield numero, "JSON inválido."
+                    continue
+                if not isinstance(fila, dict):
+                    yield numero, "Cada línea debe ser un objeto JSON."
+                    continue
+                yield numero, _normalizar_fila(fila)
+    except UnicodeDecodeError:
+        raise ImportacionError("El archivo debe estar codificado en UTF-8.")
+    finally:
+        # El archivo lo cierra quien lo abrió
+        texto.detach()
+
+
+class ImportadorProductos:
+    """
+    Importa productos con su inventario inicial en lotes: valida cada fila,
+    resuelve categorías y proveedores por nombre con un mapa en memoria y
+    guarda cada lote con bulk_create. Las filas con errores se reportan sin
+    detener la importación. Si el archivo deja de poder leerse a mitad de
+    camino, los lotes ya guardados se conservan y el reporte trae `error`.
+    """
+
+    def __init__(self, usuario_id, tamano_lote=TAMANO_LOTE):
+        self.usuario_id = usuario_id
+        self.tamano_lote = tamano_lote
+        self.categorias = self._mapa_por_nombre(Categoria)
+        self.proveedores = self._mapa_por_nombre(Proveedor)
+        self.creados = 0
+        self.codigos_creados = []
+        self.total_errores = 0
+        self.errores = []
+        self.error = None
+
+    def _mapa_por_nombre(self, modelo):
+        mapa = {}
+        for pk, nombre in modelo.objects.filter(usuario_id=self.usuario_id).order_by('id').values_list('id', 'nombre'):
+            mapa.setdefault(nombre.lower(), pk)
+        return mapa
+
+    def _registrar_error(self, fila, errores):
+        self.total_errores += 1
+        if len(self.errores) < MAXIMO_ERRORES_REPORTADOS:
+            self.errores.append({'fila': fila, 'errores': errores})
+
+    def importar(self, filas):
+        lote = []
+        try:
+            for numero, fila in filas:
+                lote.append((numero, fila))
+                if len(lote) >= self.tamano_lote:
+                    self._procesar_lote(lote)
+                    lote = []
+            if lote:
+                self._procesar_lote(lote)
+        except ImportacionError as error:
+            # Las filas leídas antes del error no se guardan; los lotes anteriores ya están confirmados
+            self.error = str(error)
+        finally:
+            # bulk_create no emite señales
+            if self.creados:
+                invalidar_catalogo(self.usuario_id)
+                invalidar_escaneo(self.usuario_id, self.codigos_creados)
+        return self.reporte()
+
+    def reporte(self):
+        return {
+            'creados': self.creados,
+            'total_errores': self.total_errores,
+            'errores': self.errores,
+            'error': self.error,
+        }
+
+    def _validar_lote(self, lote):
+        validas = []
+        for numero, fila in lote:
+            if isinstance(fila, str):
+                self._registrar_error(numero, {'fila': [fila]})
+                continue
+            serializer = ProductoImportacionSerializer(data=fila)
+            if serializer.is_valid():
+                validas.append((numero, serializer.validated_data))
+            else:
+                self._registrar_error(numero, serializer.errors)
+        return validas
+
+    def _descartar_duplicados(self, validas):
+        nombres = {datos['nombre'].lower() for _, datos in validas}
+        codigos = {datos['codigo'] for _, datos in validas if datos['codigo']}
+        existentes = set(
+            Producto.objects
+            .filter(usuario_id=self.usuario_id)
+            .annotate(nombre_normalizado=Lower('nombre'))
+            .filter(nombre_normalizado__in=nombres)
+            .values_list('nombre_normalizado', flat=True)
+        )
+        codigos_existentes = set(
+            Producto.objects
+            .filter(usuario_id=self.usuario_id, codigo__in=codigos)
+            .values_list('codigo', flat=True)
+        ) if codigos else set()
+        unicas = []
+        for numero, datos in validas:
+            nombre = datos['nombre'].lower()
+            if nombre in existentes:
+                self._registrar_error(numero, {'nombre': ["Ya existe un producto con este nombre."]})
+                continue
+            if datos['codigo'] and datos['codigo'] in codigos_existentes:
+                self._registrar_error(numero, {'codigo': ["Ya existe un producto con este código."]})
+                continue
+            existentes.add(nombre)
+            if datos['codigo']:
+                codigos_existentes.add(datos['codigo'])
+            unicas.append((numero, datos))
+        return unicas
+
+    def _resolver(self, modelo, mapa, nombres):
+        """Crea de una vez las categorías o proveedores que aún no existen."""
+        nuevos = {}
+        for nombre in nombres:
+            if nombre and nombre.lower() not in mapa:
+                nuevos.setdefault(nombre.lower(), modelo(nombre=nombre, usuario_id=self.usuario_id))
+        for clave, objeto in zip(nuevos, modelo.objects.bulk_create(nuevos.values())):
+            mapa[clave] = objeto.pk
+
+    def _procesar_lote(self, lote):
+        validas = self._descartar_duplicados(self._validar_lote(lote))
+        if not validas:
+            return
+
+        try:
+            with transaction.atomic():
+                self._resolver(Categoria, self.categorias, [datos.get('categoria') for _, datos in validas])
+                self._resolver(Proveedor, self.proveedores, [datos.get('proveedor') for _, datos in validas])
+
+                productos = Producto.objects.bulk_create([
+                    Producto(
+                        nombre=datos['nombre'],
+                        codigo=datos['codigo'],
+                        precio_compra=datos['precio_compra'],
+                        precio_venta=datos['precio_venta'],
+                        descripcion=datos['descripcion'],
+                        categoria_id=self.categorias.get((datos.get('categoria') or '').lower()),
+                        proveedor_id=self.proveedores.get((datos.get('proveedor') or '').lower()),
+                        usuario_id=self.usuario_id,
+                    )
+                    for _, datos in validas
+                ])
+                Inventario.objects.bulk_create([
+                    Inventario(
+                        producto=producto,
+                        usuario_id=self.usuario_id,
+                        stock=datos['stock_inicial'],
+                        cantidad_minima=datos['cantidad_minima'],
+                        cantidad_maxima=datos['cantidad_maxima'],
+                    )
+                    for producto, (_, datos) in zip(productos, validas)
+                ])
+                registrar_movimientos([
+                    (producto.pk, MovimientoInventario.INICIAL, datos['stock_inicial'], datos['stock_inicial'], 'importacion')
+                    for producto, (_, datos) in zip(productos, validas)
+                ])
+        except DatabaseError as error:
+            # Las categorías y proveedores creados en el lote se revierten con él
+            self.categorias = self._mapa_por_nombre(Categoria)
+            self.proveedores = self._mapa_por_nombre(Proveedor)
+            for numero, _ in validas:
+                self._registrar_error(numero, {'fila': [f"No se pudo guardar el lote: {error}"]})
+            return
+
+        self.creados += len(productos)
+        self.codigos_creados.extend(producto.codigo for producto in productos if producto.codigo)
+
+
+def importar_productos(usuario_id, archivo, formato, tamano_lote=TAMANO_LOTE):
+    """
+    Importa un archivo CSV o JSON Lines de productos y devuelve el reporte
+    {'creados', 'total_errores', 'errores': [{'fila', 'errores'}], 'error'}.
+    `error` no es None si la lectura del archivo se interrumpió.
+    """
+    importador = ImportadorProductos(usuario_id, tamano_lote=tamano_lote)
+    return importador.importar(leer_filas(archivo, formato))
@@ -0,0 +1,184 @@
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from rest_framework import status
+
+from Productos.cache import invalidar_catalogo, invalidar_escaneo
+from Productos.models import Inventario, MovimientoInventario, Producto
+from Productos.services.kardex_service import registrar_movimientos
+
+
+class AjusteStockError(Exception):
+    """
+    Error de negocio al ajustar stock. Lleva el mensaje, el código HTTP y, si
+    corresponde, el detalle por producto.
+    """
+
+    def __init__(self, mensaje, status_code=status.HTTP_400_BAD_REQUEST, detalle=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status_code = status_code
+        self.detalle = detalle or []
+
+
+def agrupar_ajustes(ajustes):
+    """
+    Normaliza los ajustes a {producto_id: delta}, sumando los repetidos del
+    mismo producto. El delta es con signo: positivo repone, negativo descuenta.
+    """
+    deltas = {}
+    for ajuste in ajustes:
+        try:
+            producto_id = int(ajuste['producto_id'])
+            cantidad = int(ajuste['cantidad'])
+        except (KeyError, TypeError, ValueError):
+            raise AjusteStockError("Cada ajuste debe incluir 'producto_id' y 'cantidad' numéricos.")
+        deltas[producto_id] = deltas.get(producto_id, 0) + cantidad
+    return {producto_id: delta for producto_id, delta in deltas.items() if delta}
+
+
+def _sql_ajuste(usuario_id, deltas):
+    """
+    UPDATE condicional con RETURNING: suma a cada inventario su delta solo si el
+    producto es del usuario y el stock no queda negativo, y devuelve el stock nuevo.
+    """
+    q = connection.ops.quote_name
+    inventario, producto = Inventario._meta.db_table, Producto._meta.db_table
+    caso = 'CASE {} {} END'.format(q('producto_id'), ' '.join('WHEN %s THEN %s' for _ in deltas))
+    marcadores = ', '.join(['%s'] * len(deltas))
+    sql = (
+        f'UPDATE {q(inventario)} SET {q("stock")} = {q("stock")} + {caso}, {q("fecha_actualizacion")} = %s '
+        f'WHERE {q("producto_id")} IN ('
+        f'SELECT {q("id")} FROM {q(producto)} WHERE {q("usuario_id")} = %s AND {q("id")} IN ({marcadores})'
+        f') AND {q("stock")} + {caso} >= 0 '
+        f'RETURNING {q("producto_id")}, {q("stock")}'
+    )
+    pares = [valor for par in deltas.items() for valor in par]
+    ahora = Inventario._meta.get_field('fecha_actualizacion').get_db_prep_value(timezone.now(), connection)
+    return sql, pares + [ahora, usuario_id] + list(deltas) + pares
+
+
+def _admite_returning():
+    # SQLite acepta UPDATE ... RETURNING desde la 3.35; Django 5.2 admite desde la 3.31
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.features.can_return_rows_from_bulk_insert
+
+
+def _aplicar_deltas(usuario_id, deltas):
+    if _admite_returning():
+        sql, parametros = _sql_ajuste(usuario_id, deltas)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            return dict(cursor.fetchall())
+
+    # Motores (o versiones de SQLite) sin RETURNING: se bloquean y leen las filas, y solo
+    # se escribe si todos los ajustes caben; si no, se devuelven los que sí para _rechazar
+    inventarios = Inventario.objects.select_for_update().filter(producto_id__in=deltas, producto__usuario_id=usuario_id)
+    anteriores = dict(inventarios.values_list('producto_id', 'stock'))
+    nuevos = {
+        producto_id: anteriores[producto_id] + delta
+        for producto_id, delta in deltas.items()
+        if producto_id in anteriores and anteriores[producto_id] + delta >= 0
+    }
+    if len(nuevos) != len(deltas):
+        return nuevos
+
+    delta = Case(
+        *(When(producto_id=producto_id, then=Value(valor)) for producto_id, valor in deltas.items()),
+        output_field=IntegerField(),
+    )
+    actualizados = inventarios.alias(delta=delta).filter(stock__gte=-F('delta')).update(
+        stock=F('stock') + delta, fecha_actualizacion=timezone.now()
+    )
+    if actualizados != len(deltas):
+        # Solo si el motor no respetó el bloqueo: nada se da por aplicado y se revierte
+        return {}
+    return nuevos
+
+
+def _rechazar(usuario_id, deltas, actualizados):
+    # Solo en el camino de error: qué productos no existen y cuáles no alcanzan
+    rechazados = [producto_id for producto_id in deltas if producto_id not in actualizados]
+    existentes = dict(
+        Inventario.objects
+        .filter(producto_id__in=rechazados, producto__usuario_id=usuario_id)
+        .values_list('producto_id', 'stock')
+    )
+    detalle = []
+    for producto_id in rechazados:
+        if producto_id not in existentes:
+            detalle.append({'producto_id': producto_id, 'error': 'Producto o inventario no encontrado.'})
+        else:
+            detalle.append({
+                'producto_id': producto_id,
+                'error': f'Stock insuficiente: hay {existentes[producto_id]} y el ajuste es {deltas[producto_id]}.',
+            })
+    faltan = any(producto_id not in existentes for producto_id in rechazados)
+    raise AjusteStockError(
+        "No se aplicó ningún ajuste.",
+        status_code=status.HTTP_404_NOT_FOUND if faltan else status.HTTP_400_BAD_REQUEST,
+        detalle=detalle,
+    )
+
+
+@transaction.atomic
+def ajustar_stock(usuario_id, ajustes, tipo=MovimientoInventario.AJUSTE, referencia=None):
+    """
+    Aplica ajustes de stock con signo de uno o varios productos en un solo
+    UPDATE, sin leer y reescribir la fila, así que no se pierden reposiciones ni
+    ventas concurrentes. Es todo o nada: si algún producto no existe o quedaría
+    con stock negativo se revierte el lote y se lanza AjusteStockError.
+    Cada ajuste queda en el kardex con el `tipo` indicado.
+    Devuelve {producto_id: stock nuevo}.
+    """
+    deltas = agrupar_ajustes(ajustes)
+    if not deltas:
+        raise AjusteStockError("Debes enviar al menos un ajuste distinto de cero.")
+
+    actualizados = _aplicar_deltas(usuario_id, deltas)
+    if len(actualizados) != len(deltas):
+        _rechazar(usuario_id, deltas, actualizados)
+
+    registrar_movimientos([
+        (producto_id, tipo, deltas[producto_id], stock, referencia)
+        for producto_id, stock in actualizados.items()
+    ])
+
+    # El UPDATE directo no emite señales: el catálogo y los escaneos incluyen el stock
+    invalidar_catalogo(usuario_id)
+    invalidar_escaneo(
+        usuario_id,
+        Producto.objects.filter(pk__in=list(actualizados)).exclude(codigo=None).values_list('codigo', flat=True)
+    )
+    return actualizados
+
+
+def alertas_stock(usuario_id):
+    """
+    Productos del usuario con stock bajo el mínimo o sobre el máximo (un
+    máximo de 0 significa que no hay máximo). Una sola consulta que resuelven
+    los índices parciales de Inventario.
+    """
+    filas = (
+        Inventario.objects
+        .filter(Q(stock__lt=F('cantidad_minima')) | Q(cantidad_maxima__gt=0, stock__gt=F('cantidad_maxima')),
+                producto__usuario_id=usuario_id)
+        .order_by('producto_id')
+        .values('producto_id', 'stock', 'cantidad_minima', 'cantidad_maxima',
+                nombre=F('producto__nombre'), codigo=F('producto__codigo'))
+    )
+    bajo_stock, sobre_stock = [], []
+    for fila in filas:
+        if fila['stock'] < fila['cantidad_minima']:
+            fila['faltante'] = fila['cantidad_minima'] - fila['stock']
+            bajo_stock.append(fila)
+        else:
+            fila['excedente'] = fila['stock'] - fila['cantidad_maxima']
+            sobre_stock.append(fila)
+    return {
+        'total_bajo_stock': len(bajo_stock),
+        'total_sobre_stock': len(sobre_stock),
+        'bajo_stock': bajo_stock,
+        'sobre_stock': sobre_stock,
+    }
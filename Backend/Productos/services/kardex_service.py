@@ -0,0 +1,111 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from Productos.models import Inventario, MovimientoInventario, SnapshotInventario
+
+
+def registrar_movimientos(movimientos):
+    """Guarda en un solo INSERT los movimientos [(producto_id, tipo, cantidad, stock_resultante, referencia)]."""
+    ahora = timezone.now()
+    MovimientoInventario.objects.bulk_create([
+        MovimientoInventario(
+            producto_id=producto_id, tipo=tipo, cantidad=cantidad,
+            stock_resultante=stock_resultante, referencia=referencia, fecha=ahora,
+        )
+        for producto_id, tipo, cantidad, stock_resultante, referencia in movimientos
+        if cantidad
+    ], batch_size=1000)
+
+
+def stock_en_fecha(producto_id, momento):
+    """
+    Stock del producto en `momento`: el último snapshot anterior más los
+    movimientos entre ese snapshot y `momento` (dos consultas, sin recorrer la historia).
+    """
+    snapshot = (
+        SnapshotInventario.objects
+        .filter(producto_id=producto_id, fecha__lte=momento)
+        .order_by('-fecha')
+        .values('fecha', 'stock')
+        .first()
+    )
+    movimientos = MovimientoInventario.objects.filter(producto_id=producto_id, fecha__lte=momento)
+    base = 0
+    if snapshot:
+        movimientos = movimientos.filter(fecha__gt=snapshot['fecha'])
+        base = snapshot['stock']
+    return base + (movimientos.aggregate(total=Sum('cantidad'))['total'] or 0)
+
+
+@transaction.atomic
+def tomar_snapshots(momento=None):
+    """
+    Crea un snapshot al `momento` para cada producto con movimientos desde su
+    último snapshot. Devuelve la cantidad creada.
+
+    `momento` no pasa de ahora menos KARDEX_MARGEN_SEGUNDOS (y ese es el valor
+    por defecto): un movimiento se fecha antes de que su transacción confirme,
+    así que un snapshot más reciente podría quedar después de un movimiento que
+    todavía no ve, y stock_en_fecha lo perdería para siempre.
+    """
+    limite = timezone.now() - datetime.timedelta(seconds=settings.KARDEX_MARGEN_SEGUNDOS)
+    momento = min(momento or limite, limite)
+    ultimo = SnapshotInventario.objects.filter(producto_id=OuterRef('producto_id'), fecha__lte=momento).order_by('-fecha')
+    pendientes = (
+        MovimientoInventario.objects
+        .filter(fecha__lte=momento)
+        .alias(desde=Subquery(ultimo.values('fecha')[:1]))
+        .filter(Q(desde__isnull=True) | Q(fecha__gt=F('desde')))
+        .values('producto_id')
+        .annotate(
+            delta=Sum('cantidad'),
+            base=Coalesce(Subquery(ultimo.values('stock')[:1]), Value(0), output_field=IntegerField()),
+        )
+    )
+    creados = SnapshotInventario.objects.bulk_create([
+        SnapshotInventario(producto_id=fila['producto_id'], fecha=momento, stock=fila['base'] + fila['delta'])
+        for fila in pendientes
+    ], batch_size=1000, ignore_conflicts=True)
+    return len(creados)
+
+
+def diferencias_kardex(usuario_id=None, bloquear=False):
+    """
+    Compara en una sola consulta el stock de cada inventario con el saldo de su
+    kardex. Devuelve [(producto_id, stock, saldo)] de los que no coinciden.
+    Con `bloquear` las filas quedan bloqueadas hasta el fin de la transacción.
+    """
+    saldo = (
+        MovimientoInventario.objects
+        .filter(producto_id=OuterRef('producto_id'))
+        .values('producto_id')
+        .annotate(total=Sum('cantidad'))
+        .values('total')
+    )
+    inventarios = Inventario.objects.annotate(
+        saldo=Coalesce(Subquery(saldo, output_field=IntegerField()), Value(0))
+    ).exclude(stock=F('saldo'))
+    if usuario_id is not None:
+        inventarios = inventarios.filter(producto__usuario_id=usuario_id)
+    if bloquear:
+        inventarios = inventarios.select_for_update(of=('self',))
+    return list(inventarios.order_by('producto_id').values_list('producto_id', 'stock', 'saldo'))
+
+
+@transaction.atomic
+def conciliar_kardex(usuario_id=None):
+    """
+    Agrega un movimiento de conciliación por cada producto cuyo kardex no
+    coincide con Inventario.stock. Devuelve las diferencias corregidas.
+    """
+    diferencias = diferencias_kardex(usuario_id, bloquear=True)
+    registrar_movimientos([
+        (producto_id, MovimientoInventario.CONCILIACION, stock - saldo, stock, None)
+        for producto_id, stock, saldo in diferencias
+    ])
+    return diferencias
@@ -0,0 +1,108 @@
+import binascii
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from Productos.models import Categoria, Inventario, Producto, Proveedor, RegistroEliminado
+
+
+class CursorInvalido(Exception):
+    pass
+
+
+# Por cada entidad: modelo, filtro del usuario, columna de cambio y columnas que se envían
+ENTIDADES = {
+    'categorias': (Categoria, 'usuario_id', 'fecha_actualizacion', ('id', 'nombre')),
+    'proveedores': (Proveedor, 'usuario_id', 'fecha_actualizacion', ('id', 'nombre')),
+    'productos': (Producto, 'usuario_id', 'fecha_actualizacion', (
+        'id', 'nombre', 'codigo', 'precio_compra', 'precio_venta', 'descripcion', 'imagen', 'imagen_url',
+        'imagen_variantes', 'categoria_id', 'proveedor_id',
+    )),
+    'inventarios': (Inventario, 'usuario_id', 'fecha_actualizacion', (
+        'id', 'producto_id', 'stock', 'cantidad_minima', 'cantidad_maxima',
+    )),
+    'eliminados': (RegistroEliminado, 'usuario_id', 'fecha', ('id', 'modelo', 'objeto_id')),
+}
+
+
+def codificar_cursor(posiciones):
+    valores = {entidad: [fecha.isoformat(), pk] for entidad, (fecha, pk) in posiciones.items()}
+    return urlsafe_b64encode(json.dumps(valores).encode('utf-8')).decode('ascii')
+
+
+def decodificar_cursor(cursor):
+    try:
+        valores = json.loads(urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        posiciones = {}
+        for entidad, (fecha, pk) in valores.items():
+            fecha = parse_datetime(fecha)
+            if entidad not in ENTIDADES or fecha is None:
+                raise ValueError
+            posiciones[entidad] = (fecha, int(pk))
+        return posiciones
+    except (AttributeError, TypeError, ValueError, UnicodeError, binascii.Error):
+        raise CursorInvalido('Cursor inválido.')
+
+
+def _pagina(entidad, usuario_id, desde, hasta, tamano):
+    modelo, filtro_usuario, columna, columnas = ENTIDADES[entidad]
+    filas = modelo.objects.filter(**{filtro_usuario: usuario_id, f'{columna}__lt': hasta})
+    if desde is not None:
+        fecha, pk = desde
+        filas = filas.filter(Q(**{f'{columna}__gt': fecha}) | Q(**{columna: fecha, 'id__gt': pk}))
+    filas = list(filas.order_by(columna, 'id').values(*columnas, columna)[:tamano + 1])
+    hay_mas = len(filas) > tamano
+    return filas[:tamano], hay_mas
+
+
+def _preparar(entidad, filas):
+    if entidad == 'productos':
+        for fila in filas:
+            imagen = fila.pop('imagen')
+            if not fila['imagen_url'] and imagen:
+                fila['imagen_url'] = imagen.url
+    if entidad == 'eliminados':
+        # Se conserva la fecha: si un id se reutiliza, el cliente aplica lo más reciente
+        for fila in filas:
+            del fila['id']
+    return filas
+
+
+def cambios_desde(usuario_id, cursor=None, tamano=None):
+    """
+    Una página de cambios del catálogo del usuario posteriores a `cursor`.
+    Cada entidad avanza por su propio índice (usuario, fecha_actualizacion, id),
+    así que el costo depende de lo que cambió y no del tamaño del catálogo.
+
+    Sin cursor se envía todo el catálogo (y ninguna marca de borrado). Solo se
+    leen cambios anteriores a ahora menos SINCRONIZACION_MARGEN_SEGUNDOS, para no
+    saltar filas de transacciones que aún no confirmaron. Mientras `hay_mas`
+    sea verdadero el cliente debe pedir la siguiente página con el cursor nuevo.
+    """
+    tamano = tamano or settings.SINCRONIZACION_TAMANO_PAGINA
+    hasta = timezone.now() - datetime.timedelta(seconds=settings.SINCRONIZACION_MARGEN_SEGUNDOS)
+    if cursor:
+        posiciones = decodificar_cursor(cursor)
+    else:
+        posiciones = {'eliminados': (hasta, 0)}
+
+    respuesta = {}
+    hay_mas = False
+    for entidad, (_, _, columna, _) in ENTIDADES.items():
+        filas, pendientes = _pagina(entidad, usuario_id, posiciones.get(entidad), hasta, tamano)
+        if pendientes:
+            hay_mas = True
+            posiciones[entidad] = (filas[-1][columna], filas[-1]['id'])
+        else:
+            # La entidad quedó al día hasta `hasta`; lo que llegue después empieza ahí
+            posiciones[entidad] = (hasta, 0)
+        respuesta[entidad] = _preparar(entidad, filas)
+
+    respuesta['cursor'] = codificar_cursor(posiciones)
+    respuesta['hay_mas'] = hay_mas
+    return respuesta
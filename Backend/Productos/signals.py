@@ -0,0 +1,89 @@
+from django.db import connections
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from accounts.models import Usuario
+from Productos.models import Producto, Categoria, Proveedor, Inventario, MovimientoInventario, RegistroEliminado
+from Productos.services.kardex_service import registrar_movimientos
+from Productos.cache import invalidar_catalogo, invalidar_escaneo
+from Productos.services.busqueda_service import TABLA_FTS, preparar_indice_busqueda
+
+
+@receiver([post_save, post_delete], sender=Categoria)
+@receiver([post_save, post_delete], sender=Proveedor)
+def invalidar_catalogo_usuario(sender, instance, **kwargs):
+    invalidar_catalogo(instance.usuario_id)
+
+
+@receiver([post_save, post_delete], sender=Usuario)
+def invalidar_catalogo_empresa(sender, instance, **kwargs):
+    # Cada producto del catálogo cacheado incluye los datos de su usuario (nombre, empresa, plan...)
+    invalidar_catalogo(instance.pk)
+
+
+@receiver(pre_save, sender=Producto)
+def recordar_codigo_anterior(sender, instance, **kwargs):
+    # Si cambia el código de barras también hay que invalidar el código viejo
+    instance._codigo_anterior = None
+    if instance.pk:
+        instance._codigo_anterior = (
+            Producto.objects.filter(pk=instance.pk).values_list('codigo', flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Producto)
+def invalidar_producto(sender, instance, **kwargs):
+    invalidar_catalogo(instance.usuario_id)
+    invalidar_escaneo(instance.usuario_id, [instance.codigo, getattr(instance, '_codigo_anterior', None)])
+
+
+@receiver(pre_save, sender=Inventario)
+def recordar_stock_anterior(sender, instance, **kwargs):
+    instance._stock_anterior = None
+    if instance.pk:
+        instance._stock_anterior = (
+            Inventario.objects.filter(pk=instance.pk).values_list('stock', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Inventario)
+def registrar_movimiento_inventario(sender, instance, created, raw=False, **kwargs):
+    # Los guardados del modelo (alta de producto, PUT de inventario) también pasan por el kardex
+    if raw:
+        return
+    anterior = 0 if created else getattr(instance, '_stock_anterior', None)
+    if anterior is None:
+        return
+    tipo = MovimientoInventario.INICIAL if created else MovimientoInventario.AJUSTE
+    registrar_movimientos([(instance.producto_id, tipo, instance.stock - anterior, instance.stock, None)])
+
+
+@receiver([post_save, post_delete], sender=Inventario)
+def invalidar_catalogo_inventario(sender, instance, **kwargs):
+    try:
+        usuario_id = instance.producto.usuario_id
+    except Producto.DoesNotExist:
+        # El producto ya fue eliminado; su propia señal invalida el catálogo
+        return
+    invalidar_catalogo(usuario_id)
+    invalidar_escaneo(usuario_id, [instance.producto.codigo])
+
+
+@receiver(post_delete, sender=Categoria)
+@receiver(post_delete, sender=Proveedor)
+@receiver(post_delete, sender=Producto)
+@receiver(post_delete, sender=Inventario)
+def registrar_eliminacion(sender, instance, **kwargs):
+    # Deja la marca de borrado que los terminales reciben al sincronizar
+    RegistroEliminado.objects.create(usuario_id=instance.usuario_id, modelo=sender._meta.model_name, objeto_id=instance.pk)
+
+
+def asegurar_indice_busqueda(sender, using, **kwargs):
+    """
+    En SQLite, Django reconstruye la tabla de productos en algunas migraciones y
+    con ella se pierden los triggers que mantienen la tabla FTS5; aquí se reponen.
+    """
+    conexion = connections[using]
+    if conexion.vendor != 'sqlite':
+        return
+    if TABLA_FTS in conexion.introspection.table_names():
+        preparar_indice_busqueda(conexion)
@@ -0,0 +1,4 @@
+from Productos.services.imagenes_service import TAREA_SUBIR_IMAGEN, subir_imagen
+from Tareas.services.cola_service import tarea
+
+tarea(TAREA_SUBIR_IMAGEN)(subir_imagen)
@@ -1,3 +1,350 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from accounts.models import Usuario
+from Productos.cache import version_catalogo
+from Productos.models import Inventario, MovimientoInventario, Producto, RegistroEliminado, SnapshotInventario
+from Productos.serializers import ProductoSerializer
+from Productos.services.imagenes_service import programar_subida_imagen
+from Productos.services.kardex_service import registrar_movimientos, stock_en_fecha, tomar_snapshots
+
+
+def imagen_png(ancho=800, alto=400):
+    contenido = io.BytesIO()
+    Image.new('RGBA', (ancho, alto), (200, 30, 30, 128)).save(contenido, 'PNG')
+    return SimpleUploadedFile('foto.png', contenido.getvalue(), content_type='image/png')
+
+
+class ImagenesProductoTests(TestCase):
+    """Subida de imágenes con el almacén local, que reemplaza a Cloudinary en las pruebas."""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajustes = override_settings(
+            IMAGENES_ALMACEN='local',
+            TAREAS_ASINCRONAS=False,
+            # La bitácora en segundo plano escribe con otra conexión, fuera de la transacción de la prueba
+            BITACORA_ASINCRONA=False,
+            MEDIA_ROOT=self.media,
+            IMAGENES_PENDIENTES_DIR=os.path.join(self.media, 'pendientes'),
+            IMAGENES_VARIANTES={'miniatura': (150, 150), 'mediana': (600, 600)},
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def crear_producto(self, **extra):
+        datos = {'nombre': 'Café molido', 'precio_compra': '10', 'precio_venta': '15', 'stock_inicial': 3, **extra}
+        # Sin trabajador, la subida corre al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.cliente.post(f'/productos/crear/usuario/{self.usuario.pk}/', datos, format='multipart')
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        return Producto.objects.get(pk=respuesta.data['id'])
+
+    def archivo(self, url):
+        return os.path.join(self.media, url.removeprefix('/media/'))
+
+    def test_subida_guarda_original_y_variantes(self):
+        producto = self.crear_producto(imagen=imagen_png())
+
+        self.assertTrue(producto.imagen_url.startswith('/media/productos/'))
+        self.assertTrue(os.path.exists(self.archivo(producto.imagen_url)))
+        self.assertEqual(set(producto.imagen_variantes), {'miniatura', 'miniatura_webp', 'mediana', 'mediana_webp'})
+        esperados = {
+            'miniatura': ((150, 150), 'JPEG'),
+            'miniatura_webp': ((150, 150), 'WEBP'),
+            'mediana': ((600, 600), 'JPEG'),
+            'mediana_webp': ((600, 600), 'WEBP'),
+        }
+        for clave, (tamano, formato) in esperados.items():
+            with Image.open(self.archivo(producto.imagen_variantes[clave])) as derivado:
+                self.assertEqual(derivado.size, tamano)
+                self.assertEqual(derivado.format, formato)
+        # El archivo pendiente se borra una vez subido
+        self.assertEqual(os.listdir(os.path.join(self.media, 'pendientes')), [])
+
+    def test_archivo_ilegible_conserva_el_original_sin_variantes(self):
+        with self.assertLogs('Productos.services.imagenes_service', 'WARNING'):
+            producto = self.crear_producto(imagen=SimpleUploadedFile('foto.jpg', b'no es una imagen'))
+
+        self.assertTrue(os.path.exists(self.archivo(producto.imagen_url)))
+        self.assertEqual(producto.imagen_variantes, {})
+
+    def test_serializer_expone_las_urls_guardadas(self):
+        producto = self.crear_producto(imagen=imagen_png())
+
+        datos = ProductoSerializer(producto).data
+        self.assertEqual(datos['imagen_url'], producto.imagen_url)
+        self.assertEqual(datos['imagen_variantes'], producto.imagen_variantes)
+        self.assertNotIn('imagen', datos)
+
+        respuesta = self.cliente.get(f'/productos/detalles/usuario/{self.usuario.pk}/{producto.pk}/')
+        self.assertEqual(respuesta.data['imagen_variantes'], producto.imagen_variantes)
+
+    def test_producto_sin_imagen(self):
+        datos = ProductoSerializer(self.crear_producto()).data
+        self.assertIsNone(datos['imagen_url'])
+        self.assertEqual(datos['imagen_variantes'], {})
+
+    def test_transaccion_revertida_no_deja_archivo_pendiente(self):
+        producto = self.crear_producto()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                programar_subida_imagen(producto, imagen_png())
+                raise RuntimeError('falla después de recibir la imagen')
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(os.path.exists(os.path.join(self.media, 'pendientes')))
+        producto.refresh_from_db()
+        self.assertIsNone(producto.imagen_url)
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class ImportacionProductosTests(TestCase):
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+
+    def test_archivo_ilegible_a_mitad_reporta_lo_creado_e_invalida_el_catalogo(self):
+        # Bytes que no son UTF-8 después de varios lotes ya leídos (el lector decodifica por bloques de 8 KB)
+        filas = ''.join(f'Producto {n},{n},10,15,{"x" * 40}\n' for n in range(600))
+        contenido = ('nombre,codigo,precio_compra,precio_venta,descripcion\n' + filas).encode('utf-8') + b'\xff\xfe,1,2\n'
+        version = version_catalogo(self.usuario.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.cliente.post(
+                f'/productos/importar/usuario/{self.usuario.pk}/',
+                {'archivo': SimpleUploadedFile('productos.csv', contenido)}, format='multipart',
+            )
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('UTF-8', respuesta.data['error'])
+        self.assertGreater(respuesta.data['creados'], 0)
+        self.assertEqual(respuesta.data['creados'], Producto.objects.filter(usuario=self.usuario).count())
+        self.assertNotEqual(version_catalogo(self.usuario.pk), version)
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class CatalogoCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+
+    def test_editar_el_usuario_renueva_el_catalogo_cacheado(self):
+        Producto.objects.create(nombre='Café', precio_compra=6, precio_venta=10, usuario=self.usuario)
+        url = f'/productos/crear/usuario/{self.usuario.pk}/'
+        self.assertEqual(self.cliente.get(url).data[0]['usuario']['nombre_empresa'], None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.nombre_empresa = 'Tienda Central'
+            self.usuario.save()
+
+        self.assertEqual(self.cliente.get(url).data[0]['usuario']['nombre_empresa'], 'Tienda Central')
+
+
+@override_settings(BITACORA_ASINCRONA=False, KARDEX_MARGEN_SEGUNDOS=60)
+class SnapshotsKardexTests(TestCase):
+
+    def setUp(self):
+        usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        self.producto = Producto.objects.create(nombre='Café', precio_compra=6, precio_venta=10, usuario=usuario)
+
+    def test_snapshot_no_deja_atras_movimientos_recientes(self):
+        registrar_movimientos([(self.producto.pk, MovimientoInventario.INICIAL, 10, 10, None)])
+        MovimientoInventario.objects.update(fecha=timezone.now() - datetime.timedelta(minutes=5))
+        # Movimiento de una transacción que todavía podría estar sin confirmar
+        registrar_movimientos([(self.producto.pk, MovimientoInventario.VENTA, -3, 7, None)])
+
+        self.assertEqual(tomar_snapshots(momento=timezone.now() + datetime.timedelta(minutes=1)), 1)
+        snapshot = SnapshotInventario.objects.get()
+        self.assertEqual(snapshot.stock, 10)
+        self.assertLessEqual(snapshot.fecha, timezone.now() - datetime.timedelta(seconds=59))
+        self.assertEqual(stock_en_fecha(self.producto.pk, timezone.now()), 7)
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class AjusteStockTests(TestCase):
+    """Ajustes con signo por el UPDATE con RETURNING (PostgreSQL y SQLite >= 3.35)."""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        otro = Usuario.objects.create_user('otra@ejemplo.com', 'Otra tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.cafe = self.crear('Café', 3, self.usuario)
+        self.te = self.crear('Té', 10, self.usuario)
+        self.ajeno = self.crear('Ajeno', 50, otro)
+        self.movimientos = MovimientoInventario.objects.count()
+
+    @staticmethod
+    def crear(nombre, stock, usuario):
+        producto = Producto.objects.create(nombre=nombre, precio_compra=6, precio_venta=10, usuario=usuario)
+        Inventario.objects.create(producto=producto, stock=stock, cantidad_minima=0, cantidad_maxima=0)
+        return producto
+
+    def ajustar(self, *ajustes):
+        return self.cliente.post(
+            f'/productos/inventarios/ajustar/usuario/{self.usuario.pk}/',
+            {'ajustes': [{'producto_id': producto.pk, 'cantidad': cantidad} for producto, cantidad in ajustes]},
+            format='json',
+        )
+
+    def stock(self, producto):
+        return Inventario.objects.get(producto=producto).stock
+
+    def test_aplica_todos_los_ajustes_y_los_registra_en_el_kardex(self):
+        respuesta = self.ajustar((self.cafe, -2), (self.te, 5))
+
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual(respuesta.data['inventarios'], [
+            {'producto_id': self.cafe.pk, 'stock': 1}, {'producto_id': self.te.pk, 'stock': 15},
+        ])
+        self.assertEqual((self.stock(self.cafe), self.stock(self.te)), (1, 15))
+        self.assertEqual(
+            set(MovimientoInventario.objects.filter(tipo=MovimientoInventario.AJUSTE)
+                .values_list('producto_id', 'cantidad', 'stock_resultante')),
+            {(self.cafe.pk, -2, 1), (self.te.pk, 5, 15)},
+        )
+
+    def test_stock_insuficiente_rechaza_todo_el_lote(self):
+        respuesta = self.ajustar((self.te, 5), (self.cafe, -10))
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([linea['producto_id'] for linea in respuesta.data['detalle']], [self.cafe.pk])
+        self.assertEqual((self.stock(self.cafe), self.stock(self.te)), (3, 10))
+        self.assertEqual(MovimientoInventario.objects.count(), self.movimientos)
+
+    def test_producto_de_otro_usuario_es_404(self):
+        respuesta = self.ajustar((self.cafe, -1), (self.ajeno, -1))
+
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertEqual(respuesta.data['detalle'][0]['producto_id'], self.ajeno.pk)
+        self.assertEqual((self.stock(self.cafe), self.stock(self.ajeno)), (3, 50))
+        self.assertEqual(MovimientoInventario.objects.count(), self.movimientos)
+
+    def test_reponer_un_producto_existente_suma_al_stock(self):
+        respuesta = self.cliente.post(
+            f'/productos/crear/usuario/{self.usuario.pk}/',
+            {'nombre': 'café', 'precio_compra': '6', 'precio_venta': '10', 'stock_inicial': 4}, format='json',
+        )
+
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual(respuesta.data['producto']['stock'], 7)
+        self.assertEqual(self.stock(self.cafe), 7)
+        self.assertTrue(MovimientoInventario.objects.filter(
+            producto=self.cafe, tipo=MovimientoInventario.REPOSICION, cantidad=4, stock_resultante=7,
+        ).exists())
+
+    def test_la_base_impide_stock_negativo(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Inventario.objects.filter(producto=self.cafe).update(stock=-1)
+
+
+class AjusteStockSinReturningTests(AjusteStockTests):
+    """Los mismos casos por el camino del ORM, el de los motores sin UPDATE ... RETURNING."""
+
+    def setUp(self):
+        super().setUp()
+        parche = mock.patch('Productos.services.inventario_service._admite_returning', return_value=False)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+
+@override_settings(BITACORA_ASINCRONA=False, SINCRONIZACION_MARGEN_SEGUNDOS=5)
+class SincronizacionTests(TestCase):
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        otro = Usuario.objects.create_user('otra@ejemplo.com', 'Otra tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.productos = [self.crear(f'Producto {n}', self.usuario) for n in range(3)]
+        self.crear('Ajeno', otro)
+        # El catálogo inicial cambió hace un minuto, fuera del margen
+        self.inicio = timezone.now()
+        hace_un_minuto = self.inicio - datetime.timedelta(minutes=1)
+        Producto.objects.update(fecha_actualizacion=hace_un_minuto)
+        Inventario.objects.update(fecha_actualizacion=hace_un_minuto)
+
+    @staticmethod
+    def crear(nombre, usuario):
+        producto = Producto.objects.create(nombre=nombre, precio_compra=6, precio_venta=10, usuario=usuario)
+        Inventario.objects.create(producto=producto, stock=5, cantidad_minima=0, cantidad_maxima=0)
+        return producto
+
+    def sincronizar(self, segundos=0, **parametros):
+        ahora = self.inicio + datetime.timedelta(seconds=segundos)
+        with mock.patch('Productos.services.sincronizacion_service.timezone.now', return_value=ahora):
+            respuesta = self.cliente.get(f'/productos/sincronizar/usuario/{self.usuario.pk}/', parametros)
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        return respuesta.data
+
+    @staticmethod
+    def ids(filas, campo='id'):
+        return [fila[campo] for fila in filas]
+
+    def test_catalogo_completo_por_paginas(self):
+        primera = self.sincronizar(page_size=2)
+        self.assertTrue(primera['hay_mas'])
+        self.assertEqual(self.ids(primera['productos']), [p.pk for p in self.productos[:2]])
+        self.assertEqual(self.ids(primera['inventarios'], 'producto_id'), [p.pk for p in self.productos[:2]])
+        self.assertEqual(primera['eliminados'], [])
+
+        segunda = self.sincronizar(page_size=2, cursor=primera['cursor'])
+        self.assertFalse(segunda['hay_mas'])
+        self.assertEqual(self.ids(segunda['productos']), [self.productos[2].pk])
+        self.assertEqual(self.ids(segunda['inventarios'], 'producto_id'), [self.productos[2].pk])
+
+    def test_cursor_trae_solo_cambios_y_marcas_de_borrado(self):
+        cursor = self.sincronizar()['cursor']
+        cafe, _, borrado = self.productos
+        inventario = Inventario.objects.get(producto=cafe)
+        inventario.stock = 9
+        inventario.save()
+        borrados = {(RegistroEliminado.PRODUCTO, borrado.pk), (RegistroEliminado.INVENTARIO, borrado.inventario.pk)}
+        borrado.delete()
+
+        cambios = self.sincronizar(segundos=10, cursor=cursor)
+        self.assertFalse(cambios['hay_mas'])
+        self.assertEqual(cambios['productos'], [])
+        self.assertEqual([(fila['producto_id'], fila['stock']) for fila in cambios['inventarios']], [(cafe.pk, 9)])
+        self.assertEqual({(fila['modelo'], fila['objeto_id']) for fila in cambios['eliminados']}, borrados)
+
+    def test_margen_retiene_cambios_recientes(self):
+        reciente = self.productos[0]
+        Producto.objects.filter(pk=reciente.pk).update(fecha_actualizacion=self.inicio - datetime.timedelta(seconds=2))
+
+        completo = self.sincronizar()
+        self.assertEqual(self.ids(completo['productos']), [p.pk for p in self.productos[1:]])
+
+        # Pasado el margen, el cambio llega con el cursor que ya se tenía
+        cambios = self.sincronizar(segundos=10, cursor=completo['cursor'])
+        self.assertEqual(self.ids(cambios['productos']), [reciente.pk])
+
+    def test_inventarios_se_filtran_por_su_propio_usuario(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.sincronizar()
+        tabla = Inventario._meta.db_table
+        consulta = next(q['sql'] for q in consultas if q['sql'].startswith('SELECT') and f'FROM "{tabla}"' in q['sql'])
+        self.assertNotIn('JOIN', consulta)
+
+    def test_cursor_invalido(self):
+        respuesta = self.cliente.get(f'/productos/sincronizar/usuario/{self.usuario.pk}/', {'cursor': 'basura'})
+        self.assertEqual(respuesta.status_code, 400)
@@ -1,14 +1,28 @@
 from django.urls import path
-from Productos.controllers.producto_controller import (ProductoListaCrearVista, ProductoDetalleVista, ProductosPorCategoriaView)
+from Productos.controllers.producto_controller import (ProductoListaCrearVista, ProductoDetalleVista, ProductosPorCategoriaView,
+                                                         ProductoBusquedaVista, ProductoImportacionVista, ProductoEscaneoVista)
+from Productos.controllers.kardex_controller import KardexVista, StockEnFechaVista
+from Productos.controllers.sincronizacion_controller import SincronizacionVista
 from Productos.controllers.categoria_controller import (CategoriaListaCrearVista, CategoriaDetalleVista)
-from Productos.controllers.inventario_controller import (InventarioListaCrearVista, InventarioDetalleVista)
+from Productos.controllers.inventario_controller import (InventarioListaCrearVista, InventarioDetalleVista,
+                                                          InventarioAjusteVista, InventarioAlertasVista,
+                                                          InventarioExportacionVista)
 
 urlpatterns = [
     path('crear/usuario/<int:usuario_id>/', ProductoListaCrearVista.as_view(), name='producto-lista-crear'),
     path('detalles/usuario/<int:usuario_id>/<int:pk>/', ProductoDetalleVista.as_view(), name='producto-detalle'),
     path('PorCategoria/usuario/<int:usuario_id>/categoria/<str:valor>/', ProductosPorCategoriaView.as_view(), name='productos-por-categoria'),
+    path('buscar/usuario/<int:usuario_id>/', ProductoBusquedaVista.as_view(), name='producto-buscar'),
+    path('escanear/usuario/<int:usuario_id>/<str:codigo>/', ProductoEscaneoVista.as_view(), name='producto-escanear'),
+    path('importar/usuario/<int:usuario_id>/', ProductoImportacionVista.as_view(), name='producto-importar'),
     path('categoria/usuario/<int:usuario_id>/', CategoriaListaCrearVista.as_view(), name='categorias-list-create'),
     path('categoria/usuario/<int:usuario_id>/<int:pk>/', CategoriaDetalleVista.as_view(), name='categorias-detail'),
+    path('sincronizar/usuario/<int:usuario_id>/', SincronizacionVista.as_view(), name='catalogo-sincronizar'),
     path('inventarios/', InventarioListaCrearVista.as_view(), name='inventario-listar-crear'),
     path('inventarios/<int:pk>/', InventarioDetalleVista.as_view(), name='inventario-detalle'),
+    path('inventarios/ajustar/usuario/<int:usuario_id>/', InventarioAjusteVista.as_view(), name='inventario-ajustar'),
+    path('inventarios/alertas/usuario/<int:usuario_id>/', InventarioAlertasVista.as_view(), name='inventario-alertas'),
+    path('inventarios/exportar/usuario/<int:usuario_id>/', InventarioExportacionVista.as_view(), name='inventario-exportar'),
+    path('inventarios/kardex/usuario/<int:usuario_id>/<int:producto_id>/', KardexVista.as_view(), name='inventario-kardex'),
+    path('inventarios/stock-en-fecha/usuario/<int:usuario_id>/<int:producto_id>/', StockEnFechaVista.as_view(), name='inventario-stock-en-fecha'),
 ]
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class TareasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'Tareas'
+
+    def ready(self):
+        # Cada aplicación registra sus tareas en un módulo tareas.py, como admin.py
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tareas')
@@ -0,0 +1,87 @@
+import logging
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from Tareas.services.cola_service import ejecutar, liberar_vencidas, reclamar
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Trabajador de la cola de tareas: reclama tareas pendientes con SELECT ... FOR UPDATE '
+        'SKIP LOCKED y las ejecuta en varios hilos, con reintentos espaciados. '
+        'Se pueden levantar varios procesos en paralelo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=settings.TAREAS_CONCURRENCIA,
+                            help='Tareas que se ejecutan a la vez en este proceso')
+        parser.add_argument('--tipos', help='Solo estos tipos de tarea, separados por comas')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa lo pendiente y termina en vez de esperar tareas nuevas')
+
+    def handle(self, *args, **options):
+        self.detener = threading.Event()
+        self.tipos = [tipo.strip() for tipo in (options['tipos'] or '').split(',') if tipo.strip()]
+        self.una_vez = options['una_vez']
+        self.resultados = {'completadas': 0, 'fallidas': 0}
+        self.bloqueo = threading.Lock()
+
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(senal, lambda *_: self.detener.set())
+
+        liberadas = liberar_vencidas()
+        if liberadas:
+            self.stdout.write(f'Tareas vencidas devueltas a la cola: {liberadas}.')
+
+        prefijo = f'{socket.gethostname()}:{os.getpid()}'
+        hilos = [
+            threading.Thread(target=self.trabajar, args=(f'{prefijo}:{numero}',), daemon=True)
+            for numero in range(max(options['hilos'], 1))
+        ]
+        for hilo in hilos:
+            hilo.start()
+        # join con tiempo para que las señales lleguen al hilo principal
+        while any(hilo.is_alive() for hilo in hilos):
+            for hilo in hilos:
+                hilo.join(0.5)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tareas completadas: {self.resultados['completadas']}. Con error: {self.resultados['fallidas']}."
+        ))
+
+    def trabajar(self, nombre):
+        try:
+            while not self.detener.is_set():
+                try:
+                    if not self.procesar(nombre):
+                        return
+                except DatabaseError:
+                    # Base caída o bloqueada: el hilo sigue vivo y reintenta con una conexión nueva
+                    logger.exception('Error de base de datos en el trabajador %s', nombre)
+                    connection.close()
+                    self.detener.wait(settings.TAREAS_INTERVALO_SEGUNDOS)
+        finally:
+            connection.close()
+
+    def procesar(self, nombre):
+        """Una vuelta del trabajador. Devuelve False cuando debe terminar."""
+        tareas = reclamar(nombre, tipos=self.tipos)
+        if not tareas:
+            if self.una_vez:
+                return False
+            self.detener.wait(settings.TAREAS_INTERVALO_SEGUNDOS)
+            liberar_vencidas()
+            return True
+        for tarea in tareas:
+            clave = 'completadas' if ejecutar(tarea) else 'fallidas'
+            with self.bloqueo:
+                self.resultados[clave] += 1
+        return True
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 15:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=100)),
+                ('datos', models.JSONField(blank=True, default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completada', 'Completada'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('max_intentos', models.PositiveIntegerField(default=5)),
+                ('disponible_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tomada_en', models.DateTimeField(blank=True, null=True)),
+                ('trabajador', models.CharField(blank=True, default='', max_length=100)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('estado', 'pendiente')), fields=['disponible_en', 'id'], name='tarea_pendiente_idx'), models.Index(condition=models.Q(('estado', 'en_proceso')), fields=['tomada_en'], name='tarea_en_proceso_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarea(models.Model):
+    """
+    Trabajo que se hace fuera de la petición (subida de imágenes, reportes,
+    facturas). Lo ejecuta el comando procesar_tareas; `tipo` es el nombre con
+    el que se registró la función en un módulo tareas.py.
+    """
+    PENDIENTE = 'pendiente'
+    EN_PROCESO = 'en_proceso'
+    COMPLETADA = 'completada'
+    FALLIDA = 'fallida'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (COMPLETADA, 'Completada'),
+        (FALLIDA, 'Fallida'),
+    ]
+
+    tipo = models.CharField(max_length=100)
+    datos = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    intentos = models.PositiveIntegerField(default=0)
+    max_intentos = models.PositiveIntegerField(default=5)
+    # No se toma antes de esta fecha: así se espacian los reintentos
+    disponible_en = models.DateTimeField(default=timezone.now)
+    tomada_en = models.DateTimeField(null=True, blank=True)
+    trabajador = models.CharField(max_length=100, blank=True, default='')
+    ultimo_error = models.TextField(blank=True, default='')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Índices parciales: la cola solo recorre las tareas pendientes o en proceso,
+        # no el historial de completadas
+        indexes = [
+            models.Index(fields=['disponible_en', 'id'], name='tarea_pendiente_idx',
+                         condition=models.Q(estado='pendiente')),
+            models.Index(fields=['tomada_en'], name='tarea_en_proceso_idx',
+                         condition=models.Q(estado='en_proceso')),
+        ]
+
+    def __str__(self):
+        return f'{self.tipo} #{self.pk} ({self.get_estado_display()})'
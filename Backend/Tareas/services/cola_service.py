@@ -0,0 +1,117 @@
+import datetime
+import logging
+import random
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from Tareas.models import Tarea
+
+logger = logging.getLogger(__name__)
+
+# tipo -> función; se llena con el decorador @tarea al importar los módulos tareas.py
+_registro = {}
+
+
+def tarea(tipo):
+    """Registra la función como ejecutora de las tareas de `tipo`. Recibe `datos` como argumentos con nombre."""
+    def registrar(funcion):
+        _registro[tipo] = funcion
+        return funcion
+    return registrar
+
+
+def encolar(tipo, datos=None, max_intentos=None, demora=None):
+    """
+    Agrega una tarea a la cola. La fila se inserta en la transacción en curso,
+    así que ningún trabajador la ve si esa transacción se revierte.
+    Con TAREAS_ASINCRONAS=False se ejecuta en el mismo proceso al confirmar.
+    """
+    if tipo not in _registro:
+        raise LookupError(f'Tipo de tarea no registrado: {tipo}')
+    datos = datos or {}
+    if not settings.TAREAS_ASINCRONAS:
+        transaction.on_commit(lambda: _registro[tipo](**datos))
+        return None
+    return Tarea.objects.create(
+        tipo=tipo,
+        datos=datos,
+        max_intentos=max_intentos or settings.TAREAS_MAX_INTENTOS,
+        disponible_en=timezone.now() + datetime.timedelta(seconds=demora or 0),
+    )
+
+
+def reclamar(trabajador, limite=1, tipos=None):
+    """
+    Toma hasta `limite` tareas pendientes con SELECT ... FOR UPDATE SKIP LOCKED:
+    varios trabajadores consultan a la vez sin esperarse ni tomar la misma fila.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        pendientes = Tarea.objects.select_for_update(skip_locked=True).filter(
+            estado=Tarea.PENDIENTE, disponible_en__lte=ahora
+        )
+        if tipos:
+            pendientes = pendientes.filter(tipo__in=tipos)
+        ids = list(pendientes.order_by('disponible_en', 'id').values_list('id', flat=True)[:limite])
+        if not ids:
+            return []
+        # La condición de estado cubre a los motores sin SKIP LOCKED, donde dos
+        # trabajadores pueden leer las mismas filas: solo uno las actualiza. En SQLite
+        # las transacciones deben abrirse con transaction_mode IMMEDIATE (ver settings)
+        Tarea.objects.filter(pk__in=ids, estado=Tarea.PENDIENTE).update(
+            estado=Tarea.EN_PROCESO, tomada_en=ahora, trabajador=trabajador, intentos=F('intentos') + 1
+        )
+    return list(Tarea.objects.filter(pk__in=ids, estado=Tarea.EN_PROCESO, trabajador=trabajador, tomada_en=ahora))
+
+
+def espera_reintento(intentos):
+    """Segundos hasta el próximo intento: crece exponencialmente, con tope y algo de azar."""
+    base = min(settings.TAREAS_REINTENTO_BASE_SEGUNDOS * 2 ** max(intentos - 1, 0),
+               settings.TAREAS_REINTENTO_MAXIMO_SEGUNDOS)
+    return base * random.uniform(0.8, 1.2)
+
+
+def ejecutar(tarea_actual):
+    """
+    Ejecuta una tarea reclamada dentro de una transacción. Si falla se
+    reprograma con espera creciente o, agotados los intentos, queda fallida.
+    Devuelve True si terminó bien.
+    """
+    propia = Tarea.objects.filter(pk=tarea_actual.pk, estado=Tarea.EN_PROCESO, trabajador=tarea_actual.trabajador)
+    try:
+        funcion = _registro.get(tarea_actual.tipo)
+        if funcion is None:
+            raise LookupError(f'Tipo de tarea no registrado: {tarea_actual.tipo}')
+        with transaction.atomic():
+            funcion(**tarea_actual.datos)
+    except Exception:
+        logger.exception('Falló la tarea %s #%s (intento %s)', tarea_actual.tipo, tarea_actual.pk, tarea_actual.intentos)
+        error = traceback.format_exc()
+        if tarea_actual.intentos >= tarea_actual.max_intentos:
+            propia.update(estado=Tarea.FALLIDA, ultimo_error=error, fecha_fin=timezone.now())
+        else:
+            propia.update(
+                estado=Tarea.PENDIENTE, ultimo_error=error,
+                disponible_en=timezone.now() + datetime.timedelta(seconds=espera_reintento(tarea_actual.intentos)),
+            )
+        return False
+
+    propia.update(estado=Tarea.COMPLETADA, ultimo_error='', fecha_fin=timezone.now())
+    return True
+
+
+def liberar_vencidas():
+    """
+    Devuelve a la cola las tareas en proceso por más de TAREAS_TIEMPO_LIMITE_SEGUNDOS
+    (el trabajador murió a mitad de camino). Devuelve cuántas se liberaron.
+    """
+    limite = timezone.now() - datetime.timedelta(seconds=settings.TAREAS_TIEMPO_LIMITE_SEGUNDOS)
+    vencidas = Tarea.objects.filter(estado=Tarea.EN_PROCESO, tomada_en__lt=limite)
+    agotadas = vencidas.filter(intentos__gte=F('max_intentos')).update(
+        estado=Tarea.FALLIDA, ultimo_error='Tiempo límite agotado.', fecha_fin=timezone.now()
+    )
+    return agotadas + vencidas.update(estado=Tarea.PENDIENTE, disponible_en=timezone.now())
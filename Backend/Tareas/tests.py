@@ -0,0 +1,107 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from Tareas.models import Tarea
+from Tareas.services.cola_service import encolar, ejecutar, espera_reintento, liberar_vencidas, reclamar, tarea
+
+llamadas = []
+
+
+@tarea('pruebas.anotar')
+def anotar(valor):
+    llamadas.append(valor)
+
+
+@tarea('pruebas.fallar')
+def fallar():
+    raise RuntimeError('falla de prueba')
+
+
+@override_settings(TAREAS_ASINCRONAS=True, TAREAS_REINTENTO_BASE_SEGUNDOS=30, TAREAS_REINTENTO_MAXIMO_SEGUNDOS=600)
+class ColaTareasTests(TestCase):
+
+    def setUp(self):
+        llamadas.clear()
+
+    def test_encolar_tipo_no_registrado(self):
+        with self.assertRaises(LookupError):
+            encolar('pruebas.inexistente')
+
+    @override_settings(TAREAS_ASINCRONAS=False)
+    def test_encolar_sincrono_ejecuta_al_confirmar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(encolar('pruebas.anotar', {'valor': 1}))
+            self.assertEqual(llamadas, [])
+        self.assertEqual(llamadas, [1])
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_reclamar_toma_cada_tarea_una_sola_vez(self):
+        creada = encolar('pruebas.anotar', {'valor': 1})
+
+        tomadas = reclamar('trabajador-1')
+        self.assertEqual([t.pk for t in tomadas], [creada.pk])
+        self.assertEqual(tomadas[0].estado, Tarea.EN_PROCESO)
+        self.assertEqual(tomadas[0].intentos, 1)
+        self.assertEqual(tomadas[0].trabajador, 'trabajador-1')
+        self.assertEqual(reclamar('trabajador-2'), [])
+
+    def test_reclamar_respeta_disponible_en_y_tipos(self):
+        encolar('pruebas.anotar', {'valor': 1}, demora=60)
+        otra = encolar('pruebas.fallar')
+
+        self.assertEqual(reclamar('trabajador', tipos=['pruebas.anotar']), [])
+        self.assertEqual([t.pk for t in reclamar('trabajador', limite=5)], [otra.pk])
+
+    def test_ejecutar_completa_la_tarea(self):
+        creada = encolar('pruebas.anotar', {'valor': 7})
+        self.assertTrue(ejecutar(reclamar('trabajador')[0]))
+
+        creada.refresh_from_db()
+        self.assertEqual(creada.estado, Tarea.COMPLETADA)
+        self.assertIsNotNone(creada.fecha_fin)
+        self.assertEqual(llamadas, [7])
+
+    def test_fallo_reprograma_con_espera_y_luego_queda_fallida(self):
+        creada = encolar('pruebas.fallar', max_intentos=2)
+
+        antes = timezone.now()
+        with self.assertLogs('Tareas.services.cola_service', 'ERROR'):
+            self.assertFalse(ejecutar(reclamar('trabajador')[0]))
+        creada.refresh_from_db()
+        self.assertEqual(creada.estado, Tarea.PENDIENTE)
+        self.assertIn('falla de prueba', creada.ultimo_error)
+        # Primer reintento: 30 s ± 20 %
+        self.assertGreaterEqual(creada.disponible_en, antes + datetime.timedelta(seconds=24))
+        self.assertEqual(reclamar('trabajador'), [])
+
+        Tarea.objects.filter(pk=creada.pk).update(disponible_en=timezone.now())
+        with self.assertLogs('Tareas.services.cola_service', 'ERROR'):
+            self.assertFalse(ejecutar(reclamar('trabajador')[0]))
+        creada.refresh_from_db()
+        self.assertEqual(creada.estado, Tarea.FALLIDA)
+        self.assertEqual(creada.intentos, 2)
+        self.assertEqual(reclamar('trabajador'), [])
+
+    def test_espera_reintento_crece_con_tope(self):
+        with mock.patch('Tareas.services.cola_service.random.uniform', return_value=1):
+            self.assertEqual([espera_reintento(n) for n in (1, 2, 3, 10)], [30, 60, 120, 600])
+        for _ in range(20):
+            self.assertTrue(24 <= espera_reintento(1) <= 36)
+
+    @override_settings(TAREAS_TIEMPO_LIMITE_SEGUNDOS=60)
+    def test_liberar_vencidas(self):
+        abandonada = encolar('pruebas.anotar', {'valor': 1})
+        agotada = encolar('pruebas.anotar', {'valor': 2}, max_intentos=1)
+        reciente = encolar('pruebas.anotar', {'valor': 3})
+        reclamar('trabajador', limite=3)
+        hace_rato = timezone.now() - datetime.timedelta(minutes=5)
+        Tarea.objects.filter(pk__in=[abandonada.pk, agotada.pk]).update(tomada_en=hace_rato)
+
+        self.assertEqual(liberar_vencidas(), 2)
+        estados = dict(Tarea.objects.values_list('pk', 'estado'))
+        self.assertEqual(estados[abandonada.pk], Tarea.PENDIENTE)
+        self.assertEqual(estados[agotada.pk], Tarea.FALLIDA)
+        self.assertEqual(estados[reciente.pk], Tarea.EN_PROCESO)
@@ -1,7 +1,9 @@
 from django.contrib import admin
-from .models import Pedido, Estado, TipoVenta,DetallePedido
+from .models import Pedido, Estado, TipoVenta,DetallePedido, ResumenVentaDiario, ResumenVentaMensual
 # Register your models here.
 admin.site.register(Pedido),
 admin.site.register(Estado),
 admin.site.register(TipoVenta),
-admin.site.register(DetallePedido)
+admin.site.register(DetallePedido),
+admin.site.register(ResumenVentaDiario),
+admin.site.register(ResumenVentaMensual)
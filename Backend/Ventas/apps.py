@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VentasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Ventas'
+
+    def ready(self):
+        import Ventas.signals  # noqa: F401
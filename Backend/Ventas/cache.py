@@ -0,0 +1,74 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# Tablas globales (Estado, TipoVenta) que casi nunca cambian. Cada proceso guarda
+# sus filas en memoria; una versión compartida en la caché de Django indica
+# cuándo hay que volver a leerlas.
+CLAVE_VERSION = 'ventas:tablas:version'
+
+_tablas = {}
+
+
+def version_tablas():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        inicial = time.time_ns()
+        cache.add(CLAVE_VERSION, inicial, timeout=None)
+        version = cache.get(CLAVE_VERSION, inicial)
+    return version
+
+
+def _incrementar_version():
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, time.time_ns(), timeout=None)
+
+
+def invalidar_tablas():
+    """Descarta las tablas en memoria de todos los procesos al confirmar la transacción."""
+    transaction.on_commit(_incrementar_version)
+
+
+def _cargar(modelo):
+    version = version_tablas()
+    entrada = _tablas.get(modelo._meta.label)
+    if entrada is None or entrada['version'] != version:
+        entrada = {
+            'version': version,
+            'registros': {registro.pk: registro for registro in modelo.objects.order_by('pk')},
+            'lista': None,
+        }
+        _tablas[modelo._meta.label] = entrada
+    return entrada
+
+
+def obtener_por_pk(modelo, pk):
+    """
+    Devuelve la instancia con esa clave desde memoria, o None si no existe.
+    Un fallo se confirma contra la base por si la versión aún no llegó a este proceso.
+    """
+    registro = _cargar(modelo)['registros'].get(pk)
+    if registro is None:
+        registro = modelo.objects.filter(pk=pk).first()
+        if registro is not None:
+            _tablas.pop(modelo._meta.label, None)
+    return registro
+
+
+def obtener_lista(modelo, serializer_class):
+    """
+    Devuelve (datos serializados, etag) de toda la tabla. El etag se calcula
+    sobre el contenido, así que coincide entre procesos con los mismos datos.
+    """
+    entrada = _cargar(modelo)
+    if entrada['lista'] is None:
+        datos = serializer_class(list(entrada['registros'].values()), many=True).data
+        contenido = json.dumps(datos, cls=DjangoJSONEncoder, sort_keys=True)
+        entrada['lista'] = (datos, hashlib.md5(contenido.encode()).hexdigest())
+    return entrada['lista']
@@ -5,14 +5,15 @@ from Ventas.models import Estado
 from Ventas.serializers import EstadoSerializer
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
+from Ventas.cache import obtener_lista
+from backend.cache_http import responder_con_etag
 
 class EstadoListCreateAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        estados = Estado.objects.all()
-        serializer = EstadoSerializer(estados, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        datos, etag = obtener_lista(Estado, EstadoSerializer)
+        return responder_con_etag(request, datos, etag)
 
     def post(self, request):
         serializer = EstadoSerializer(data=request.data)
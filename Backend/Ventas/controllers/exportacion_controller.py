@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from backend.exportacion import ExportacionError, exportar_desde_peticion
+from Ventas.services.exportacion_service import EXPORTACIONES
+
+
+class ExportacionVentasAPIView(APIView):
+    """
+    Descarga en CSV o XLSX los pedidos o las líneas vendidas del usuario, sin
+    armar el archivo en memoria. Parámetros opcionales: formato (csv|xlsx),
+    columnas (separadas por comas), desde y hasta (AAAA-MM-DD).
+    """
+
+    def get(self, request, conjunto, usuario_id):
+        exportar = EXPORTACIONES.get(conjunto)
+        if exportar is None:
+            return Response(
+                {"error": f"Exportación desconocida. Usa: {', '.join(EXPORTACIONES)}."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            return exportar_desde_peticion(request, f'{conjunto}_{usuario_id}', exportar, usuario_id)
+        except ExportacionError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
@@ -1,26 +1,63 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from Productos.models import  Inventario, Producto
-from Ventas.models import Pedido, DetallePedido
-from Ventas.serializers import PedidoSerializer
-from django.db import transaction
-from django.shortcuts import get_object_or_404
-from rest_framework.permissions import AllowAny
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
-from Productos.models import Inventario, Producto
 from Ventas.models import Pedido
-from Ventas.serializers import PedidoSerializer
-from django.db import transaction
-from django.shortcuts import get_object_or_404
+from Ventas.serializers import PedidoSerializer, PedidoLoteSerializer
+from Ventas.services.checkout_service import CheckoutError
+from Ventas.services.lote_service import CREADO, registrar_lote
+from backend.pagination import CursorPaginacionPredeterminada, PaginacionMixin
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+
+
+class PedidoPaginacion(CursorPaginacionPredeterminada):
+    # El historial crece sin límite: se pagina aunque el cliente no lo pida
+    ordering = '-id'
+
+
+class PedidoListCreateAPIView(PaginacionMixin, APIView):
+    pagination_class = PedidoPaginacion
+
+    def filtrar(self, pedidos, params):
+        """
+        Aplica los filtros opcionales fecha_desde, fecha_hasta (AAAA-MM-DD), estado y tipo_venta.
+        Devuelve (queryset, errores).
+        """
+        errores = {}
+        for parametro, lookup in (('fecha_desde', 'fecha__gte'), ('fecha_hasta', 'fecha__lte')):
+            valor = params.get(parametro)
+            if valor:
+                try:
+                    fecha = parse_date(valor)
+                except ValueError:
+                    fecha = None
+                if fecha is None:
+                    errores[parametro] = 'Fecha inválida, usa el formato AAAA-MM-DD.'
+                else:
+                    pedidos = pedidos.filter(**{lookup: fecha})
+
+        for parametro in ('estado', 'tipo_venta'):
+            valor = params.get(parametro)
+            if valor:
+                if not valor.isdigit():
+                    errores[parametro] = 'Debe ser un ID numérico.'
+                else:
+                    pedidos = pedidos.filter(**{f'{parametro}_id': int(valor)})
+        return pedidos, errores
+
+    @staticmethod
+    def pedido_existente(usuario_id, clave):
+        if not clave:
+            return None
+        return Pedido.objects.con_detalles().filter(usuario_id=usuario_id, clave_idempotencia=clave).first()
 
-class PedidoListCreateAPIView(APIView):
     def get(self, request, usuario_id):
-        pedidos = Pedido.objects.filter(usuario_id=usuario_id)
-        serializer = PedidoSerializer(pedidos, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        pedidos = Pedido.objects.filter(usuario_id=usuario_id).con_detalles()
+        pedidos, errores = self.filtrar(pedidos, request.query_params)
+        if errores:
+            return Response(errores, status=status.HTTP_400_BAD_REQUEST)
+        return self.responder_lista(request, pedidos, PedidoSerializer)
 
     @transaction.atomic
     def post(self, request, usuario_id):
@@ -34,36 +71,76 @@ class PedidoListCreateAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Verificar stock de todos los productos primero
-        for detalle in detalles_data:
-            producto = get_object_or_404(Producto, pk=detalle['producto_id'])
-            try:
-                inventario = Inventario.objects.get(producto=producto,  producto__usuario_id=usuario_id)
-            except Inventario.DoesNotExist:
-                return Response(
-                    {"error": f"No hay inventario registrado para el producto {producto.nombre}."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            if inventario.stock < detalle['cantidad']:
-                return Response(
-                    {"error": f"Stock insuficiente para {producto.nombre}."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        # Ahora que el stock está validado, crear pedido y detalles
+        # Un reintento con la misma clave devuelve el pedido ya registrado
+        clave = data.get('clave_idempotencia')
+        existente = self.pedido_existente(usuario_id, clave)
+        if existente is not None:
+            return Response(PedidoSerializer(existente).data, status=status.HTTP_200_OK)
+
         pedido_serializer = PedidoSerializer(data=data)
-        if pedido_serializer.is_valid():
-            pedido = pedido_serializer.save()
+        if not pedido_serializer.is_valid():
+            return Response(pedido_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            # Descontar stock ahora sí
-            for detalle in detalles_data:
-                producto = get_object_or_404(Producto, pk=detalle['producto_id'])
-                inventario = Inventario.objects.get(producto=producto, producto__usuario_id=usuario_id)
+        # El checkout valida y descuenta el stock de toda la canasta de una sola vez
+        try:
+            with transaction.atomic():
+                pedido = pedido_serializer.save(detalles=detalles_data)
+        except CheckoutError as error:
+            return Response({"error": error.mensaje}, status=error.status_code)
+        except IntegrityError:
+            # Otro envío con la misma clave se confirmó primero
+            existente = self.pedido_existente(usuario_id, clave)
+            if existente is None:
+                raise
+            return Response(PedidoSerializer(existente).data, status=status.HTTP_200_OK)
 
-                inventario.stock -= detalle['cantidad']
-                inventario.save()
+        pedido = Pedido.objects.con_detalles().get(pk=pedido.pk)
+        return Response(PedidoSerializer(pedido).data, status=status.HTTP_201_CREATED)
 
-            return Response(PedidoSerializer(pedido).data, status=status.HTTP_201_CREATED)
 
-        return Response(pedido_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+class PedidoLoteAPIView(APIView):
+    """
+    Carga en una sola petición las ventas que una caja acumuló sin conexión:
+    {"pedidos": [{"clave_idempotencia", "estado", "tipo_venta", "detalles", "fecha"?}, ...]}.
+    `fecha` (AAAA-MM-DD) es el día en que se hizo la venta en la caja.
+    Responde el resultado de cada pedido en el mismo orden: creado, duplicado
+    (la clave ya estaba registrada), rechazado o invalido.
+    """
+
+    def post(self, request, usuario_id):
+        pedidos = request.data.get('pedidos') if isinstance(request.data, dict) else None
+        if not isinstance(pedidos, list) or not pedidos:
+            return Response({"error": "Debes enviar una lista 'pedidos' no vacía."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(pedidos) > settings.VENTAS_LOTE_MAXIMO:
+            return Response(
+                {"error": f"El lote admite como máximo {settings.VENTAS_LOTE_MAXIMO} pedidos."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        resultados, validos = {}, []
+        for indice, datos in enumerate(pedidos):
+            serializer = PedidoLoteSerializer(data=datos)
+            if serializer.is_valid():
+                validos.append((indice, serializer.validated_data))
+            else:
+                resultados[indice] = {
+                    'clave_idempotencia': datos.get('clave_idempotencia') if isinstance(datos, dict) else None,
+                    'resultado': 'invalido',
+                    'errores': serializer.errors,
+                }
+
+        try:
+            resultados.update(registrar_lote(usuario_id, validos))
+        except CheckoutError as error:
+            return Response({"error": error.mensaje}, status=status.HTTP_409_CONFLICT)
+        except IntegrityError:
+            # Un envío concurrente del mismo lote registró alguna clave primero; al reintentar saldrá como duplicado
+            return Response(
+                {"error": "Otro envío con las mismas claves se registró al mismo tiempo. Reintenta el lote."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({
+            'creados': sum(1 for resultado in resultados.values() if resultado['resultado'] == CREADO),
+            'resultados': [{'indice': indice, **resultados[indice]} for indice in sorted(resultados)],
+        })
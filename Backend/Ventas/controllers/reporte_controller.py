@@ -0,0 +1,56 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from Ventas.models import ResumenVentaDiario, ResumenVentaMensual
+from Ventas.serializers import ResumenVentaSerializer
+from django.db.models import F, Sum
+from django.utils.dateparse import parse_date
+
+
+class ReporteVentasAPIView(APIView):
+    """
+    Reporte de ventas por día o por mes. Lee solo las tablas de resumen, nunca Pedido.
+    """
+    periodos = {
+        'dia': (ResumenVentaDiario, 'dia'),
+        'mes': (ResumenVentaMensual, 'mes'),
+    }
+
+    def get(self, request, usuario_id):
+        """
+        Parámetros: periodo (dia | mes, por defecto dia), desde y hasta (AAAA-MM-DD).
+        """
+        periodo = request.query_params.get('periodo', 'dia')
+        if periodo not in self.periodos:
+            return Response({'periodo': "Usa 'dia' o 'mes'."}, status=status.HTTP_400_BAD_REQUEST)
+        modelo, campo = self.periodos[periodo]
+
+        resumenes = modelo.objects.filter(usuario_id=usuario_id)
+        for parametro, lookup in (('desde', 'gte'), ('hasta', 'lte')):
+            valor = request.query_params.get(parametro)
+            if not valor:
+                continue
+            try:
+                fecha = parse_date(valor)
+            except ValueError:
+                fecha = None
+            if fecha is None:
+                return Response({parametro: 'Fecha inválida, usa el formato AAAA-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+            if periodo == 'mes':
+                fecha = fecha.replace(day=1)
+            resumenes = resumenes.filter(**{f'{campo}__{lookup}': fecha})
+
+        filas = resumenes.order_by(campo).annotate(periodo=F(campo), ganancia=F('ingresos') - F('costo')).values(
+            'periodo', 'ingresos', 'costo', 'ganancia', 'pedidos', 'unidades'
+        )
+        totales = resumenes.aggregate(
+            ingresos=Sum('ingresos'), costo=Sum('costo'), pedidos=Sum('pedidos'), unidades=Sum('unidades')
+        )
+        totales = {clave: valor or 0 for clave, valor in totales.items()}
+        totales['ganancia'] = totales['ingresos'] - totales['costo']
+
+        return Response({
+            'periodo': periodo,
+            'resultados': ResumenVentaSerializer(filas, many=True).data,
+            'totales': ResumenVentaSerializer(totales).data,
+        }, status=status.HTTP_200_OK)
@@ -5,14 +5,15 @@ from Ventas.models import TipoVenta
 from Ventas.serializers import TipoVentaSerializer
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
+from Ventas.cache import obtener_lista
+from backend.cache_http import responder_con_etag
 
 class TipoVentaListCreateAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        tipos = TipoVenta.objects.all()
-        serializer = TipoVentaSerializer(tipos, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        datos, etag = obtener_lista(TipoVenta, TipoVentaSerializer)
+        return responder_con_etag(request, datos, etag)
 
     def post(self, request):
         serializer = TipoVentaSerializer(data=request.data)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Ventas.services.resumen_service import reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los resúmenes de ventas diarios y mensuales a partir de los pedidos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', type=int, help='Reconstruir solo los resúmenes de este usuario')
+
+    def handle(self, *args, **options):
+        dias = reconstruir_resumenes(options['usuario'])
+        self.stdout.write(self.style.SUCCESS(f'Resúmenes reconstruidos: {dias} días.'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 14:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Ventas', '0007_remove_pedido_cliente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['usuario', 'fecha'], name='pedido_usuario_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 14:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Ventas', '0009_pedido_usuario_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenVentaDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('costo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pedidos', models.PositiveIntegerField(default=0)),
+                ('unidades', models.PositiveBigIntegerField(default=0)),
+                ('dia', models.DateField()),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'dia'), name='resumen_diario_usuario_dia_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenVentaMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('costo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pedidos', models.PositiveIntegerField(default=0)),
+                ('unidades', models.PositiveBigIntegerField(default=0)),
+                ('mes', models.DateField()),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'mes'), name='resumen_mensual_usuario_mes_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-18 15:20
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def copiar_precios_actuales(apps, schema_editor):
+    # Las líneas anteriores no guardaron precio: se usa el precio actual del producto
+    DetallePedido = apps.get_model('Ventas', 'DetallePedido')
+    Producto = apps.get_model('Productos', 'Producto')
+    productos = Producto.objects.filter(pk=OuterRef('producto_id'))
+    DetallePedido.objects.update(
+        precio_unitario=Subquery(productos.values('precio_venta')[:1]),
+        costo_unitario=Subquery(productos.values('precio_compra')[:1]),
+    )
+    DetallePedido.objects.update(subtotal=F('cantidad') * F('precio_unitario'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0008_indices_usuario_nombre'),
+        ('Ventas', '0010_resumenes_venta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detallepedido',
+            name='costo_unitario',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='detallepedido',
+            name='precio_unitario',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='detallepedido',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+            preserve_default=False,
+        ),
+        # El índice va antes del backfill: PostgreSQL no permite DDL con eventos de trigger pendientes
+        migrations.AddIndex(
+            model_name='detallepedido',
+            index=models.Index(fields=['producto'], include=('cantidad', 'subtotal', 'costo_unitario'), name='detalle_producto_ventas_idx'),
+        ),
+        migrations.RunPython(copiar_precios_actuales, migrations.RunPython.noop),
+    ]
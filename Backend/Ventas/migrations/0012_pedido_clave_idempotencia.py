@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Ventas', '0011_detallepedido_precios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pedido',
+            name='clave_idempotencia',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='pedido',
+            constraint=models.UniqueConstraint(fields=('usuario', 'clave_idempotencia'), name='pedido_usuario_clave_unica'),
+        ),
+    ]
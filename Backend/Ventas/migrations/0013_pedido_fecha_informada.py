@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 15:27
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Ventas', '0012_pedido_clave_idempotencia'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pedido',
+            name='fecha',
+            field=models.DateField(default=datetime.date.today, editable=False),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import datetime
+
 from django.db import models
 from accounts.models import Usuario
 from Productos.models import Producto
@@ -20,12 +22,37 @@ class TipoVenta(models.Model):
     def __str__(self):
         return self.descripcion
 
+class PedidoQuerySet(models.QuerySet):
+    def con_detalles(self):
+        """Carga los detalles con su producto en una sola consulta adicional."""
+        return self.prefetch_related(
+            models.Prefetch('detalles', queryset=DetallePedido.objects.select_related('producto').order_by('id'))
+        )
+
+
 class Pedido(models.Model):
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
-    fecha = models.DateField(auto_now_add=True)
+    # Hoy, salvo en las ventas cargadas sin conexión, que traen la fecha en que se hicieron
+    fecha = models.DateField(default=datetime.date.today, editable=False)
     estado = models.ForeignKey(Estado, on_delete=models.CASCADE)  
     total = models.DecimalField(max_digits=10, decimal_places=2)
     tipo_venta = models.ForeignKey(TipoVenta, on_delete=models.CASCADE)
+    # Clave que genera la caja para que un reintento no duplique la venta
+    clave_idempotencia = models.CharField(max_length=64, null=True, blank=True)
+
+    objects = PedidoQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Los pedidos sin clave (NULL) no chocan entre sí
+            models.UniqueConstraint(fields=['usuario', 'clave_idempotencia'], name='pedido_usuario_clave_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['usuario', 'fecha'], name='pedido_usuario_fecha_idx'),
+            # Historial paginado por cursor: WHERE usuario_id = X AND id < c ORDER BY id DESC
+            models.Index(fields=['usuario', '-id'], name='pedido_usuario_id_idx'),
+        ]
+
     def __str__(self):
         return f"Pedido #{self.id} - Usuario {self.usuario.correo}"
 
@@ -34,6 +61,16 @@ class DetallePedido(models.Model):
     pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='detalles')
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE)
     cantidad = models.PositiveIntegerField()
+    # Precios vigentes al momento de la venta
+    precio_unitario = models.DecimalField(max_digits=10, decimal_places=2)
+    costo_unitario = models.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            # Índice cubriente: ventas y margen por producto sin leer la tabla
+            models.Index(fields=['producto'], include=['cantidad', 'subtotal', 'costo_unitario'], name='detalle_producto_ventas_idx'),
+        ]
 
     def __str__(self):
         return f"{self.producto.nombre} x{self.cantidad}"
@@ -52,3 +89,39 @@ class Factura(models.Model):
     def __str__(self):
         return f"Factura #{self.id} - Venta #{self.venta.id}"
 
+
+
+# Resúmenes de ventas mantenidos por el checkout (ver Ventas/services/resumen_service.py)
+class ResumenVenta(models.Model):
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    costo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pedidos = models.PositiveIntegerField(default=0)
+    unidades = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class ResumenVentaDiario(ResumenVenta):
+    dia = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'dia'], name='resumen_diario_usuario_dia_unico'),
+        ]
+
+    def __str__(self):
+        return f"Ventas {self.dia} - Usuario {self.usuario_id}"
+
+
+class ResumenVentaMensual(ResumenVenta):
+    mes = models.DateField()  # Primer día del mes
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'mes'], name='resumen_mensual_usuario_mes_unico'),
+        ]
+
+    def __str__(self):
+        return f"Ventas {self.mes:%Y-%m} - Usuario {self.usuario_id}"
@@ -1,9 +1,32 @@
 # ventas/serializers.py
 
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Estado, TipoVenta, Factura, Pedido, DetallePedido, Cliente
 from accounts.models import Usuario
 from Productos.models import Producto
+from Ventas.services.checkout_service import registrar_pedido
+from Ventas.cache import obtener_por_pk
+
+
+class TablaCacheadaField(serializers.PrimaryKeyRelatedField):
+    """Valida la clave de Estado o TipoVenta contra la tabla en memoria, sin consultar la base."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        registro = obtener_por_pk(self.get_queryset().model, pk)
+        if registro is None:
+            self.fail('does_not_exist', pk_value=data)
+        return registro
+
 
 class EstadoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,8 +39,6 @@ class ClienteSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre']
 
 class TipoVentaSerializer(serializers.ModelSerializer):
-    estado = EstadoSerializer()
-
     class Meta:
         model = TipoVenta
         fields = '__all__'
@@ -28,40 +49,68 @@ class DetallePedidoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DetallePedido
-        fields = ['id', 'producto', 'producto_id', 'cantidad']
-        read_only_fields = ['id']
+        fields = ['id', 'producto', 'producto_id', 'cantidad', 'precio_unitario', 'subtotal']
+        read_only_fields = ['id', 'precio_unitario', 'subtotal']
 
 
 class PedidoSerializer(serializers.ModelSerializer):
     detalles = DetallePedidoSerializer(many=True, read_only=True)  
     detalles_input = DetallePedidoSerializer(many=True, write_only=True, required=False)
+    estado = TablaCacheadaField(queryset=Estado.objects.all())
+    tipo_venta = TablaCacheadaField(queryset=TipoVenta.objects.all())
 
     class Meta:
         model = Pedido
-        fields = ['id', 'usuario', 'fecha', 'estado', 'total', 'tipo_venta', 'detalles','detalles_input']
+        fields = ['id', 'usuario', 'fecha', 'estado', 'total', 'tipo_venta', 'clave_idempotencia', 'detalles','detalles_input']
         read_only_fields = ['id', 'total']
 
     def create(self, validated_data):
-        detalles_data = validated_data.pop('detalles', [])
-
-        # Crear el pedido sin el total aún
-        pedido = Pedido.objects.create(total=0, **validated_data)
-
-        total = 0
-        for detalle in detalles_data:
-            subtotal = detalle['producto'].precio_venta * detalle['cantidad']
-            DetallePedido.objects.create(
-                pedido=pedido,
-                producto=detalle['producto'],
-                cantidad=detalle['cantidad']
+        detalles_data = validated_data.pop('detalles', None)
+        detalles_input = validated_data.pop('detalles_input', [])
+        if detalles_data is None:
+            detalles_data = [
+                {'producto_id': detalle['producto'].pk, 'cantidad': detalle['cantidad']}
+                for detalle in detalles_input
+            ]
+
+        # El motor de checkout crea el pedido, los detalles y descuenta el stock
+        return registrar_pedido(
+            usuario_id=validated_data['usuario'].pk,
+            estado=validated_data['estado'],
+            tipo_venta=validated_data['tipo_venta'],
+            detalles=detalles_data,
+            clave_idempotencia=validated_data.get('clave_idempotencia'),
+        )
+
+
+class PedidoLoteSerializer(serializers.Serializer):
+    """Un pedido dentro de la carga por lotes de ventas hechas sin conexión."""
+    clave_idempotencia = serializers.CharField(max_length=64)
+    estado = TablaCacheadaField(queryset=Estado.objects.all())
+    tipo_venta = TablaCacheadaField(queryset=TipoVenta.objects.all())
+    detalles = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    # Día en que se hizo la venta en la caja; sin él se usa la fecha de la carga
+    fecha = serializers.DateField(required=False)
+
+    def validate_fecha(self, valor):
+        hoy = timezone.localdate()
+        # Un día de tolerancia por cajas en otra zona horaria
+        if valor > hoy + datetime.timedelta(days=1):
+            raise serializers.ValidationError("La fecha de la venta no puede ser futura.")
+        if valor < hoy - datetime.timedelta(days=settings.VENTAS_LOTE_ANTIGUEDAD_DIAS):
+            raise serializers.ValidationError(
+                f"La venta tiene más de {settings.VENTAS_LOTE_ANTIGUEDAD_DIAS} días; regístrala manualmente."
             )
-            total += subtotal
+        return valor
 
-        # Actualizar el total del pedido
-        pedido.total = total
-        pedido.save()
 
-        return pedido
+class ResumenVentaSerializer(serializers.Serializer):
+    periodo = serializers.DateField(required=False)  # Ausente en la fila de totales
+    ingresos = serializers.DecimalField(max_digits=14, decimal_places=2)
+    costo = serializers.DecimalField(max_digits=14, decimal_places=2)
+    ganancia = serializers.DecimalField(max_digits=14, decimal_places=2)
+    pedidos = serializers.IntegerField()
+    unidades = serializers.IntegerField()
 
     
 class FacturaSerializer(serializers.ModelSerializer):
@@ -0,0 +1,163 @@
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from rest_framework import status
+
+from Productos.cache import invalidar_catalogo, invalidar_escaneo
+from Productos.models import Inventario, MovimientoInventario, Producto
+from Productos.services.kardex_service import registrar_movimientos
+from Ventas.models import Pedido, DetallePedido
+from Ventas.services.resumen_service import acumular_venta
+
+
+class CheckoutError(Exception):
+    """
+    Error de negocio al registrar un pedido. Lleva el mensaje y el código HTTP
+    con el que debe responder el controlador.
+    """
+
+    def __init__(self, mensaje, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status_code = status_code
+
+
+def agrupar_detalles(detalles):
+    """
+    Normaliza las líneas del pedido a {producto_id: cantidad}, sumando las
+    líneas repetidas del mismo producto.
+    """
+    cantidades = {}
+    for detalle in detalles:
+        try:
+            producto_id = int(detalle['producto_id'])
+            cantidad = int(detalle['cantidad'])
+        except (KeyError, TypeError, ValueError):
+            raise CheckoutError("Cada detalle debe incluir 'producto_id' y 'cantidad' numéricos.")
+        if cantidad <= 0:
+            raise CheckoutError("La cantidad de cada detalle debe ser mayor a cero.")
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+    return cantidades
+
+
+def bloquear_inventarios(usuario_id, producto_ids):
+    """
+    Carga y bloquea (SELECT ... FOR UPDATE) en una sola consulta los inventarios
+    de los productos del usuario. El orden por producto_id evita interbloqueos
+    entre cajas que venden los mismos productos.
+    """
+    inventarios = (
+        Inventario.objects
+        .select_for_update(of=('self',))
+        .select_related('producto')
+        .filter(producto_id__in=producto_ids, producto__usuario_id=usuario_id)
+        .order_by('producto_id')
+    )
+    return {inventario.producto_id: inventario for inventario in inventarios}
+
+
+def _validar_faltantes(usuario_id, producto_ids, inventarios):
+    faltantes = [pk for pk in producto_ids if pk not in inventarios]
+    if not faltantes:
+        return
+
+    # Solo en el camino de error: distinguir producto inexistente de producto sin inventario
+    productos = dict(
+        Producto.objects.filter(pk__in=faltantes, usuario_id=usuario_id).values_list('id', 'nombre')
+    )
+    for producto_id in faltantes:
+        if producto_id not in productos:
+            raise CheckoutError(
+                f"Producto {producto_id} no encontrado.",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+    nombre = productos[faltantes[0]]
+    raise CheckoutError(f"No hay inventario registrado para el producto {nombre}.")
+
+
+def descontar_stock(cantidades):
+    """
+    Descuenta el stock de todos los productos con un único UPDATE condicional:
+    cada fila solo se actualiza si todavía tiene stock suficiente. Devuelve el
+    número de filas actualizadas.
+    """
+    condicion = reduce(or_, (
+        Q(producto_id=producto_id, stock__gte=cantidad)
+        for producto_id, cantidad in cantidades.items()
+    ))
+    descuento = Case(
+        *(When(producto_id=producto_id, then=Value(cantidad)) for producto_id, cantidad in cantidades.items()),
+        output_field=IntegerField(),
+    )
+    return Inventario.objects.filter(condicion).update(
+        stock=F('stock') - descuento, fecha_actualizacion=timezone.now()
+    )
+
+
+@transaction.atomic
+def registrar_pedido(usuario_id, estado, tipo_venta, detalles, clave_idempotencia=None):
+    """
+    Registra un pedido con sus detalles y descuenta el stock.
+
+    El número de consultas no depende del tamaño de la canasta: un SELECT ... FOR UPDATE
+    de inventarios, un INSERT del pedido, un INSERT masivo de detalles, un UPDATE
+    de stock, un INSERT masivo en el kardex y la actualización de los resúmenes de ventas. Lanza CheckoutError si
+    algún producto no existe o no tiene stock.
+    """
+    cantidades = agrupar_detalles(detalles)
+    if not cantidades:
+        raise CheckoutError("Debes enviar al menos un detalle de pedido.")
+
+    inventarios = bloquear_inventarios(usuario_id, list(cantidades))
+    _validar_faltantes(usuario_id, list(cantidades), inventarios)
+
+    total = Decimal('0')
+    costo = Decimal('0')
+    for producto_id, cantidad in cantidades.items():
+        inventario = inventarios[producto_id]
+        if inventario.stock < cantidad:
+            raise CheckoutError(f"Stock insuficiente para {inventario.producto.nombre}.")
+        total += inventario.producto.precio_venta * cantidad
+        costo += inventario.producto.precio_compra * cantidad
+
+    pedido = Pedido.objects.create(
+        usuario_id=usuario_id,
+        estado=estado,
+        tipo_venta=tipo_venta,
+        total=total,
+        clave_idempotencia=clave_idempotencia,
+    )
+
+    # Cada línea guarda los precios vigentes para que los reportes no dependan de Producto
+    DetallePedido.objects.bulk_create([
+        DetallePedido(
+            pedido=pedido,
+            producto=inventarios[producto_id].producto,
+            cantidad=cantidad,
+            precio_unitario=inventarios[producto_id].producto.precio_venta,
+            costo_unitario=inventarios[producto_id].producto.precio_compra,
+            subtotal=inventarios[producto_id].producto.precio_venta * cantidad,
+        )
+        for producto_id, cantidad in cantidades.items()
+    ])
+
+    # Las filas ya están bloqueadas; la condición stock >= cantidad protege además
+    # a los motores sin SELECT ... FOR UPDATE (p. ej. SQLite).
+    if descontar_stock(cantidades) != len(cantidades):
+        raise CheckoutError("Stock insuficiente: otro pedido modificó el inventario.")
+
+    registrar_movimientos([
+        (producto_id, MovimientoInventario.VENTA, -cantidad, inventarios[producto_id].stock - cantidad, f'pedido:{pedido.pk}')
+        for producto_id, cantidad in cantidades.items()
+    ])
+
+    acumular_venta(usuario_id, pedido.fecha, ingresos=total, costo=costo, unidades=sum(cantidades.values()))
+
+    # El UPDATE masivo no emite señales: el catálogo y los escaneos cacheados incluyen el stock
+    invalidar_catalogo(usuario_id)
+    invalidar_escaneo(usuario_id, [inventario.producto.codigo for inventario in inventarios.values()])
+    return pedido
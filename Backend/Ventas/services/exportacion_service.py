@@ -0,0 +1,54 @@
+from backend.exportacion import elegir_columnas, filas_exportacion
+from Ventas.models import Pedido, DetallePedido
+
+# Nombre de columna en el archivo -> campo del ORM
+COLUMNAS_PEDIDOS = {
+    'pedido_id': 'id',
+    'fecha': 'fecha',
+    'estado': 'estado__descripcion',
+    'tipo_venta': 'tipo_venta__descripcion',
+    'total': 'total',
+    'clave_idempotencia': 'clave_idempotencia',
+}
+
+COLUMNAS_DETALLES = {
+    'pedido_id': 'pedido_id',
+    'fecha': 'pedido__fecha',
+    'estado': 'pedido__estado__descripcion',
+    'tipo_venta': 'pedido__tipo_venta__descripcion',
+    'producto_id': 'producto_id',
+    'producto': 'producto__nombre',
+    'codigo': 'producto__codigo',
+    'cantidad': 'cantidad',
+    'precio_unitario': 'precio_unitario',
+    'costo_unitario': 'costo_unitario',
+    'subtotal': 'subtotal',
+}
+
+
+def exportar_pedidos(usuario_id, columnas=None, desde=None, hasta=None):
+    """Devuelve (encabezados, filas) de los pedidos del usuario, una fila por pedido."""
+    columnas = elegir_columnas(COLUMNAS_PEDIDOS, columnas)
+    pedidos = Pedido.objects.filter(usuario_id=usuario_id)
+    if desde:
+        pedidos = pedidos.filter(fecha__gte=desde)
+    if hasta:
+        pedidos = pedidos.filter(fecha__lte=hasta)
+    return columnas, filas_exportacion(pedidos.order_by('fecha', 'id'), COLUMNAS_PEDIDOS, columnas)
+
+
+def exportar_detalles(usuario_id, columnas=None, desde=None, hasta=None):
+    """Devuelve (encabezados, filas) de las líneas vendidas por el usuario, una fila por detalle."""
+    columnas = elegir_columnas(COLUMNAS_DETALLES, columnas)
+    detalles = DetallePedido.objects.filter(pedido__usuario_id=usuario_id)
+    if desde:
+        detalles = detalles.filter(pedido__fecha__gte=desde)
+    if hasta:
+        detalles = detalles.filter(pedido__fecha__lte=hasta)
+    return columnas, filas_exportacion(detalles.order_by('pedido__fecha', 'pedido_id', 'id'), COLUMNAS_DETALLES, columnas)
+
+
+EXPORTACIONES = {
+    'pedidos': exportar_pedidos,
+    'detalles': exportar_detalles,
+}
@@ -0,0 +1,148 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+
+from Productos.cache import invalidar_catalogo, invalidar_escaneo
+from Productos.models import MovimientoInventario
+from Productos.services.kardex_service import registrar_movimientos
+from Ventas.models import Pedido, DetallePedido
+from Ventas.services.checkout_service import (CheckoutError, agrupar_detalles, bloquear_inventarios,
+                                              descontar_stock)
+from Ventas.services.resumen_service import acumular_venta
+
+CREADO = 'creado'
+DUPLICADO = 'duplicado'
+RECHAZADO = 'rechazado'
+
+
+def _rechazo(clave, mensaje):
+    return {'clave_idempotencia': clave, 'resultado': RECHAZADO, 'error': mensaje}
+
+
+def _preparar(pedidos):
+    """Agrupa las líneas de cada pedido; los repetidos en el mismo lote se resuelven al final."""
+    resultados, validos, repetidos, primeros = {}, [], {}, {}
+    for indice, datos in pedidos:
+        clave = datos['clave_idempotencia']
+        if clave in primeros:
+            repetidos[indice] = primeros[clave]
+            continue
+        primeros[clave] = indice
+        try:
+            validos.append((indice, datos, agrupar_detalles(datos['detalles'])))
+        except CheckoutError as error:
+            resultados[indice] = _rechazo(clave, error.mensaje)
+    return resultados, validos, repetidos
+
+
+@transaction.atomic
+def registrar_lote(usuario_id, pedidos):
+    """
+    Registra un lote de pedidos hechos sin conexión, cada uno con la clave de
+    idempotencia que generó la caja y, opcionalmente, la fecha en que se hizo.
+    `pedidos` es [(indice, datos validados)].
+
+    Todo el lote usa un bloqueo de inventarios, un INSERT de pedidos, uno de
+    detalles, un único UPDATE de stock y uno en el kardex, sin importar cuántos
+    pedidos traiga. Cada pedido se acepta o rechaza por separado (el stock se
+    consume en el orden del lote) y una clave ya registrada devuelve el pedido
+    existente en vez de duplicarlo. Devuelve {indice: resultado}.
+    """
+    resultados, validos, repetidos = _preparar(pedidos)
+
+    producto_ids = sorted({producto_id for _, _, cantidades in validos for producto_id in cantidades})
+    inventarios = bloquear_inventarios(usuario_id, producto_ids)
+
+    # Las claves se consultan después del bloqueo: un reenvío concurrente que
+    # toque los mismos productos espera aquí y ve los pedidos ya confirmados
+    existentes = dict(
+        Pedido.objects
+        .filter(usuario_id=usuario_id, clave_idempotencia__in=[datos['clave_idempotencia'] for _, datos, _ in validos])
+        .values_list('clave_idempotencia', 'id')
+    )
+
+    disponible = {producto_id: inventario.stock for producto_id, inventario in inventarios.items()}
+    aceptados = []
+    for indice, datos, cantidades in validos:
+        clave = datos['clave_idempotencia']
+        if clave in existentes:
+            resultados[indice] = {'clave_idempotencia': clave, 'resultado': DUPLICADO, 'pedido_id': existentes[clave]}
+            continue
+        faltante = next((producto_id for producto_id in cantidades if producto_id not in inventarios), None)
+        if faltante is not None:
+            resultados[indice] = _rechazo(clave, f"Producto {faltante} no encontrado o sin inventario.")
+            continue
+        sin_stock = next((pk for pk, cantidad in cantidades.items() if disponible[pk] < cantidad), None)
+        if sin_stock is not None:
+            resultados[indice] = _rechazo(clave, f"Stock insuficiente para {inventarios[sin_stock].producto.nombre}.")
+            continue
+        for producto_id, cantidad in cantidades.items():
+            disponible[producto_id] -= cantidad
+        aceptados.append((indice, datos, cantidades))
+
+    if aceptados:
+        _guardar(usuario_id, aceptados, inventarios, resultados)
+
+    for indice, primero in repetidos.items():
+        resultado = dict(resultados[primero])
+        if resultado['resultado'] == CREADO:
+            resultado['resultado'] = DUPLICADO
+        resultados[indice] = resultado
+    return resultados
+
+
+def _guardar(usuario_id, aceptados, inventarios, resultados):
+    hoy = datetime.date.today()
+    pedidos = Pedido.objects.bulk_create([
+        Pedido(
+            usuario_id=usuario_id,
+            fecha=datos.get('fecha') or hoy,
+            estado=datos['estado'],
+            tipo_venta=datos['tipo_venta'],
+            clave_idempotencia=datos['clave_idempotencia'],
+            total=sum((inventarios[pk].producto.precio_venta * cantidad for pk, cantidad in cantidades.items()),
+                      Decimal('0')),
+        )
+        for _, datos, cantidades in aceptados
+    ])
+
+    detalles, movimientos, totales = [], [], {}
+    stock = {producto_id: inventario.stock for producto_id, inventario in inventarios.items()}
+    # Resumen por día de venta: un lote puede traer ventas de varios días
+    por_fecha = {}
+    for pedido, (indice, datos, cantidades) in zip(pedidos, aceptados):
+        resultados[indice] = {'clave_idempotencia': datos['clave_idempotencia'], 'resultado': CREADO, 'pedido_id': pedido.pk}
+        dia = por_fecha.setdefault(
+            pedido.fecha, {'ingresos': Decimal('0'), 'costo': Decimal('0'), 'unidades': 0, 'pedidos': 0}
+        )
+        dia['ingresos'] += pedido.total
+        dia['pedidos'] += 1
+        for producto_id, cantidad in cantidades.items():
+            producto = inventarios[producto_id].producto
+            detalles.append(DetallePedido(
+                pedido=pedido,
+                producto=producto,
+                cantidad=cantidad,
+                precio_unitario=producto.precio_venta,
+                costo_unitario=producto.precio_compra,
+                subtotal=producto.precio_venta * cantidad,
+            ))
+            stock[producto_id] -= cantidad
+            movimientos.append((producto_id, MovimientoInventario.VENTA, -cantidad, stock[producto_id], f'pedido:{pedido.pk}'))
+            totales[producto_id] = totales.get(producto_id, 0) + cantidad
+            dia['costo'] += producto.precio_compra * cantidad
+            dia['unidades'] += cantidad
+    DetallePedido.objects.bulk_create(detalles, batch_size=1000)
+
+    # Un solo UPDATE descuenta lo vendido en todo el lote
+    if descontar_stock(totales) != len(totales):
+        raise CheckoutError("Stock insuficiente: otro pedido modificó el inventario.")
+    registrar_movimientos(movimientos)
+
+    for fecha, valores in por_fecha.items():
+        acumular_venta(usuario_id, fecha, **valores)
+
+    # El UPDATE masivo no emite señales: el catálogo y los escaneos cacheados incluyen el stock
+    invalidar_catalogo(usuario_id)
+    invalidar_escaneo(usuario_id, [inventarios[producto_id].producto.codigo for producto_id in totales])
@@ -0,0 +1,105 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncMonth
+
+from Productos.models import Inventario
+from Ventas.models import Pedido, DetallePedido, ResumenVentaDiario, ResumenVentaMensual
+
+
+def _sumar(modelo, clave, valores):
+    """
+    Suma `valores` a la fila de resumen identificada por `clave` con un UPDATE
+    atómico (F()); si la fila aún no existe la crea. Si otra transacción la creó
+    primero, la restricción única lo detecta y se reintenta la suma.
+    """
+    incrementos = {campo: F(campo) + valor for campo, valor in valores.items()}
+    if modelo.objects.filter(**clave).update(**incrementos):
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**clave, **valores)
+    except IntegrityError:
+        modelo.objects.filter(**clave).update(**incrementos)
+
+
+def acumular_venta(usuario_id, fecha, ingresos, costo, unidades, pedidos=1):
+    """
+    Acumula una venta en los resúmenes diario y mensual del usuario.
+    Debe llamarse dentro de la transacción del checkout.
+    """
+    valores = {'ingresos': ingresos, 'costo': costo, 'unidades': unidades, 'pedidos': pedidos}
+    _sumar(ResumenVentaDiario, {'usuario_id': usuario_id, 'dia': fecha}, valores)
+    _sumar(ResumenVentaMensual, {'usuario_id': usuario_id, 'mes': fecha.replace(day=1)}, valores)
+
+
+@transaction.atomic
+def reconstruir_resumenes(usuario_id=None):
+    """
+    Recalcula desde cero los resúmenes (de un usuario o de todos) a partir de
+    Pedido y DetallePedido. Devuelve la cantidad de días reconstruidos.
+
+    Primero bloquea los inventarios del usuario, los mismos que bloquea cada
+    checkout: espera a las ventas en curso y detiene las nuevas hasta terminar,
+    así ninguna venta queda fuera del recálculo ni se suma dos veces. Sin
+    usuario bloquea el inventario de todas las empresas.
+    """
+    pedidos = Pedido.objects.all()
+    detalles = DetallePedido.objects.all()
+    diarios = ResumenVentaDiario.objects.all()
+    mensuales = ResumenVentaMensual.objects.all()
+    inventarios = Inventario.objects.all()
+    if usuario_id is not None:
+        pedidos = pedidos.filter(usuario_id=usuario_id)
+        detalles = detalles.filter(pedido__usuario_id=usuario_id)
+        diarios = diarios.filter(usuario_id=usuario_id)
+        mensuales = mensuales.filter(usuario_id=usuario_id)
+        inventarios = inventarios.filter(usuario_id=usuario_id)
+
+    # En el mismo orden que bloquear_inventarios, para no interbloquearse con un checkout
+    list(inventarios.select_for_update().order_by('producto_id').values_list('id', flat=True))
+
+    diarios.delete()
+    mensuales.delete()
+
+    resumenes = {
+        (fila['usuario_id'], fila['fecha']): ResumenVentaDiario(
+            usuario_id=fila['usuario_id'], dia=fila['fecha'],
+            ingresos=fila['ingresos'] or 0, pedidos=fila['pedidos'],
+        )
+        for fila in pedidos.values('usuario_id', 'fecha').annotate(ingresos=Sum('total'), pedidos=Count('id'))
+    }
+
+    # Costo y unidades salen de las columnas copiadas en cada línea (sin unir Producto)
+    por_dia = (
+        detalles
+        .values(usuario_id=F('pedido__usuario_id'), fecha=F('pedido__fecha'))
+        .annotate(
+            unidades=Sum('cantidad'),
+            costo=Sum(ExpressionWrapper(
+                F('cantidad') * F('costo_unitario'),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )),
+        )
+    )
+    for fila in por_dia:
+        resumen = resumenes.get((fila['usuario_id'], fila['fecha']))
+        if resumen is not None:
+            resumen.unidades = fila['unidades'] or 0
+            resumen.costo = fila['costo'] or 0
+
+    ResumenVentaDiario.objects.bulk_create(resumenes.values(), batch_size=1000)
+
+    # Los mensuales se derivan de los diarios recién calculados
+    por_mes = diarios.values('usuario_id', mes=TruncMonth('dia')).annotate(
+        ingresos=Sum('ingresos'), costo=Sum('costo'), pedidos=Sum('pedidos'), unidades=Sum('unidades')
+    )
+    ResumenVentaMensual.objects.bulk_create([
+        ResumenVentaMensual(
+            usuario_id=fila['usuario_id'], mes=fila['mes'],
+            ingresos=fila['ingresos'], costo=fila['costo'],
+            pedidos=fila['pedidos'], unidades=fila['unidades'],
+        )
+        for fila in por_mes
+    ], batch_size=1000)
+
+    return len(resumenes)
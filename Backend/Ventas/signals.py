@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from Ventas.models import Estado, TipoVenta
+from Ventas.cache import invalidar_tablas
+
+
+@receiver([post_save, post_delete], sender=Estado)
+@receiver([post_save, post_delete], sender=TipoVenta)
+def invalidar_tablas_globales(sender, instance, **kwargs):
+    invalidar_tablas()
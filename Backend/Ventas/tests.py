@@ -1,3 +1,228 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import Usuario
+from Productos.models import Inventario, MovimientoInventario, Producto
+from Ventas.models import DetallePedido, Estado, Pedido, ResumenVentaDiario, ResumenVentaMensual, TipoVenta
+from Ventas.services.checkout_service import registrar_pedido
+from Ventas.services.resumen_service import reconstruir_resumenes
+
+
+@override_settings(BITACORA_ASINCRONA=False, VENTAS_LOTE_ANTIGUEDAD_DIAS=30)
+class PedidoLoteTests(TestCase):
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.estado = Estado.objects.create(descripcion='Pagado')
+        self.tipo_venta = TipoVenta.objects.create(descripcion='Contado')
+        self.producto = Producto.objects.create(
+            nombre='Café', precio_compra=Decimal('6'), precio_venta=Decimal('10'), usuario=self.usuario
+        )
+        Inventario.objects.create(producto=self.producto, stock=20, cantidad_minima=0, cantidad_maxima=0)
+        self.hoy = datetime.date.today()
+
+    def pedido(self, clave, cantidad, fecha=None):
+        datos = {
+            'clave_idempotencia': clave,
+            'estado': self.estado.pk,
+            'tipo_venta': self.tipo_venta.pk,
+            'detalles': [{'producto_id': self.producto.pk, 'cantidad': cantidad}],
+        }
+        if fecha is not None:
+            datos['fecha'] = fecha.isoformat()
+        return datos
+
+    def enviar(self, *pedidos):
+        return self.cliente.post(
+            f'/ventas/pedidos/lote/usuario/{self.usuario.pk}/', {'pedidos': list(pedidos)}, format='json'
+        )
+
+    def test_ventas_sin_conexion_conservan_su_fecha_en_pedidos_y_resumenes(self):
+        ayer = self.hoy - datetime.timedelta(days=1)
+        respuesta = self.enviar(self.pedido('a', 1, ayer), self.pedido('b', 2, ayer), self.pedido('c', 3))
+
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        fechas = dict(Pedido.objects.values_list('clave_idempotencia', 'fecha'))
+        self.assertEqual(fechas, {'a': ayer, 'b': ayer, 'c': self.hoy})
+        resumenes = {
+            resumen.dia: (resumen.ingresos, resumen.costo, resumen.unidades, resumen.pedidos)
+            for resumen in ResumenVentaDiario.objects.filter(usuario=self.usuario)
+        }
+        self.assertEqual(resumenes, {
+            ayer: (Decimal('30'), Decimal('18'), 3, 2),
+            self.hoy: (Decimal('30'), Decimal('18'), 3, 1),
+        })
+
+    def test_fecha_fuera_de_rango_invalida_solo_ese_pedido(self):
+        respuesta = self.enviar(
+            self.pedido('vieja', 1, self.hoy - datetime.timedelta(days=31)),
+            self.pedido('futura', 1, self.hoy + datetime.timedelta(days=2)),
+            self.pedido('valida', 1, self.hoy - datetime.timedelta(days=30)),
+        )
+
+        resultados = [resultado['resultado'] for resultado in respuesta.data['resultados']]
+        self.assertEqual(resultados, ['invalido', 'invalido', 'creado'])
+        self.assertEqual(list(Pedido.objects.values_list('clave_idempotencia', flat=True)), ['valida'])
+
+    def test_historial_paginado_por_defecto(self):
+        self.enviar(*(self.pedido(f'p{n}', 1) for n in range(3)))
+        url = f'/ventas/pedidos/usuario/{self.usuario.pk}/'
+
+        respuesta = self.cliente.get(url)
+        self.assertEqual(len(respuesta.data['results']), 3)
+        self.assertIsNone(respuesta.data['next'])
+
+        respuesta = self.cliente.get(url, {'page_size': 2})
+        self.assertEqual([p['clave_idempotencia'] for p in respuesta.data['results']], ['p2', 'p1'])
+        siguiente = self.cliente.get(respuesta.data['next'])
+        self.assertEqual([p['clave_idempotencia'] for p in siguiente.data['results']], ['p0'])
+
+        # Los clientes anteriores pueden seguir pidiendo la lista completa
+        completa = self.cliente.get(url, {'paginar': 'false'})
+        self.assertEqual([p['clave_idempotencia'] for p in completa.data], ['p2', 'p1', 'p0'])
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class CheckoutTests(TestCase):
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.estado = Estado.objects.create(descripcion='Pagado')
+        self.tipo_venta = TipoVenta.objects.create(descripcion='Contado')
+        self.productos = []
+        for numero in range(30):
+            producto = Producto.objects.create(
+                nombre=f'Producto {numero}', precio_compra=Decimal('6'), precio_venta=Decimal('10'),
+                usuario=self.usuario,
+            )
+            Inventario.objects.create(producto=producto, stock=5, cantidad_minima=0, cantidad_maxima=0)
+            self.productos.append(producto)
+
+    def vender(self, *lineas):
+        return self.cliente.post(f'/ventas/pedidos/usuario/{self.usuario.pk}/', {
+            'estado': self.estado.pk,
+            'tipo_venta': self.tipo_venta.pk,
+            'detalles': [{'producto_id': producto.pk, 'cantidad': cantidad} for producto, cantidad in lineas],
+        }, format='json')
+
+    def registrar(self, cantidad_lineas):
+        return registrar_pedido(
+            self.usuario.pk, self.estado, self.tipo_venta,
+            [{'producto_id': producto.pk, 'cantidad': 1} for producto in self.productos[:cantidad_lineas]],
+        )
+
+    def test_guarda_precios_vigentes_y_descuenta_stock(self):
+        cafe, te = self.productos[:2]
+        respuesta = self.vender((cafe, 2), (te, 1), (cafe, 1))
+
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        pedido = Pedido.objects.get()
+        self.assertEqual(pedido.total, Decimal('40'))
+        # Cambiar el precio después no altera lo vendido
+        Producto.objects.filter(pk=cafe.pk).update(precio_venta=Decimal('99'), precio_compra=Decimal('50'))
+        lineas = {
+            detalle.producto_id: (detalle.cantidad, detalle.precio_unitario, detalle.costo_unitario, detalle.subtotal)
+            for detalle in DetallePedido.objects.filter(pedido=pedido)
+        }
+        self.assertEqual(lineas, {
+            cafe.pk: (3, Decimal('10'), Decimal('6'), Decimal('30')),
+            te.pk: (1, Decimal('10'), Decimal('6'), Decimal('10')),
+        })
+        self.assertEqual(Inventario.objects.get(producto=cafe).stock, 2)
+        self.assertEqual(Inventario.objects.get(producto=te).stock, 4)
+
+    def test_stock_insuficiente_es_400_y_no_toca_nada(self):
+        respuesta = self.vender((self.productos[0], 1), (self.productos[1], 6))
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Pedido.objects.exists())
+        self.assertEqual(Inventario.objects.get(producto=self.productos[0]).stock, 5)
+        self.assertFalse(MovimientoInventario.objects.filter(tipo=MovimientoInventario.VENTA).exists())
+
+    def test_producto_de_otro_usuario_es_404(self):
+        otro = Usuario.objects.create_user('otra@ejemplo.com', 'Otra tienda', 'clave-segura')
+        ajeno = Producto.objects.create(nombre='Ajeno', precio_compra=1, precio_venta=2, usuario=otro)
+        Inventario.objects.create(producto=ajeno, stock=5, cantidad_minima=0, cantidad_maxima=0)
+
+        respuesta = self.vender((self.productos[0], 1), (ajeno, 1))
+
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertFalse(Pedido.objects.exists())
+        self.assertEqual(Inventario.objects.get(producto=ajeno).stock, 5)
+
+    def test_un_solo_update_de_stock(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.registrar(30)
+        tabla = Inventario._meta.db_table
+        actualizaciones = [q['sql'] for q in consultas if q['sql'].startswith(f'UPDATE "{tabla}"')]
+        self.assertEqual(len(actualizaciones), 1)
+
+    def test_consultas_constantes_sin_importar_las_lineas(self):
+        # La primera venta del día crea las filas de resumen; las siguientes solo las actualizan
+        self.registrar(1)
+        # SAVEPOINT, SELECT ... FOR UPDATE, pedido, detalles, stock, kardex, 2 resúmenes, RELEASE
+        with self.assertNumQueries(9):
+            self.registrar(1)
+        with self.assertNumQueries(9):
+            self.registrar(30)
+
+
+    def test_reconstruir_resumenes_bloquea_el_inventario_de_la_empresa(self):
+        self.registrar(2)
+        self.registrar(1)
+        esperados = list(ResumenVentaDiario.objects.values('dia', 'ingresos', 'costo', 'unidades', 'pedidos'))
+        ResumenVentaDiario.objects.update(ingresos=0, pedidos=0)
+        ResumenVentaMensual.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(reconstruir_resumenes(self.usuario.pk), 1)
+
+        self.assertEqual(list(ResumenVentaDiario.objects.values('dia', 'ingresos', 'costo', 'unidades', 'pedidos')), esperados)
+        self.assertEqual(ResumenVentaMensual.objects.get().pedidos, 2)
+        # El bloqueo va antes de borrar los resúmenes y solo toma el inventario de esta empresa
+        bloqueo = consultas[1]['sql']
+        self.assertIn(f'FROM "{Inventario._meta.db_table}"', bloqueo)
+        self.assertIn(f'"usuario_id" = {self.usuario.pk}', bloqueo)
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', bloqueo)
+
+@override_settings(BITACORA_ASINCRONA=False, TABLAS_CACHE_MAX_AGE=300)
+class TablasEtagTests(TestCase):
+
+    def setUp(self):
+        # Una versión nueva obliga a recargar las tablas en memoria de pruebas anteriores
+        cache.clear()
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.estado = Estado.objects.create(descripcion='Pagado')
+
+    def test_if_none_match_responde_304_sin_consultar(self):
+        respuesta = self.cliente.get('/ventas/estados/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data, [{'id': self.estado.pk, 'descripcion': 'Pagado'}])
+        self.assertIn('max-age=300', respuesta['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            revalidada = self.cliente.get('/ventas/estados/', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertEqual(revalidada.content, b'')
+        self.assertEqual(revalidada['ETag'], respuesta['ETag'])
+
+    def test_editar_un_estado_cambia_el_etag(self):
+        etag = self.cliente.get('/ventas/estados/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            editado = self.cliente.put(f'/ventas/estados/{self.estado.pk}/', {'descripcion': 'Cobrado'}, format='json')
+        self.assertEqual(editado.status_code, 200)
+
+        respuesta = self.cliente.get('/ventas/estados/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertEqual(respuesta.data[0]['descripcion'], 'Cobrado')
@@ -1,7 +1,9 @@
 from django.urls import path
 from Ventas.controllers.tipo_venta_controller import (TipoVentaListCreateAPIView, TipoVentaRetrieveUpdateDestroyAPIView)
 from Ventas.controllers.estado_controller import (EstadoListCreateAPIView, EstadoRetrieveUpdateDestroyAPIView)
-from Ventas.controllers.pedido_controller import PedidoListCreateAPIView
+from Ventas.controllers.pedido_controller import PedidoListCreateAPIView, PedidoLoteAPIView
+from Ventas.controllers.reporte_controller import ReporteVentasAPIView
+from Ventas.controllers.exportacion_controller import ExportacionVentasAPIView
 
 urlpatterns = [
     # Tipos de venta (globales)
@@ -14,4 +16,12 @@ urlpatterns = [
 
     # Pedidos por usuario
     path('pedidos/usuario/<int:usuario_id>/', PedidoListCreateAPIView.as_view(), name='pedido-lista-crear'),
+    # Ventas acumuladas sin conexión, en un solo envío
+    path('pedidos/lote/usuario/<int:usuario_id>/', PedidoLoteAPIView.as_view(), name='pedido-lote'),
+
+    # Reportes (leen solo los resúmenes)
+    path('reportes/usuario/<int:usuario_id>/', ReporteVentasAPIView.as_view(), name='reporte-ventas'),
+
+    # Exportaciones en streaming (pedidos o detalles)
+    path('exportar/<str:conjunto>/usuario/<int:usuario_id>/', ExportacionVentasAPIView.as_view(), name='ventas-exportar'),
 ]
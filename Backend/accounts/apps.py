@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from accounts.signals import conectar_auditoria, asegurar_indices_prefijo
+        conectar_auditoria()
+        post_migrate.connect(asegurar_indices_prefijo, sender=self)
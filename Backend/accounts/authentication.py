@@ -0,0 +1,64 @@
+import datetime
+
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuario liviano construido solo con los claims del access token (ver
+    accounts.tokens.agregar_claims). Las vistas que necesitan el modelo
+    completo lo obtienen con `usuario`, que hace la consulta solo entonces.
+    """
+
+    @cached_property
+    def rol_id(self):
+        return self.token.get('rol')
+
+    @cached_property
+    def privilegios(self):
+        return frozenset(self.token.get('privilegios', ()))
+
+    @cached_property
+    def empresa(self):
+        return self.token.get('empresa')
+
+    @cached_property
+    def estado(self):
+        return self.token.get('estado', True)
+
+    @cached_property
+    def plan(self):
+        return self.token.get('plan')
+
+    @cached_property
+    def fecha_expiracion(self):
+        valor = self.token.get('fecha_expiracion')
+        return parse_date(valor) if valor else None
+
+    @property
+    def vigente(self):
+        return bool(self.estado) and (
+            self.fecha_expiracion is None or self.fecha_expiracion >= datetime.date.today()
+        )
+
+    @cached_property
+    def usuario(self):
+        from accounts.models import Usuario
+        return Usuario.objects.get(pk=self.id)
+
+
+class JWTSinConsultaAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autentica con el access token sin leer Usuario: devuelve un UsuarioToken y
+    rechaza cuentas inactivas o vencidas según los claims del token.
+    """
+
+    def get_user(self, validated_token):
+        usuario = super().get_user(validated_token)
+        if not usuario.vigente:
+            raise AuthenticationFailed('La cuenta está inactiva o vencida.', code='cuenta_no_vigente')
+        return usuario
@@ -2,9 +2,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import login
-from accounts.models import Usuario, Bitacora
+from accounts.models import Usuario
+from accounts.services.bitacora_service import registrar_bitacora
 from accounts.serializers import UsuarioSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.tokens import TokenUsuario
 from rest_framework.permissions import AllowAny
 class LoginView(APIView):
     permission_classes = [AllowAny]  # Esto es crucial
@@ -28,14 +29,10 @@ class LoginView(APIView):
             return Response({"error": "Usuario inactivo"}, status=status.HTTP_403_FORBIDDEN)
 
         # Registrar en bitácora
-        Bitacora.objects.create(
-            ip=request.META.get('REMOTE_ADDR'),
-            accion="Inicio de sesión exitoso",
-            usuario=user
-        )
+        registrar_bitacora(user.pk, "Inicio de sesión exitoso", ip=request.META.get('REMOTE_ADDR'))
 
         # Generar tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = TokenUsuario.for_user(user)
 
         # Obtener datos del usuario
         usuario_data = UsuarioSerializer(user).data
@@ -1,14 +1,60 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.utils.dateparse import parse_date
 from accounts.models import Bitacora
 from accounts.serializers import BitacoraSerializer
+from accounts.services.bitacora_service import registrar_bitacora
+from backend.pagination import KeysetPaginacion
 
 
 class BitacoraCreate(APIView):
     def post(self, request):
         serializer = BitacoraSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            # Se encola para el escritor en lotes; el registro se guarda poco después
+            datos = serializer.validated_data
+            registrar_bitacora(datos['usuario'].pk, datos['accion'], ip=datos['ip'])
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BitacoraPaginacion(KeysetPaginacion):
+    ordering = ('-fecha', '-hora', '-id')
+
+
+class BitacoraListaAPIView(APIView):
+    """
+    Bitácora del usuario, de la más reciente a la más antigua, paginada por
+    (fecha, hora, id). Filtros opcionales: accion (contiene), ip, fecha_desde y
+    fecha_hasta (AAAA-MM-DD).
+    """
+    pagination_class = BitacoraPaginacion
+
+    def get(self, request, usuario_id):
+        registros = Bitacora.objects.filter(usuario_id=usuario_id)
+        params = request.query_params
+
+        errores = {}
+        for parametro, lookup in (('fecha_desde', 'fecha__gte'), ('fecha_hasta', 'fecha__lte')):
+            valor = params.get(parametro)
+            if valor:
+                try:
+                    fecha = parse_date(valor)
+                except ValueError:
+                    fecha = None
+                if fecha is None:
+                    errores[parametro] = 'Fecha inválida, usa el formato AAAA-MM-DD.'
+                else:
+                    registros = registros.filter(**{lookup: fecha})
+        if errores:
+            return Response(errores, status=status.HTTP_400_BAD_REQUEST)
+
+        if params.get('accion'):
+            registros = registros.filter(accion__icontains=params['accion'])
+        if params.get('ip'):
+            registros = registros.filter(ip=params['ip'])
+
+        paginador = self.pagination_class()
+        pagina = paginador.paginate_queryset(registros, request, view=self)
+        return paginador.get_paginated_response(BitacoraSerializer(pagina, many=True).data)
@@ -3,16 +3,56 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from accounts.models import Usuario
-from accounts.serializers import UsuarioSerializer
+from accounts.serializers import UsuarioSerializer, UsuarioResumenSerializer
+from backend.pagination import PaginacionMixin
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 
 
-class UsuarioListCreate(APIView):
+class UsuarioListCreate(PaginacionMixin, APIView):
+    def filtrar(self, usuarios, params):
+        """
+        Filtros opcionales: rol (ID), estado (true/false), plan, nombre_empresa y
+        buscar (prefijo de correo o nombre, sin distinguir mayúsculas).
+        Devuelve (queryset, errores).
+        """
+        errores = {}
+        rol = params.get('rol')
+        if rol:
+            if rol.isdigit():
+                usuarios = usuarios.filter(rol_id=int(rol))
+            else:
+                errores['rol'] = 'Debe ser un ID numérico.'
+
+        estado = params.get('estado')
+        if estado:
+            if estado.lower() in ('true', '1'):
+                usuarios = usuarios.filter(estado=True)
+            elif estado.lower() in ('false', '0'):
+                usuarios = usuarios.filter(estado=False)
+            else:
+                errores['estado'] = 'Usa true o false.'
+
+        if params.get('plan'):
+            usuarios = usuarios.filter(plan=params['plan'])
+        if params.get('nombre_empresa'):
+            usuarios = usuarios.filter(nombre_empresa__iexact=params['nombre_empresa'])
+
+        # istartswith usa los índices de prefijo (accounts.services.usuarios_service)
+        termino = params.get('buscar', '').strip()
+        if termino:
+            usuarios = usuarios.filter(Q(correo__istartswith=termino) | Q(nombre__istartswith=termino))
+        return usuarios, errores
+
     def get(self, request):
-        usuarios = Usuario.objects.all()
-        serializer = UsuarioSerializer(usuarios, many=True)
-        return Response(serializer.data)
+        usuarios, errores = self.filtrar(Usuario.objects.all(), request.query_params)
+        if errores:
+            return Response(errores, status=status.HTTP_400_BAD_REQUEST)
+        if self.es_paginada(request):
+            # Paginado se responde con la proyección reducida
+            usuarios = usuarios.only(*UsuarioResumenSerializer.Meta.fields)
+            return self.responder_lista(request, usuarios, UsuarioResumenSerializer)
+        return self.responder_lista(request, usuarios, UsuarioSerializer)
 
     def post(self, request):
         data = request.data.copy()
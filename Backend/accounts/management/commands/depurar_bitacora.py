@@ -0,0 +1,33 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.services.bitacora_service import depurar_bitacora, tabla_archivo
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve los registros de bitácora más antiguos que la retención a tablas de '
+        'archivo mensuales (o los elimina con --eliminar) para mantener pequeña la tabla activa.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.BITACORA_RETENCION_DIAS,
+            help='Días que se conservan en la tabla activa'
+        )
+        parser.add_argument('--eliminar', action='store_true', help='Eliminar en vez de archivar')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser al menos 1.')
+        antes_de = datetime.date.today() - datetime.timedelta(days=options['dias'])
+        archivar = not options['eliminar']
+
+        total = 0
+        for mes, cantidad in depurar_bitacora(antes_de, archivar=archivar):
+            total += cantidad
+            destino = tabla_archivo(mes) if archivar else 'eliminados'
+            self.stdout.write(f'{mes:%Y-%m}: {cantidad} registros -> {destino}')
+        self.stdout.write(self.style.SUCCESS(f'Registros anteriores a {antes_de} depurados: {total}.'))
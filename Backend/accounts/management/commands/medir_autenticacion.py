@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.authentication import JWTSinConsultaAuthentication
+from accounts.models import Usuario
+from accounts.tokens import TokenUsuario
+from Productos.controllers.producto_controller import ProductoListaCrearVista
+from Ventas.controllers.estado_controller import EstadoListCreateAPIView
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la autenticación JWT con consulta a Usuario contra la autenticación '
+        'sin consulta: consultas SQL y tiempo promedio por petición en endpoints de lectura.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', type=int, help='Usuario con el que se emite el token (por defecto el primero)')
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por combinación')
+
+    def handle(self, *args, **options):
+        usuarios = Usuario.objects.order_by('id')
+        usuario = usuarios.filter(pk=options['usuario']).first() if options['usuario'] else usuarios.first()
+        if usuario is None:
+            raise CommandError('No hay un usuario para emitir el token.')
+
+        encabezado = {'HTTP_AUTHORIZATION': f'Bearer {TokenUsuario.for_user(usuario).access_token}'}
+        fabrica = APIRequestFactory()
+        endpoints = [
+            ('Estados', EstadoListCreateAPIView, {}, '/ventas/estados/'),
+            ('Catálogo', ProductoListaCrearVista, {'usuario_id': usuario.pk}, f'/productos/crear/usuario/{usuario.pk}/'),
+        ]
+        autenticaciones = [('JWTAuthentication', JWTAuthentication), ('JWTSinConsulta', JWTSinConsultaAuthentication)]
+
+        for nombre, vista, kwargs, ruta in endpoints:
+            for etiqueta, autenticacion in autenticaciones:
+                view = vista.as_view(authentication_classes=[autenticacion])
+                view(fabrica.get(ruta, **encabezado), **kwargs)  # calienta cachés
+
+                inicio = time.perf_counter()
+                with CaptureQueriesContext(connection) as consultas:
+                    for _ in range(options['peticiones']):
+                        respuesta = view(fabrica.get(ruta, **encabezado), **kwargs)
+                transcurrido = time.perf_counter() - inicio
+                if respuesta.status_code != 200:
+                    raise CommandError(f'{nombre} con {etiqueta} respondió {respuesta.status_code}.')
+
+                self.stdout.write(
+                    f'{nombre:<10} {etiqueta:<18} '
+                    f'{len(consultas) / options["peticiones"]:.2f} consultas/petición  '
+                    f'{transcurrido * 1000 / options["peticiones"]:.3f} ms/petición'
+                )
@@ -0,0 +1,46 @@
+from django.http import JsonResponse
+
+from accounts.services.bitacora_service import ip_actual
+from accounts.services.empresa_service import motivo_rechazo, obtener_empresa
+
+
+class BitacoraMiddleware:
+    """Expone la IP del cliente a los registros de bitácora que generan las señales."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = ip_actual.set(request.META.get('REMOTE_ADDR') or ip_actual.get())
+        try:
+            return self.get_response(request)
+        finally:
+            ip_actual.reset(token)
+
+
+class EmpresaMiddleware:
+    """
+    En las rutas con <usuario_id> resuelve la empresa una sola vez (desde caché),
+    la deja en `request.empresa` y rechaza empresas inexistentes, inactivas o
+    vencidas antes de que la vista haga cualquier consulta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        usuario_id = view_kwargs.get('usuario_id')
+        if usuario_id is None:
+            return None
+
+        empresa = obtener_empresa(usuario_id)
+        if empresa is None:
+            return JsonResponse({'error': 'Usuario no encontrado.'}, status=404)
+        motivo = motivo_rechazo(empresa)
+        if motivo:
+            return JsonResponse({'error': motivo}, status=403)
+        request.empresa = empresa
+        return None
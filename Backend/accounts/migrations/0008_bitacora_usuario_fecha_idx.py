@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_usuario_plan'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bitacora',
+            index=models.Index(fields=['usuario', 'fecha', 'hora'], name='bitacora_usuario_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 14:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_bitacora_usuario_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bitacora',
+            name='bitacora_usuario_fecha_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bitacora',
+            index=models.Index(fields=['usuario', 'fecha', 'hora', 'id'], name='bitacora_usuario_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from accounts.services.usuarios_service import preparar_indices_prefijo, eliminar_indices_prefijo
+
+
+def crear_indices_prefijo(apps, schema_editor):
+    Usuario = apps.get_model('accounts', 'Usuario')
+    preparar_indices_prefijo(schema_editor.connection, Usuario._meta.db_table)
+
+
+def borrar_indices_prefijo(apps, schema_editor):
+    eliminar_indices_prefijo(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_bitacora_indice_keyset'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices_prefijo, borrar_indices_prefijo),
+    ]
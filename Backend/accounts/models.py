@@ -74,5 +74,11 @@ class Bitacora(models.Model):
     accion = models.CharField(max_length=255)
     usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='bitacoras')
 
+    class Meta:
+        indexes = [
+            # Incluye id para que la paginación por (fecha, hora, id) se resuelva solo con el índice
+            models.Index(fields=['usuario', 'fecha', 'hora', 'id'], name='bitacora_usuario_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"{self.usuario.correo} - {self.accion}"
\ No newline at end of file
@@ -0,0 +1,21 @@
+from rest_framework.permissions import BasePermission
+
+
+class TienePrivilegio(BasePermission):
+    """
+    Autoriza con el claim 'privilegios' del access token, sin consultar la base.
+    La vista declara `privilegios_requeridos`: una lista de privilegios, o un
+    dict {método HTTP: lista} si cambian por método. Sin requisitos, se permite.
+    """
+    message = 'No tienes los privilegios necesarios para esta acción.'
+
+    def has_permission(self, request, view):
+        requeridos = getattr(view, 'privilegios_requeridos', None)
+        if isinstance(requeridos, dict):
+            requeridos = requeridos.get(request.method)
+        if not requeridos:
+            return True
+        if request.auth is None:
+            return False
+        otorgados = set(request.auth.get('privilegios', ()))
+        return set(requeridos) <= otorgados
@@ -17,6 +17,13 @@ class UsuarioSerializer(serializers.ModelSerializer):
         validated_data['is_staff'] = True  
         return super().create(validated_data)
 
+
+class UsuarioResumenSerializer(serializers.ModelSerializer):
+    """Proyección reducida para el listado paginado de usuarios."""
+    class Meta:
+        model = Usuario
+        fields = ['id', 'nombre', 'correo', 'nombre_empresa', 'estado', 'plan', 'fecha_expiracion', 'rol']
+
 # serializers.py
 
 class RolSerializer(serializers.ModelSerializer):
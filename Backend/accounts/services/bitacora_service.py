@@ -0,0 +1,150 @@
+import atexit
+import contextvars
+import datetime
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from accounts.models import Bitacora
+
+logger = logging.getLogger(__name__)
+
+IP_DESCONOCIDA = '127.0.0.1'
+LONGITUD_ACCION = Bitacora._meta.get_field('accion').max_length
+
+# IP de la petición en curso; la fija BitacoraMiddleware para los registros hechos desde señales
+ip_actual = contextvars.ContextVar('bitacora_ip', default=IP_DESCONOCIDA)
+
+_FIN = object()
+
+
+class EscritorBitacora:
+    """
+    Acumula registros de bitácora en una cola en memoria y un hilo de fondo los
+    guarda con bulk_create cada `tamano_lote` registros o cada `intervalo_ms`
+    milisegundos, lo que ocurra primero. Al terminar el proceso se vacía la cola.
+
+    La fecha y hora de cada registro son las del momento en que se guarda el
+    lote (auto_now_add), a lo sumo `intervalo_ms` después del evento.
+    """
+
+    def __init__(self, tamano_lote, intervalo_ms, maximo_cola):
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo_ms / 1000
+        self.cola = queue.Queue(maxsize=maximo_cola)
+        self._hilo = None
+        self._bloqueo = threading.Lock()
+
+    def _iniciar(self):
+        with self._bloqueo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ejecutar, name='escritor-bitacora', daemon=True)
+                self._hilo.start()
+
+    def registrar(self, registro):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._iniciar()
+        try:
+            self.cola.put_nowait(registro)
+        except queue.Full:
+            # Con la cola llena se escribe en línea en vez de perder el registro
+            self._guardar([registro])
+
+    def _ejecutar(self):
+        terminar = False
+        while not terminar:
+            lote = []
+            limite = time.monotonic() + self.intervalo
+            while len(lote) < self.tamano_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    registro = self.cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if registro is _FIN:
+                    terminar = True
+                    break
+                lote.append(registro)
+            if lote and not self._guardar(lote):
+                # Se descarta la conexión del hilo por si quedó inutilizable
+                connection.close()
+        connection.close()
+
+    def _guardar(self, lote):
+        try:
+            Bitacora.objects.bulk_create(lote, batch_size=self.tamano_lote)
+        except Exception:
+            logger.exception('No se pudieron guardar %d registros de bitácora', len(lote))
+            return False
+        return True
+
+    def detener(self, espera=5):
+        """Vacía la cola pendiente y detiene el hilo."""
+        if self._hilo is None or not self._hilo.is_alive():
+            return
+        try:
+            self.cola.put(_FIN, timeout=espera)
+        except queue.Full:
+            return
+        self._hilo.join(espera)
+
+
+escritor = EscritorBitacora(
+    tamano_lote=settings.BITACORA_TAMANO_LOTE,
+    intervalo_ms=settings.BITACORA_INTERVALO_MS,
+    maximo_cola=settings.BITACORA_MAXIMO_COLA,
+)
+atexit.register(escritor.detener)
+
+
+def registrar_bitacora(usuario_id, accion, ip=None):
+    """
+    Encola un registro de bitácora. Si hay una transacción abierta, se encola al
+    confirmarla para no auditar cambios que se revierten.
+    """
+    registro = Bitacora(usuario_id=usuario_id, ip=ip or ip_actual.get(), accion=accion[:LONGITUD_ACCION])
+    if not settings.BITACORA_ASINCRONA:
+        transaction.on_commit(registro.save)
+        return
+    transaction.on_commit(lambda: escritor.registrar(registro))
+
+
+def tabla_archivo(mes):
+    return f'{Bitacora._meta.db_table}_{mes:%Y_%m}'
+
+
+def _siguiente_mes(fecha):
+    return (fecha.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+
+
+def depurar_bitacora(antes_de, archivar=True):
+    """
+    Saca de la tabla de bitácora los registros con fecha anterior a `antes_de`,
+    un mes por transacción. Con `archivar` los copia antes a una tabla por mes
+    (accounts_bitacora_AAAA_MM) que se crea si no existe. Devuelve una lista de
+    (mes, registros movidos).
+    """
+    tabla = connection.ops.quote_name(Bitacora._meta.db_table)
+    columnas = ', '.join(connection.ops.quote_name(campo.column) for campo in Bitacora._meta.concrete_fields)
+    columna_fecha = connection.ops.quote_name(Bitacora._meta.get_field('fecha').column)
+
+    resultado = []
+    for mes in Bitacora.objects.filter(fecha__lt=antes_de).dates('fecha', 'month'):
+        rango = [mes, min(_siguiente_mes(mes), antes_de)]
+        condicion = f'{columna_fecha} >= %s AND {columna_fecha} < %s'
+        with transaction.atomic(), connection.cursor() as cursor:
+            if archivar:
+                archivo = connection.ops.quote_name(tabla_archivo(mes))
+                cursor.execute(f'CREATE TABLE IF NOT EXISTS {archivo} AS SELECT {columnas} FROM {tabla} WHERE 1 = 0')
+                cursor.execute(
+                    f'INSERT INTO {archivo} ({columnas}) SELECT {columnas} FROM {tabla} WHERE {condicion}', rango
+                )
+            cursor.execute(f'DELETE FROM {tabla} WHERE {condicion}', rango)
+            resultado.append((mes, cursor.rowcount))
+    return resultado
@@ -0,0 +1,43 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from accounts.models import Usuario
+
+CAMPOS_EMPRESA = ('id', 'nombre_empresa', 'estado', 'plan', 'fecha_expiracion')
+
+# Un usuario inexistente también se cachea para no consultar la base en cada intento
+NO_ENCONTRADA = {}
+
+
+def _clave_empresa(usuario_id):
+    return f'empresa:{usuario_id}'
+
+
+def obtener_empresa(usuario_id):
+    """
+    Devuelve {'id', 'nombre_empresa', 'estado', 'plan', 'fecha_expiracion'} del
+    usuario (empresa) desde caché, o None si no existe.
+    """
+    clave = _clave_empresa(usuario_id)
+    empresa = cache.get(clave)
+    if empresa is None:
+        empresa = Usuario.objects.filter(pk=usuario_id).values(*CAMPOS_EMPRESA).first() or NO_ENCONTRADA
+        cache.set(clave, empresa, settings.EMPRESA_CACHE_TIMEOUT)
+    return empresa or None
+
+
+def invalidar_empresa(usuario_id):
+    clave = _clave_empresa(usuario_id)
+    transaction.on_commit(lambda: cache.delete(clave))
+
+
+def motivo_rechazo(empresa):
+    """Devuelve por qué la empresa no puede operar, o None si está vigente."""
+    if not empresa['estado']:
+        return 'La empresa está inactiva.'
+    if empresa['fecha_expiracion'] and empresa['fecha_expiracion'] < datetime.date.today():
+        return 'El plan de la empresa está vencido.'
+    return None
@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from accounts.models import Permisos
+
+CLAVE_VERSION = 'permisos:version'
+
+
+def version_permisos():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        inicial = time.time_ns()
+        cache.add(CLAVE_VERSION, inicial, timeout=None)
+        version = cache.get(CLAVE_VERSION, inicial)
+    return version
+
+
+def _incrementar_version():
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, time.time_ns(), timeout=None)
+
+
+def invalidar_permisos():
+    """Descarta los privilegios resueltos al confirmar la transacción."""
+    transaction.on_commit(_incrementar_version)
+
+
+def privilegios_por_rol():
+    """
+    Devuelve {rol_id: [privilegios activos]} para todos los roles. Se calcula
+    con una sola consulta y se guarda en caché bajo la versión vigente.
+    """
+    clave = f'permisos:roles:{version_permisos()}'
+    roles = cache.get(clave)
+    if roles is None:
+        roles = {}
+        filas = (
+            Permisos.objects.filter(estado=True)
+            .order_by('rol_id', 'privilegio__descripcion')
+            .values_list('rol_id', 'privilegio__descripcion')
+        )
+        for rol_id, privilegio in filas:
+            privilegios = roles.setdefault(rol_id, [])
+            if privilegio not in privilegios:
+                privilegios.append(privilegio)
+        cache.set(clave, roles, settings.PERMISOS_CACHE_TIMEOUT)
+    return roles
+
+
+def privilegios_de_rol(rol_id):
+    if rol_id is None:
+        return []
+    return privilegios_por_rol().get(rol_id, [])
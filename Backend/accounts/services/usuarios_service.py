@@ -0,0 +1,40 @@
+from accounts.models import Usuario
+
+# Índices para la búsqueda por prefijo (istartswith) de correo y nombre. Django
+# no puede declararlos en Meta porque dependen del motor: PostgreSQL compara
+# UPPER(columna) LIKE 'PREFIJO%' y necesita text_pattern_ops; SQLite usa
+# columna LIKE 'prefijo%' y solo aprovecha un índice con COLLATE NOCASE.
+COLUMNAS_PREFIJO = ('correo', 'nombre')
+
+
+def _nombre_indice(columna):
+    return f'usuario_{columna}_prefijo_idx'
+
+
+def _sql_indice(conexion, tabla, columna):
+    q = conexion.ops.quote_name
+    if conexion.vendor == 'postgresql':
+        definicion = f'(UPPER({q(columna)}) text_pattern_ops)'
+    elif conexion.vendor == 'sqlite':
+        definicion = f'({q(columna)} COLLATE NOCASE)'
+    else:
+        return None
+    return f'CREATE INDEX IF NOT EXISTS {q(_nombre_indice(columna))} ON {q(tabla)} {definicion}'
+
+
+def preparar_indices_prefijo(conexion, tabla=None):
+    """Crea (si faltan) los índices de búsqueda por prefijo. Es idempotente."""
+    tabla = tabla or Usuario._meta.db_table
+    with conexion.cursor() as cursor:
+        for columna in COLUMNAS_PREFIJO:
+            sql = _sql_indice(conexion, tabla, columna)
+            if sql:
+                cursor.execute(sql)
+
+
+def eliminar_indices_prefijo(conexion):
+    if conexion.vendor not in ('postgresql', 'sqlite'):
+        return
+    with conexion.cursor() as cursor:
+        for columna in COLUMNAS_PREFIJO:
+            cursor.execute(f'DROP INDEX IF EXISTS {conexion.ops.quote_name(_nombre_indice(columna))}')
@@ -0,0 +1,71 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import Usuario, Rol, Privilegio, Permisos
+from accounts.services.bitacora_service import registrar_bitacora
+from accounts.services.permisos_service import invalidar_permisos
+from accounts.services.empresa_service import invalidar_empresa
+from accounts.services.usuarios_service import preparar_indices_prefijo
+
+
+@receiver([post_save, post_delete], sender=Permisos)
+@receiver([post_save, post_delete], sender=Privilegio)
+@receiver([post_save, post_delete], sender=Rol)
+def invalidar_privilegios(sender, instance, **kwargs):
+    invalidar_permisos()
+
+
+@receiver([post_save, post_delete], sender=Usuario)
+def invalidar_empresa_usuario(sender, instance, **kwargs):
+    invalidar_empresa(instance.pk)
+
+
+def _usuario_de(instance):
+    usuario_id = getattr(instance, 'usuario_id', None)
+    if usuario_id is None and getattr(instance, 'producto_id', None) is not None:
+        # Inventario pertenece al usuario de su producto
+        relacion = type(instance).producto
+        if relacion.is_cached(instance):
+            return instance.producto.usuario_id
+        return (
+            relacion.get_queryset().filter(pk=instance.producto_id)
+            .values_list('usuario_id', flat=True).first()
+        )
+    return usuario_id
+
+
+def auditar_guardado(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    usuario_id = _usuario_de(instance)
+    if usuario_id is not None:
+        accion = 'Creó' if created else 'Modificó'
+        registrar_bitacora(usuario_id, f'{accion} {sender._meta.verbose_name} #{instance.pk}')
+
+
+def auditar_eliminacion(sender, instance, **kwargs):
+    usuario_id = _usuario_de(instance)
+    if usuario_id is not None:
+        registrar_bitacora(usuario_id, f'Eliminó {sender._meta.verbose_name} #{instance.pk}')
+
+
+def conectar_auditoria():
+    for etiqueta in settings.BITACORA_MODELOS_AUDITADOS:
+        modelo = apps.get_model(etiqueta)
+        post_save.connect(auditar_guardado, sender=modelo, dispatch_uid=f'auditar_guardado:{etiqueta}')
+        post_delete.connect(auditar_eliminacion, sender=modelo, dispatch_uid=f'auditar_eliminacion:{etiqueta}')
+
+
+def asegurar_indices_prefijo(sender, using, **kwargs):
+    """
+    En SQLite, Django reconstruye la tabla de usuarios en algunas migraciones y
+    con ella se pierden los índices creados fuera de Meta; aquí se reponen.
+    """
+    conexion = connections[using]
+    if conexion.vendor != 'sqlite':
+        return
+    if Usuario._meta.db_table in conexion.introspection.table_names():
+        preparar_indices_prefijo(conexion)
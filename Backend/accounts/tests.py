@@ -1,3 +1,151 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from accounts.authentication import UsuarioToken
+from accounts.models import Permisos, Privilegio, Rol, Usuario
+from accounts.permissions import TienePrivilegio
+from accounts.services.empresa_service import obtener_empresa
+from accounts.tokens import TokenUsuario
+from Productos.controllers.producto_controller import ProductoListaCrearVista
+
+
+class VistaAnulacion(APIView):
+    permission_classes = [TienePrivilegio]
+    privilegios_requeridos = {'POST': ['anular ventas']}
+
+    def get(self, request):
+        return Response({'ok': True})
+
+    def post(self, request):
+        return Response({'anulada': True})
+
+
+class VistaPerfil(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({'id': request.user.id, 'tipo': type(request.user).__name__, 'empresa': request.user.empresa})
+
+
+def access_token(usuario):
+    return str(TokenUsuario.for_user(usuario).access_token)
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class TienePrivilegioTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        cajero = Rol.objects.create(nombre_rol='Cajero')
+        supervisor = Rol.objects.create(nombre_rol='Supervisor')
+        anular = Privilegio.objects.create(descripcion='anular ventas')
+        Permisos.objects.create(rol=supervisor, privilegio=anular)
+        self.cajero = Usuario.objects.create_user('cajero@ejemplo.com', 'Cajero', 'clave-segura', rol=cajero)
+        self.supervisor = Usuario.objects.create_user('super@ejemplo.com', 'Supervisor', 'clave-segura', rol=supervisor)
+
+    def pedir(self, metodo, usuario=None):
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {access_token(usuario)}'} if usuario else {}
+        request = getattr(self.factory, metodo)('/anular/', **extra)
+        # Los privilegios salen del token: autorizar no consulta la base
+        with self.assertNumQueries(0):
+            return VistaAnulacion.as_view()(request)
+
+    def test_token_con_el_privilegio_puede(self):
+        self.assertEqual(self.pedir('post', self.supervisor).status_code, 200)
+
+    def test_token_sin_el_privilegio_recibe_403(self):
+        respuesta = self.pedir('post', self.cajero)
+        self.assertEqual(respuesta.status_code, 403)
+
+    def test_sin_token_no_pasa(self):
+        self.assertEqual(self.pedir('post').status_code, 401)
+
+    def test_metodo_sin_requisitos_queda_abierto(self):
+        self.assertEqual(self.pedir('get', self.cajero).status_code, 200)
+        self.assertEqual(self.pedir('get').status_code, 200)
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class JWTSinConsultaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+
+    def pedir(self, usuario):
+        request = self.factory.get('/perfil/', HTTP_AUTHORIZATION=f'Bearer {access_token(usuario)}')
+        with self.assertNumQueries(0):
+            return VistaPerfil.as_view()(request)
+
+    def crear(self, **extra):
+        return Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura', **extra)
+
+    def test_token_vigente_se_autentica_con_sus_claims(self):
+        usuario = self.crear(nombre_empresa='Tienda Central')
+        respuesta = self.pedir(usuario)
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data, {'id': usuario.pk, 'tipo': UsuarioToken.__name__, 'empresa': 'Tienda Central'})
+
+    def test_cuenta_inactiva_se_rechaza(self):
+        respuesta = self.pedir(self.crear(estado=False))
+        self.assertEqual(respuesta.status_code, 401)
+        self.assertEqual(respuesta.data['detail'].code, 'cuenta_no_vigente')
+
+    def test_cuenta_vencida_se_rechaza(self):
+        ayer = datetime.date.today() - datetime.timedelta(days=1)
+        respuesta = self.pedir(self.crear(fecha_expiracion=ayer))
+        self.assertEqual(respuesta.status_code, 401)
+        self.assertEqual(respuesta.data['detail'].code, 'cuenta_no_vigente')
+
+
+@override_settings(BITACORA_ASINCRONA=False)
+class EmpresaMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cliente = APIClient(SERVER_NAME='localhost')
+        self.usuario = Usuario.objects.create_user('tienda@ejemplo.com', 'Tienda', 'clave-segura')
+
+    def pedir(self, usuario_id):
+        with mock.patch.object(ProductoListaCrearVista, 'get') as vista:
+            respuesta = self.cliente.get(f'/productos/crear/usuario/{usuario_id}/')
+        vista.assert_not_called()
+        return respuesta
+
+    def test_empresa_inexistente_es_404(self):
+        respuesta = self.pedir(self.usuario.pk + 100)
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertEqual(respuesta.json(), {'error': 'Usuario no encontrado.'})
+
+    def test_empresa_inactiva_o_vencida_es_403(self):
+        Usuario.objects.filter(pk=self.usuario.pk).update(estado=False)
+        self.assertEqual(self.pedir(self.usuario.pk).json(), {'error': 'La empresa está inactiva.'})
+
+        cache.clear()
+        Usuario.objects.filter(pk=self.usuario.pk).update(
+            estado=True, fecha_expiracion=datetime.date.today() - datetime.timedelta(days=1),
+        )
+        respuesta = self.pedir(self.usuario.pk)
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertEqual(respuesta.json(), {'error': 'El plan de la empresa está vencido.'})
+
+    def test_empresa_cacheada_hasta_guardar_el_usuario(self):
+        with self.assertNumQueries(1):
+            obtener_empresa(self.usuario.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(obtener_empresa(self.usuario.pk)['estado'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.estado = False
+            self.usuario.save()
+
+        self.assertEqual(self.pedir(self.usuario.pk).status_code, 403)
@@ -0,0 +1,47 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.models import Usuario
+from accounts.services.permisos_service import privilegios_de_rol
+
+
+def agregar_claims(token, usuario):
+    """
+    Copia en el token los datos que se usan en cada petición (rol, privilegios,
+    empresa, estado, plan y vencimiento) para autenticar y autorizar sin consultar la base.
+    """
+    token['rol'] = usuario.rol_id
+    token['privilegios'] = privilegios_de_rol(usuario.rol_id)
+    token['empresa'] = usuario.nombre_empresa
+    token['estado'] = usuario.estado
+    token['plan'] = usuario.plan
+    token['fecha_expiracion'] = usuario.fecha_expiracion.isoformat() if usuario.fecha_expiracion else None
+
+
+class TokenUsuario(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        agregar_claims(token, user)
+        return token
+
+
+class TokenUsuarioSerializer(TokenObtainPairSerializer):
+    token_class = TokenUsuario
+
+
+class TokenRefrescoSerializer(TokenRefreshSerializer):
+    """
+    Al refrescar vuelve a calcular los claims, así el nuevo access token refleja
+    cambios de rol o de privilegios ocurridos desde el inicio de sesión.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        usuario = Usuario.objects.filter(pk=access[api_settings.USER_ID_CLAIM]).first()
+        if usuario is not None:
+            agregar_claims(access, usuario)
+            data['access'] = str(access)
+        return data
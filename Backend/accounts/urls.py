@@ -2,7 +2,7 @@ from django.urls import path
 from accounts.controllers.auth_controller import LoginView
 from accounts.controllers.usuarios_controller import UsuarioListCreate, UsuarioDetail
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from accounts.controllers.bitacora_controller import BitacoraCreate
+from accounts.controllers.bitacora_controller import BitacoraCreate, BitacoraListaAPIView
 
 urlpatterns = [
     # Autenticación
@@ -14,5 +14,6 @@ urlpatterns = [
     path('usuarios/', UsuarioListCreate.as_view(), name='usuarios-list-create'),
     path('usuarios/<int:pk>/', UsuarioDetail.as_view(), name='usuarios-detail'),
     path('bitacora/', BitacoraCreate.as_view(), name='bitacora-create'),
+    path('bitacora/usuario/<int:usuario_id>/', BitacoraListaAPIView.as_view(), name='bitacora-lista'),
 
 ]
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from rest_framework.response import Response
+
+
+def responder_con_etag(request, datos, etag, max_age=None):
+    """
+    Responde `datos` con ETag y Cache-Control. Si el cliente envía
+    If-None-Match con el mismo etag devuelve 304 sin cuerpo.
+    """
+    etag = quote_etag(etag)
+    if max_age is None:
+        max_age = settings.TABLAS_CACHE_MAX_AGE
+
+    respuesta = get_conditional_response(request, etag=etag)
+    if respuesta is None:
+        respuesta = Response(datos)
+    respuesta['ETag'] = etag
+    patch_cache_control(respuesta, max_age=max_age, must_revalidate=True)
+    return respuesta
@@ -0,0 +1,242 @@
+import csv
+import datetime
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+FORMATOS = ('csv', 'xlsx')
+TIPOS_CONTENIDO = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Filas que se agrupan antes de entregar un bloque al cliente o al archivo
+FILAS_POR_BLOQUE = 500
+
+
+class ExportacionError(Exception):
+    """Parámetros de exportación inválidos (formato, columnas o fechas)."""
+
+
+def detectar_formato(nombre_archivo=None, formato=None):
+    if not formato and nombre_archivo:
+        formato = nombre_archivo.rsplit('.', 1)[-1] if '.' in nombre_archivo else None
+    formato = (formato or 'csv').lower()
+    if formato not in FORMATOS:
+        raise ExportacionError("Formato no soportado: usa csv o xlsx.")
+    return formato
+
+
+def elegir_columnas(disponibles, pedidas=None):
+    """
+    Devuelve los nombres de columna a exportar, en el orden pedido. `pedidas`
+    es una lista o un texto separado por comas; sin ella se exportan todas.
+    """
+    if not pedidas:
+        return list(disponibles)
+    if isinstance(pedidas, str):
+        pedidas = [columna.strip() for columna in pedidas.split(',') if columna.strip()]
+    desconocidas = [columna for columna in pedidas if columna not in disponibles]
+    if desconocidas:
+        raise ExportacionError(
+            f"Columnas desconocidas: {', '.join(desconocidas)}. Disponibles: {', '.join(disponibles)}."
+        )
+    return list(dict.fromkeys(pedidas))
+
+
+def filas_exportacion(queryset, disponibles, columnas):
+    """
+    Tuplas de values_list con las columnas elegidas, leídas por bloques con
+    iterator(): en PostgreSQL usa un cursor del lado del servidor, así que la
+    memoria no crece con la cantidad de filas.
+    """
+    campos = [disponibles[columna] for columna in columnas]
+    return queryset.values_list(*campos).iterator(chunk_size=settings.EXPORTACION_TAMANO_BLOQUE)
+
+
+def leer_rango(desde=None, hasta=None):
+    """Convierte desde/hasta (AAAA-MM-DD) en fechas; lanza ExportacionError si alguna es inválida."""
+    rango = []
+    for nombre, valor in (('desde', desde), ('hasta', hasta)):
+        fecha = None
+        if valor:
+            try:
+                fecha = parse_date(valor)
+            except ValueError:
+                pass
+            if fecha is None:
+                raise ExportacionError(f"Fecha '{nombre}' inválida, usa el formato AAAA-MM-DD.")
+        rango.append(fecha)
+    return tuple(rango)
+
+
+def _en_bloques(filas):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def generar_csv(encabezados, filas):
+    escritor = csv.writer(_Eco())
+    # La marca BOM hace que Excel abra el archivo como UTF-8
+    yield ('\ufeff' + escritor.writerow(encabezados)).encode('utf-8')
+    for bloque in _en_bloques(filas):
+        yield ''.join(escritor.writerow(fila) for fila in bloque).encode('utf-8')
+
+
+# Caracteres que XML 1.0 no admite dentro de una celda
+_CONTROL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_FIJOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Datos" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _celda(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, (int, float, Decimal)) and not isinstance(valor, bool):
+        return f'<c t="n"><v>{valor}</v></c>'
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        valor = valor.isoformat()
+    texto = escape(_CONTROL.sub('', str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(fila):
+    return '<row>' + ''.join(_celda(valor) for valor in fila) + '</row>'
+
+
+class _Salida:
+    """Destino sin posicionamiento para zipfile: acumula lo escrito hasta que se entrega."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+def generar_xlsx(encabezados, filas):
+    """
+    Escribe un libro XLSX de una hoja a medida que llegan las filas. El ZIP se
+    arma con descriptores de datos (sin volver atrás en la salida) y las celdas
+    usan texto en línea, así que no hace falta tener el libro entero en memoria.
+    """
+    salida = _Salida()
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as libro:
+        for nombre, contenido in _XLSX_FIJOS.items():
+            libro.writestr(nombre, contenido)
+        with libro.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as hoja:
+            hoja.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _fila_xml(encabezados)
+            ).encode('utf-8'))
+            for bloque in _en_bloques(filas):
+                hoja.write(''.join(_fila_xml(fila) for fila in bloque).encode('utf-8'))
+                datos = salida.vaciar()
+                if datos:
+                    yield datos
+            hoja.write(b'</sheetData></worksheet>')
+    yield salida.vaciar()
+
+
+def generar(formato, encabezados, filas):
+    """Bloques de bytes del archivo exportado."""
+    if formato == 'xlsx':
+        return generar_xlsx(encabezados, filas)
+    return generar_csv(encabezados, filas)
+
+
+def respuesta_exportacion(nombre, formato, encabezados, filas):
+    """StreamingHttpResponse que descarga el archivo `nombre`.`formato` sin armarlo en memoria."""
+    respuesta = StreamingHttpResponse(generar(formato, encabezados, filas), content_type=TIPOS_CONTENIDO[formato])
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return respuesta
+
+
+def escribir_archivo(ruta, formato, encabezados, filas):
+    """Escribe la exportación en `ruta` bloque a bloque. Devuelve la cantidad de filas."""
+    contador = {'filas': 0}
+
+    def contar(filas):
+        for fila in filas:
+            contador['filas'] += 1
+            yield fila
+
+    with open(ruta, 'wb') as archivo:
+        for bloque in generar(formato, encabezados, contar(filas)):
+            archivo.write(bloque)
+    return contador['filas']
+
+
+def exportar_desde_peticion(request, nombre, exportar, usuario_id):
+    """
+    Lee formato, columnas, desde y hasta de la petición y responde el archivo
+    en streaming. Lanza ExportacionError si algún parámetro es inválido.
+    """
+    parametros = request.query_params
+    formato = detectar_formato(formato=parametros.get('formato'))
+    desde, hasta = leer_rango(parametros.get('desde'), parametros.get('hasta'))
+    encabezados, filas = exportar(usuario_id, parametros.get('columnas'), desde, hasta)
+    return respuesta_exportacion(nombre, formato, encabezados, filas)
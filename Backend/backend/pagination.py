@@ -0,0 +1,143 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorPaginacion(CursorPagination):
+    """
+    Paginación por cursor (keyset): cada página continúa desde el último id
+    visto, por lo que el costo no crece con la profundidad de la página.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+
+
+class CursorPaginacionOpcional(CursorPaginacion):
+    """
+    Igual que CursorPaginacion, pero solo pagina si el cliente envía 'cursor' o
+    'page_size'; sin esos parámetros se conserva la respuesta completa que ya
+    consumen el frontend y la app móvil.
+    """
+
+    def get_page_size(self, request):
+        if (self.cursor_query_param not in request.query_params
+                and self.page_size_query_param not in request.query_params):
+            return None
+        return super().get_page_size(request)
+
+
+class CursorPaginacionPredeterminada(CursorPaginacion):
+    """
+    Pagina siempre, aunque el cliente no envíe 'cursor' ni 'page_size'. Los
+    clientes anteriores que necesiten la lista completa la piden con ?paginar=false.
+    """
+    sin_paginar_query_param = 'paginar'
+
+    def get_page_size(self, request):
+        if request.query_params.get(self.sin_paginar_query_param, '').lower() in ('false', '0', 'no'):
+            return None
+        return super().get_page_size(request)
+
+
+class PaginacionMixin:
+    """
+    Da a un APIView la paginación que DRF solo ofrece en GenericAPIView.
+    """
+    pagination_class = CursorPaginacionOpcional
+
+    def es_paginada(self, request):
+        return self.pagination_class().get_page_size(request) is not None
+
+    def responder_lista(self, request, queryset, serializer_class, **kwargs):
+        paginador = self.pagination_class()
+        pagina = paginador.paginate_queryset(queryset, request, view=self)
+        if pagina is not None:
+            serializer = serializer_class(pagina, many=True, **kwargs)
+            return paginador.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset.order_by(*self._ordenamiento(paginador)), many=True, **kwargs)
+        return Response(serializer.data)
+
+    @staticmethod
+    def _ordenamiento(paginador):
+        ordering = paginador.ordering
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+
+class KeysetPaginacion(BasePagination):
+    """
+    Paginación keyset sobre varias columnas (p. ej. fecha, hora, id). A
+    diferencia de CursorPagination, que solo posiciona por la primera columna y
+    salta los empates con un desplazamiento, el cursor guarda el valor de todas
+    las columnas del último registro. La página siguiente se pide con la
+    comparación de tuplas expandida en ORs (ver _filtro_posterior), que admite
+    columnas con distinto sentido de orden: el índice acota el recorrido por la
+    primera columna y las demás solo se comparan en los empates.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def get_page_size(self, request):
+        try:
+            return min(max(int(request.query_params[self.page_size_query_param]), 1), self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def _campos(self, modelo):
+        return [(orden.lstrip('-'), orden.startswith('-'), modelo._meta.get_field(orden.lstrip('-')))
+                for orden in self.ordering]
+
+    def _filtro_posterior(self, campos, valores):
+        # (a, b, c) después de (x, y, z): a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+        filtro = Q()
+        iguales = {}
+        for (nombre, descendente, _), valor in zip(campos, valores):
+            filtro |= Q(**iguales, **{f"{nombre}__{'lt' if descendente else 'gt'}": valor})
+            iguales[nombre] = valor
+        return filtro
+
+    def decodificar_cursor(self, cursor, campos):
+        try:
+            valores = json.loads(urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            if len(valores) != len(campos):
+                raise ValueError
+            return [campo.to_python(valor) for (_, _, campo), valor in zip(campos, valores)]
+        except (TypeError, ValueError, UnicodeError, ValidationError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def codificar_cursor(self, campos, registro):
+        valores = [campo.value_to_string(registro) for _, _, campo in campos]
+        cursor = urlsafe_b64encode(json.dumps(valores).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        campos = self._campos(queryset.model)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._filtro_posterior(campos, self.decodificar_cursor(cursor, campos)))
+
+        resultados = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.siguiente = None
+        if len(resultados) > self.page_size:
+            resultados = resultados[:self.page_size]
+            self.siguiente = self.codificar_cursor(campos, resultados[-1])
+        return resultados
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.siguiente, 'previous': None, 'results': data})
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'cloudinary',
     'cloudinary_storage',
     'Ventas',
+    'Tareas',
     'corsheaders',
     'drf_spectacular',
 ]
@@ -57,7 +58,8 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Sin consulta a Usuario: request.user es un UsuarioToken armado con los claims
+        'accounts.authentication.JWTSinConsultaAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
          # Asegúrate de que esta configuración no bloquee el registro
@@ -65,6 +67,18 @@ REST_FRAMEWORK = {
      ],
 }
 
+SIMPLE_JWT = {
+    # Los tokens llevan el rol y sus privilegios (accounts.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.tokens.TokenUsuarioSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.tokens.TokenRefrescoSerializer',
+    'TOKEN_USER_CLASS': 'accounts.authentication.UsuarioToken',
+}
+
+# Segundos que se conservan en caché los privilegios resueltos por rol
+PERMISOS_CACHE_TIMEOUT = int(os.getenv('PERMISOS_CACHE_TIMEOUT', 60 * 60))
+# Segundos que EmpresaMiddleware reutiliza los datos de la empresa (se invalida al guardar Usuario)
+EMPRESA_CACHE_TIMEOUT = int(os.getenv('EMPRESA_CACHE_TIMEOUT', 5 * 60))
+
 # DRF Spectacular Settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'API Punto de Venta',
@@ -100,6 +114,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'accounts.middleware.BitacoraMiddleware',
+    'accounts.middleware.EmpresaMiddleware',
 ]
 
 # Configuración de CORS
@@ -145,6 +161,10 @@ DATABASES = {
         'PORT': os.getenv('DB_PORT', '5432'),
     }
 }
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Varios hilos de procesar_tareas escriben a la vez: cada transacción toma el bloqueo de
+    # escritura al empezar y espera su turno, en vez de fallar con "database is locked" a mitad
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE', 'timeout': 20}
 
 CORS_ALLOW_ALL_ORIGINS = True
 ALLOWED_HOSTS = [
@@ -153,6 +173,84 @@ ALLOWED_HOSTS = [
     '10.0.2.2',   # Dirección desde el emulador de Android
     '0.0.0.0',    # Permite todas las direcciones IP (útil para pruebas)
 ]
+
+# Caché: LocMem por defecto en desarrollo; en producción se configura un backend
+# compartido entre procesos (Redis, Memcached) con CACHE_BACKEND y CACHE_LOCATION.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'punto-venta'),
+    }
+}
+
+# Segundos que se conserva el catálogo serializado de un usuario (además se invalida al cambiar)
+CATALOGO_CACHE_TIMEOUT = int(os.getenv('CATALOGO_CACHE_TIMEOUT', 60 * 60))
+# Segundos que los terminales pueden reutilizar Estado/TipoVenta antes de revalidar con ETag
+TABLAS_CACHE_MAX_AGE = int(os.getenv('TABLAS_CACHE_MAX_AGE', 5 * 60))
+
+# Bitácora: los registros se guardan en lotes desde un hilo de fondo
+BITACORA_ASINCRONA = os.getenv('BITACORA_ASINCRONA', 'True') == 'True'
+BITACORA_TAMANO_LOTE = int(os.getenv('BITACORA_TAMANO_LOTE', 200))
+BITACORA_INTERVALO_MS = int(os.getenv('BITACORA_INTERVALO_MS', 500))
+BITACORA_MAXIMO_COLA = int(os.getenv('BITACORA_MAXIMO_COLA', 10000))
+# Días que la bitácora permanece en la tabla activa antes de archivarse (depurar_bitacora)
+BITACORA_RETENCION_DIAS = int(os.getenv('BITACORA_RETENCION_DIAS', 180))
+# Modelos cuyas altas, cambios y bajas se auditan (deben tener usuario_id o producto.usuario_id)
+BITACORA_MODELOS_AUDITADOS = [
+    'Productos.Producto',
+    'Productos.Categoria',
+    'Productos.Proveedor',
+    'Productos.Inventario',
+    'Ventas.Pedido',
+]
+
+# Los snapshots del kardex se toman a ahora menos este margen: un movimiento lleva la hora
+# de su transacción, que puede confirmarse después, y el snapshot no debe dejarlo atrás
+KARDEX_MARGEN_SEGUNDOS = int(os.getenv('KARDEX_MARGEN_SEGUNDOS', 60))
+
+# Sincronización de terminales: filas por entidad en cada página y segundos de margen
+# que se dejan sin leer para no saltar cambios de transacciones aún sin confirmar
+SINCRONIZACION_TAMANO_PAGINA = int(os.getenv('SINCRONIZACION_TAMANO_PAGINA', 500))
+SINCRONIZACION_MAXIMO_PAGINA = int(os.getenv('SINCRONIZACION_MAXIMO_PAGINA', 2000))
+SINCRONIZACION_MARGEN_SEGUNDOS = int(os.getenv('SINCRONIZACION_MARGEN_SEGUNDOS', 5))
+
+# Pedidos que admite una carga por lotes de ventas hechas sin conexión
+VENTAS_LOTE_MAXIMO = int(os.getenv('VENTAS_LOTE_MAXIMO', 500))
+# Antigüedad máxima (en días) de la fecha que informa la caja para una venta sin conexión
+VENTAS_LOTE_ANTIGUEDAD_DIAS = int(os.getenv('VENTAS_LOTE_ANTIGUEDAD_DIAS', 30))
+
+# Filas que cada exportación lee de la base por bloque (iterator(chunk_size=...))
+EXPORTACION_TAMANO_BLOQUE = int(os.getenv('EXPORTACION_TAMANO_BLOQUE', 2000))
+
+# Cola de tareas en la base (python manage.py procesar_tareas). Con TAREAS_ASINCRONAS=False
+# las tareas se ejecutan en el mismo proceso al confirmar la transacción, sin trabajador
+TAREAS_ASINCRONAS = os.getenv('TAREAS_ASINCRONAS', 'True') == 'True'
+# Hilos por proceso trabajador
+TAREAS_CONCURRENCIA = int(os.getenv('TAREAS_CONCURRENCIA', 2))
+TAREAS_MAX_INTENTOS = int(os.getenv('TAREAS_MAX_INTENTOS', 5))
+# Espera antes del reintento n: base * 2^(n-1) segundos, hasta el máximo
+TAREAS_REINTENTO_BASE_SEGUNDOS = int(os.getenv('TAREAS_REINTENTO_BASE_SEGUNDOS', 30))
+TAREAS_REINTENTO_MAXIMO_SEGUNDOS = int(os.getenv('TAREAS_REINTENTO_MAXIMO_SEGUNDOS', 60 * 60))
+# Segundos entre consultas cuando la cola está vacía
+TAREAS_INTERVALO_SEGUNDOS = float(os.getenv('TAREAS_INTERVALO_SEGUNDOS', 2))
+# Una tarea en proceso por más de este tiempo se considera abandonada y vuelve a la cola
+TAREAS_TIEMPO_LIMITE_SEGUNDOS = int(os.getenv('TAREAS_TIEMPO_LIMITE_SEGUNDOS', 10 * 60))
+
+# Imágenes de productos: 'cloudinary' o 'local' (copia en MEDIA_ROOT, para desarrollo y pruebas sin conexión)
+IMAGENES_ALMACEN = os.getenv('IMAGENES_ALMACEN', 'cloudinary')
+MEDIA_ROOT = Path(os.getenv('MEDIA_ROOT', BASE_DIR / 'media'))
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
+# Las imágenes recibidas esperan aquí hasta que el trabajador las sube
+IMAGENES_PENDIENTES_DIR = Path(os.getenv('IMAGENES_PENDIENTES_DIR', MEDIA_ROOT / 'pendientes'))
+IMAGENES_TAMANO_MAXIMO = int(os.getenv('IMAGENES_TAMANO_MAXIMO', 5 * 1024 * 1024))
+# Tamaños (ancho, alto) que se generan al subir cada imagen, en JPEG y WebP, recortados al tamaño exacto
+IMAGENES_VARIANTES = {
+    'miniatura': (150, 150),
+    'mediana': (600, 600),
+}
+# Calidad de compresión (1-100) de los derivados JPEG y WebP
+IMAGENES_CALIDAD = int(os.getenv('IMAGENES_CALIDAD', 80))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.urls import path, include
 from django.contrib import admin
 from django.urls import path,include
@@ -29,3 +31,6 @@ urlpatterns = [
     path('productos/', include('Productos.urls')),
     path('ventas/', include('Ventas.urls')),
 ]
+
+# Imágenes del almacén local (IMAGENES_ALMACEN='local'); solo con DEBUG
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)